@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Historische Form 4-backfill naar de lokale transactie-store.
+
+Loopt een datumrange af via de EDGAR dag-index (insider/daily_index.py), haalt
+per filing het submission-bestand op en slaat alle nonDerivative-transacties op
+in de tabel `history` van data/state/transactions.sqlite3 (insider/tx_store.py).
+
+  - Fetchen: threads onder SEC_LIMITER (gedeeld over processen) en de AIMD
+    host-limiet; de rate limit is de bottleneck, niet het aantal threads.
+  - Parsen: process pool, zodat de parse-CPU de fetch-threads niet ophoudt.
+  - Checkpoint per dag: een dag wordt pas als klaar gemarkeerd als al zijn
+    filings verwerkt zijn. Een afgebroken run gaat verder bij de eerste
+    onvoltooide dag; dagen met mislukte fetches worden de volgende run herhaald.
+  - Na elke dag: voortgang, filings/s en ETA op stderr.
+
+Gebruik:
+  python3 scripts/backfill_form4.py --start 2015-01-01              # t/m gisteren
+  python3 scripts/backfill_form4.py --start 2024-01-01 --end 2024-03-31 --parsers 4
+  python3 scripts/backfill_form4.py --start 2024-01-02 --end 2024-01-02 --redo
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from insider import concurrency, daily_index, form4
+from insider.doc_cache import FORM4_CACHE, is_ownership_doc
+from insider.ratelimit import SEC_LIMITER
+from insider.tx_store import TX_STORE
+
+UA       = os.getenv("SEC_USER_AGENT", "InsiderMonitor/1.0 (contact: you@example.com)")
+HEADERS  = {"User-Agent": UA, "Accept": "*/*"}
+FETCHERS = 8    # Bovengrens fetch-threads; tempo regelt SEC_LIMITER (SEC_MAX_RPS)
+RETRIES  = 4
+
+
+# ── fetchen (threads) ─────────────────────────────────────────────────────────
+
+def _get(url: str) -> str:
+    """GET met rate limit + retry; 404 direct als HTTPError. 403 (SEC-throttling) en
+    overige fouten krijgen backoff en gaan na RETRIES door."""
+    for attempt in range(RETRIES):
+        SEC_LIMITER.acquire()
+        try:
+            return concurrency.get(url, headers=HEADERS, timeout=30).text
+        except OSError as e:
+            wait = concurrency.retry_wait(e, attempt, cap=15.0)
+            if wait is None or attempt == RETRIES - 1:
+                raise
+            time.sleep(wait)
+    raise ConnectionError(url)
+
+
+def fetch_filing(filing: dict) -> str | None:
+    """Submission-tekst van een filing; eerst de document-cache (zonder erin te schrijven:
+    een backfill zou de LRU-cache van de dagelijkse runs leegduwen)."""
+    acc_nodash = filing["adsh"].replace("-", "")
+    cached = FORM4_CACHE.get(acc_nodash, filing["xml_file"])
+    if cached:
+        return cached
+    url = f"https://www.sec.gov/Archives/edgar/data/{filing['cik']}/{acc_nodash}/{filing['xml_file']}"
+    try:
+        return _get(url)
+    except OSError as e:
+        if getattr(e, "code", None) == 404:
+            return ""   # Ingetrokken / niet meer beschikbaar: telt als verwerkt
+        return None
+
+
+# ── parsen (process pool) ─────────────────────────────────────────────────────
+
+def parse_filing(filing: dict, text: str) -> list[tuple]:
+    """Historie-rijen (kolomvolgorde van tx_store._HISTORY) uit één submission."""
+    if not is_ownership_doc(text):
+        return []
+    doc  = form4.parse(text)
+    rows = []
+    for seq, tx in enumerate(doc.transactions):
+        if tx.table != "nonDerivative" or not tx.code:
+            continue
+        rows.append((
+            filing["adsh"], seq, doc.issuer_cik.lstrip("0"), doc.ticker.upper().strip(),
+            filing["file_date"], tx.date or filing["file_date"], doc.owner or "Unknown",
+            doc.role, tx.code, tx.shares, tx.price, tx.amount,
+            int(doc.is_10b5_1 or doc.tx_10b5_1(tx)),
+        ))
+    return rows
+
+
+# ── per dag ───────────────────────────────────────────────────────────────────
+
+def backfill_day(day: date, index: daily_index.DailyIndex, fetchers: ThreadPoolExecutor,
+                 parsers: ProcessPoolExecutor) -> tuple[int, int, int]:
+    """Verwerk één dag. Geeft (filings, rijen, mislukt); checkpoint alleen zonder fouten.
+
+    Een dag-index die niet op te halen is (403 zonder bevestiging dat de dag
+    ontbreekt) telt als mislukt: geen checkpoint, volgende run opnieuw."""
+    try:
+        filings = index.day(day)
+    except daily_index.IndexUnavailable as e:
+        print(f"[warn] {e}", file=sys.stderr)
+        return 0, 0, 1
+    rows: list[tuple] = []
+    failed  = 0
+    parsing = []
+    futures = {fetchers.submit(fetch_filing, f): f for f in filings}
+    for fut in as_completed(futures):
+        text = fut.result()
+        if text is None:
+            failed += 1
+        elif text:
+            parsing.append(parsers.submit(parse_filing, futures[fut], text))
+    for fut in parsing:
+        rows.extend(fut.result())
+
+    # Lege recente dag: mogelijk nog niet gepubliceerd i.p.v. feestdag → geen checkpoint
+    settled  = bool(filings) or day < date.today() - timedelta(days=daily_index.SETTLE_DAYS)
+    complete = settled and not failed
+    TX_STORE.write_history(rows, day=day if complete else None, filings=len(filings))
+    return len(filings), len(rows), failed
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 86400:
+        return f"{seconds // 86400}d {seconds % 86400 // 3600}u"
+    if seconds >= 3600:
+        return f"{seconds // 3600}u {seconds % 3600 // 60}m"
+    return f"{seconds // 60}m {seconds % 60}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill van Form 4-historie in de lokale transactie-store")
+    parser.add_argument("--start", required=True, help="Eerste dag (YYYY-MM-DD)")
+    parser.add_argument("--end", default="", help="Laatste dag (YYYY-MM-DD); default gisteren")
+    parser.add_argument("--fetchers", type=int, default=FETCHERS, help=f"Fetch-threads (default {FETCHERS})")
+    parser.add_argument("--parsers", type=int, default=0, help="Parse-processen (0 = aantal CPU's)")
+    parser.add_argument("--redo", action="store_true", help="Ook dagen die al een checkpoint hebben")
+    args = parser.parse_args()
+
+    start = date.fromisoformat(args.start)
+    end   = date.fromisoformat(args.end) if args.end else date.today() - timedelta(days=1)
+    done  = set() if args.redo else TX_STORE.backfilled_days(start, end)
+    todo  = [d for d in daily_index.business_days(start, end) if d.isoformat() not in done]
+    print(f"[backfill] {start} → {end}: {len(todo)} werkdagen te doen, {len(done)} al klaar", file=sys.stderr)
+    if not todo:
+        return
+
+    index = daily_index.DailyIndex(_get)
+    t0    = time.time()
+    n_filings = n_rows = n_failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=args.fetchers) as fetchers, \
+             ProcessPoolExecutor(max_workers=args.parsers or None) as parsers:
+            for i, day in enumerate(todo, 1):
+                try:
+                    f, r, failed = backfill_day(day, index, fetchers, parsers)
+                except OSError as e:
+                    print(f"[warn] {day}: dag-index niet op te halen ({e}) — volgende run opnieuw", file=sys.stderr)
+                    continue
+                n_filings += f
+                n_rows    += r
+                n_failed  += failed
+                elapsed = time.time() - t0
+                rate    = n_filings / elapsed if elapsed else 0.0
+                eta     = elapsed / i * (len(todo) - i)
+                print(f"[backfill] {day}: {f} filings, {r} transacties"
+                      + (f", {failed} mislukt (geen checkpoint)" if failed else "")
+                      + f" | {i}/{len(todo)} dagen, {rate:.1f} filings/s, ETA {_duration(eta)}",
+                      file=sys.stderr)
+    except KeyboardInterrupt:
+        print("\n[backfill] afgebroken — volgende run gaat verder bij de eerste onvoltooide dag",
+              file=sys.stderr)
+
+    elapsed = time.time() - t0
+    print(f"[backfill] {n_filings} filings, {n_rows} transacties, {n_failed} mislukt "
+          f"in {_duration(elapsed)} ({n_filings / max(elapsed, 1e-9):.1f} filings/s)", file=sys.stderr)
+    print(f"[cache] {index.summary()}; Form 4 XML: {FORM4_CACHE.hits} uit cache", file=sys.stderr)
+    print(f"[http] {concurrency.LIMITS.summary()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
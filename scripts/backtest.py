@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backtest van de insider-signalen: verslaat STERKE OVERTUIGING echt POSITIEF SIGNAAL?
+
+Speelt de Form 4-historie (tabel `history`, zie backfill_form4.py) handelsdag
+voor handelsdag af door de signaal-engine en de scoring, met de peildatum als
+klok, en simuleert het advies (AANHOUDEN / VERKOPEN) op de lokale dagkoersen
+(insider/price_store.py; ontbrekende koersen worden eenmalig bij Yahoo opgehaald).
+
+Rapporteert per signaalniveau rendement, hit rate en drawdown van de posities,
+forward-rendementen (5/20/60 handelsdagen) en een equal-weight portefeuille,
+naast de benchmark (default SPY). Zie insider/backtest.py.
+
+  python3 scripts/backtest.py --start 2016-01-01
+  python3 scripts/backtest.py --start 2020-01-01 --step 5 --offline
+  python3 scripts/backtest.py --start 2016-01-01 --json data/reports/backtest.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import monitor
+from insider import backtest, concurrency, scoring
+from insider.price_store import PRICES
+from insider.tx_store import TX_STORE
+
+
+def _pct(v) -> str:
+    return f"{v * 100:+7.2f}%" if v is not None else "      —"
+
+
+def print_report(report: dict, horizons: tuple[int, ...]) -> None:
+    print(f"\n{'Posities (entry-niveau)':<26}{'n':>6} {'gem.':>8} {'mediaan':>8} {'hit%':>5}  "
+          f"{'vs bench':>8} {'dagen':>7} {'gem.DD':>8} {'slechtste DD':>13}")
+    for name, s in list(report["trades"].items()) + [(f"score {k}", v) for k, v in report["by_score"].items()]:
+        if not s["n"]:
+            continue
+        print(f"  {name:<24}{s['n']:>6} {_pct(s['mean'])} {_pct(s['median'])} {s['hit_rate'] * 100:5.1f}  "
+              f"{_pct(s.get('mean_excess'))} {s['mean_days']:7.1f} {_pct(s['mean_max_dd'])} {_pct(s['worst_dd'])}")
+
+    print("\nForward-rendement (actieve ticker-dagen)"
+          + "".join(f"   {f'+{h}d gem.':>10} {'hit%':>5}" for h in horizons))
+    for name, per_h in report["forward"].items():
+        if not any(s["n"] for s in per_h.values()):
+            continue
+        print(f"  {name:<38}" + "".join(
+            f"   {_pct(s.get('mean')):>10} {s['hit_rate'] * 100 if s['n'] else 0:5.1f}" for s in per_h.values()))
+
+    print("\nPortefeuille (equal weight)   totaal     CAGR   max DD   posities")
+    rows = list(report["portfolio"].items())
+    if "benchmark" in report:
+        rows.append(("benchmark", report["benchmark"]))
+    for name, s in rows:
+        print(f"  {name:<24}{_pct(s['total'])} {_pct(s['cagr'])} {_pct(s['max_dd'])}"
+              + (f" {s['mean_positions']:9.1f}" if "mean_positions" in s else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest van de insider-signalen op lokale dagkoersen")
+    parser.add_argument("--start", required=True, help="Eerste handelsdag (YYYY-MM-DD)")
+    parser.add_argument("--end", default="", help="Laatste handelsdag (default vandaag)")
+    parser.add_argument("--days", type=int, default=monitor.ANALYSIS_DAYS,
+                        help=f"Analysevenster per peildatum (default {monitor.ANALYSIS_DAYS})")
+    parser.add_argument("--step", type=int, default=1,
+                        help="Signalen elke N handelsdagen herberekenen (default 1)")
+    parser.add_argument("--rules", choices=sorted(scoring.RULESETS), default=monitor.SCORE_RULES,
+                        help=f"Scoring rule set (default {monitor.SCORE_RULES})")
+    parser.add_argument("--benchmark", default="SPY", help="Benchmark-ticker (leeg = geen)")
+    parser.add_argument("--horizons", default=",".join(map(str, backtest.HORIZONS)),
+                        help="Forward-horizons in handelsdagen (default 5,20,60)")
+    parser.add_argument("--offline", action="store_true", help="Alleen koersen uit de lokale store")
+    parser.add_argument("--workers", type=int, default=8, help="Threads voor het ophalen van koersen")
+    parser.add_argument("--json", default="", help="Schrijf rapport + alle posities naar dit bestand")
+    args = parser.parse_args()
+
+    start    = date.fromisoformat(args.start)
+    end      = date.fromisoformat(args.end) if args.end else date.today()
+    horizons = tuple(int(h) for h in args.horizons.split(",") if h.strip())
+
+    t0   = time.time()
+    rows = TX_STORE.history(since=start - timedelta(days=args.days), until=end)
+    if not rows:
+        print("[backtest] geen historie in de store — draai eerst backfill_form4.py", file=sys.stderr)
+        sys.exit(1)
+    trades = monitor.history_trades(rows)
+    # Alleen tickers met een buy kunnen een positie of actief signaal krijgen
+    buyers = sorted({trades.tickers[i] for i in np.unique(trades.tid[trades.buy]).tolist()})
+    print(f"[backtest] {len(rows)} transacties, {len(trades.tickers)} tickers "
+          f"({len(buyers)} met buys) in {time.time() - t0:.1f}s", file=sys.stderr)
+
+    # ── koersen ───────────────────────────────────────────────────────────────
+    t1    = time.time()
+    bench = args.benchmark.upper()
+    need  = buyers + ([bench] if bench else [])
+    if not args.offline:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            ok = list(pool.map(lambda t: PRICES.ensure(t, start, end), need))
+        if bench and not ok[-1]:
+            print(f"[warn] benchmark {bench} niet op te halen", file=sys.stderr)
+    calendar, matrix = PRICES.closes(trades.tickers + ([bench] if bench else []), start, end)
+    if not len(calendar):
+        print("[backtest] geen koersen in de store voor deze periode", file=sys.stderr)
+        sys.exit(1)
+    prices   = matrix[:, :len(trades.tickers)]
+    bench_px = matrix[:, -1] if bench else None
+    print(f"[backtest] koersen: {len(calendar)} handelsdagen × "
+          f"{int(np.isfinite(prices).any(axis=0).sum())} tickers in {time.time() - t1:.1f}s", file=sys.stderr)
+
+    # ── replay + simulatie ────────────────────────────────────────────────────
+    t2 = time.time()
+    sig, score, active = backtest.replay(
+        calendar, lambda d: monitor.signals_as_of(trades, d, args.days), args.rules, args.step)
+    t3 = time.time()
+    report, tr = backtest.run(sig, score, active, prices, bench_px, horizons)
+    t4 = time.time()
+    print(f"[backtest] replay {t3 - t2:.1f}s, simulatie {t4 - t3:.1f}s, {len(tr['ret'])} posities", file=sys.stderr)
+
+    print(f"Backtest {date.fromordinal(int(calendar[0]))} → {date.fromordinal(int(calendar[-1]))} "
+          f"({args.rules}, uitvoering t+{backtest.LAG})")
+    print_report(report, horizons)
+
+    if args.json:
+        day = [date.fromordinal(int(d)).isoformat() for d in calendar]
+        out = {
+            "start": day[0], "end": day[-1], "rules": args.rules, "benchmark": bench or None,
+            "report": report,
+            "positions": [{
+                "ticker": trades.tickers[c], "entry": day[a], "exit": day[b], "open": bool(o),
+                "signal": backtest.SIGNALS[s], "score": int(sc), "ret": float(r), "max_dd": float(dd),
+            } for c, a, b, o, s, sc, r, dd in zip(
+                tr["ticker"].tolist(), tr["entry"].tolist(), tr["exit"].tolist(), tr["open"].tolist(),
+                tr["signal"].tolist(), tr["score"].tolist(), tr["ret"].tolist(), tr["max_dd"].tolist())],
+        }
+        Path(args.json).write_text(json.dumps(out, indent=1), encoding="utf-8")
+        print(f"[backtest] rapport + {len(out['positions'])} posities → {args.json}", file=sys.stderr)
+
+    print(f"[cache] {PRICES.summary()}", file=sys.stderr)
+    print(f"[http] {concurrency.LIMITS.summary()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark discovery-engines van monitor.py: thread-pool vs asyncio.
+
+Draait offline: monitor._get wordt vervangen door een stub met gesimuleerde
+netwerklatency en synthetische Form 4 XML. De document-cache, accession-store en
+rate limiter krijgen een tijdelijke directory, zodat de echte cache/state niet
+geraakt wordt.
+
+Gebruik:
+  python3 scripts/bench_discovery.py
+  python3 scripts/bench_discovery.py --filings 300 --latency 0.25 --rate 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import monitor
+from insider.accession_store import AccessionStore
+from insider.doc_cache import DocCache
+from insider.ratelimit import RateLimiter
+
+XML_TEMPLATE = """<?xml version="1.0"?>
+<ownershipDocument>
+  <issuer><issuerName>Bench Corp {i}</issuerName><issuerTradingSymbol>B{i}</issuerTradingSymbol></issuer>
+  <reportingOwner>
+    <reportingOwnerId><rptOwnerName>Insider {i}</rptOwnerName></reportingOwnerId>
+    <reportingOwnerRelationship><isOfficer>1</isOfficer><officerTitle>CEO</officerTitle></reportingOwnerRelationship>
+  </reportingOwner>
+  <nonDerivativeTable><nonDerivativeTransaction>
+    <transactionDate><value>2026-01-02</value></transactionDate>
+    <transactionCoding><transactionCode>P</transactionCode></transactionCoding>
+    <transactionAmounts>
+      <transactionShares><value>{shares}</value></transactionShares>
+      <transactionPricePerShare><value>25.00</value></transactionPricePerShare>
+    </transactionAmounts>
+  </nonDerivativeTransaction></nonDerivativeTable>
+</ownershipDocument>
+"""
+
+
+def make_filings(n: int) -> list[dict]:
+    return [
+        {
+            "adsh":      f"0000000000-26-{i:06d}",
+            "xml_file":  "form4.xml",
+            "file_date": "2026-01-02",
+            "cik":       str(1000 + i),
+        }
+        for i in range(n)
+    ]
+
+
+def install_stub(latency: float) -> None:
+    """Vervang de netwerk-laag van monitor door een stub met latency ± 30% jitter."""
+    def fake_get(url: str) -> str:
+        time.sleep(latency * random.uniform(0.7, 1.3))
+        i = int(url.rsplit("/", 2)[-2][-6:])
+        return XML_TEMPLATE.format(i=i, shares=5000 + i)
+    monitor._get = fake_get
+
+
+def run(engine: str, filings: list[dict], rate: float, tmp: Path) -> tuple[float, int]:
+    # Verse cache + limiter per engine: beide runs starten koud
+    monitor.FORM4_CACHE = DocCache(root=tmp / f"cache-{engine}")
+    monitor.SEC_LIMITER = RateLimiter(path=tmp / f"ratelimit-{engine}.json", rate=rate)
+    monitor.PROCESSED   = AccessionStore(path=tmp / f"processed-{engine}.sqlite3", source="bench")
+
+    t0 = time.perf_counter()
+    if engine == "threads":
+        rows = monitor._discover_threads(filings)
+    else:
+        async def batches():
+            for i in range(0, len(filings), 100):   # EFTS-pagina's van 100
+                yield filings[i:i + 100]
+        _, rows = asyncio.run(monitor._discover_async(batches()))
+    return time.perf_counter() - t0, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark discovery: threads vs asyncio")
+    parser.add_argument("--filings", type=int, default=200, help="Aantal synthetische filings")
+    parser.add_argument("--latency", type=float, default=0.3, help="Gesimuleerde latency per request (s)")
+    parser.add_argument("--rate", type=float, default=8.0, help="Rate limit (req/s)")
+    args = parser.parse_args()
+
+    install_stub(args.latency)
+    filings = make_filings(args.filings)
+    monitor._ipo_cache.update({f["cik"]: False for f in filings})   # Geen IPO-lookups
+
+    print(f"{args.filings} filings, latency {args.latency:.2f}s, rate {args.rate:g} req/s")
+    with tempfile.TemporaryDirectory() as d:
+        for engine in ("threads", "async"):
+            elapsed, n_rows = run(engine, filings, args.rate, Path(d))
+            print(f"  {engine:<8} {elapsed:6.2f}s  {args.filings / elapsed:6.2f} filings/s  ({n_rows} buys)")
+
+
+if __name__ == "__main__":
+    main()
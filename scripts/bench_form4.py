@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark Form 4 parsing: insider/form4.py vs de oude regex-paden.
+
+De regex-varianten hieronder zijn de parsers zoals ze in monitor.py en
+fetch_insiders_sec.py / portfolio_deepdive_270d.py stonden, vóór de overstap naar
+insider.form4. Ze staan hier alleen als referentie.
+
+Documenten: synthetische Form 4's (default), of echte uit de document-cache.
+
+Gebruik:
+  python3 scripts/bench_form4.py
+  python3 scripts/bench_form4.py --docs 2000 --txs 12
+  python3 scripts/bench_form4.py --from-cache          # data/cache/archives
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import html
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from insider import form4
+from insider.doc_cache import CACHE_DIR, is_ownership_doc
+
+TX_TEMPLATE = """
+    <{table}Transaction>
+      <securityTitle><value>Common Stock</value></securityTitle>
+      <transactionDate><value>2026-01-{day:02d}</value></transactionDate>
+      <transactionCoding>
+        <transactionFormType>4</transactionFormType>
+        <transactionCode>{code}</transactionCode>
+        <equitySwapInvolved>0</equitySwapInvolved>
+      </transactionCoding>
+      <transactionAmounts>
+        <transactionShares><value>{shares}</value></transactionShares>
+        <transactionPricePerShare><value>{price}</value><footnoteId id="F1"/></transactionPricePerShare>
+        <transactionAcquiredDisposedCode><value>{ad}</value></transactionAcquiredDisposedCode>
+      </transactionAmounts>
+      <postTransactionAmounts>
+        <sharesOwnedFollowingTransaction><value>{after}</value></sharesOwnedFollowingTransaction>
+      </postTransactionAmounts>
+      <ownershipNature><directOrIndirectOwnership><value>D</value></directOrIndirectOwnership></ownershipNature>
+    </{table}Transaction>"""
+
+DOC_TEMPLATE = """<?xml version="1.0"?>
+<ownershipDocument>
+  <schemaVersion>X0508</schemaVersion>
+  <documentType>4</documentType>
+  <periodOfReport>2026-01-02</periodOfReport>
+  <issuer>
+    <issuerCik>0000{i:06d}</issuerCik>
+    <issuerName>Bench Corp {i}</issuerName>
+    <issuerTradingSymbol>B{i}</issuerTradingSymbol>
+  </issuer>
+  <reportingOwner>
+    <reportingOwnerId><rptOwnerCik>0001{i:06d}</rptOwnerCik><rptOwnerName>Insider {i}</rptOwnerName></reportingOwnerId>
+    <reportingOwnerAddress><rptOwnerStreet1>1 Main St</rptOwnerStreet1><rptOwnerCity>Springfield</rptOwnerCity></reportingOwnerAddress>
+    <reportingOwnerRelationship><isDirector>1</isDirector><isOfficer>1</isOfficer><officerTitle>Chief Executive Officer</officerTitle></reportingOwnerRelationship>
+  </reportingOwner>
+  <nonDerivativeTable>{non_derivative}
+  </nonDerivativeTable>
+  <derivativeTable>{derivative}
+  </derivativeTable>
+  <footnotes>
+    <footnote id="F1">Weighted average price. Trades made pursuant to a Rule 10b5-1 trading plan adopted on 2025-06-01.</footnote>
+  </footnotes>
+  <remarks></remarks>
+  <ownerSignature><signatureName>/s/ Attorney-in-fact</signatureName><signatureDate>2026-01-03</signatureDate></ownerSignature>
+</ownershipDocument>
+"""
+
+
+def make_docs(n: int, n_txs: int) -> list[str]:
+    docs = []
+    for i in range(n):
+        def txs(table: str, count: int) -> str:
+            return "".join(
+                TX_TEMPLATE.format(table=table, day=1 + k % 28, code="PSMF"[k % 4],
+                                   shares=100 * (k + 1), price=10 + k, ad="AD"[k % 2],
+                                   after=10_000 + k)
+                for k in range(count)
+            )
+        docs.append(DOC_TEMPLATE.format(i=i, non_derivative=txs("nonDerivative", n_txs),
+                                        derivative=txs("derivative", max(1, n_txs // 4))))
+    return docs
+
+
+def load_cached_docs(limit: int) -> list[str]:
+    docs = []
+    for path in sorted(CACHE_DIR.glob("*/*.gz")):
+        text = gzip.decompress(path.read_bytes()).decode("utf-8", "ignore")
+        if is_ownership_doc(text):
+            docs.append(text)
+            if len(docs) >= limit:
+                break
+    return docs
+
+
+# ── Oude regex-paden (referentie) ─────────────────────────────────────────────
+
+def _g(xml: str, tag: str) -> str:
+    m = re.search(fr"<{tag}>(.*?)</{tag}>", xml)
+    return m.group(1).strip() if m else ""
+
+
+def regex_monitor(xml: str):
+    """monitor._parse_meta + monitor._parse_transactions."""
+    role = _g(xml, "officerTitle")
+    if not role:
+        parts = []
+        if _g(xml, "isDirector") == "1": parts.append("Director")
+        if _g(xml, "isOfficer")  == "1": parts.append("Officer")
+        role = ", ".join(parts)
+    meta = {
+        "ticker": _g(xml, "issuerTradingSymbol"), "issuer": _g(xml, "issuerName"),
+        "owner": _g(xml, "rptOwnerName"), "role": role, "is_officer": _g(xml, "isOfficer"),
+        "is_director": _g(xml, "isDirector"), "is_ten_pct": _g(xml, "isTenPercentOwner"),
+    }
+    txs = []
+    for block in re.findall(r"<nonDerivativeTransaction>(.*?)</nonDerivativeTransaction>", xml, re.S):
+        code_m   = re.search(r"<transactionCode>(.*?)</transactionCode>", block)
+        shares_m = re.search(r"<transactionShares>.*?<value>(.*?)</value>", block, re.S)
+        price_m  = re.search(r"<transactionPricePerShare>.*?<value>(.*?)</value>", block, re.S)
+        date_m   = re.search(r"<transactionDate>.*?<value>(.*?)</value>", block, re.S)
+        if not code_m:
+            continue
+        try:
+            shares = float(shares_m.group(1)) if shares_m else 0.0
+            price  = float(price_m.group(1))  if price_m  else 0.0
+        except (ValueError, TypeError):
+            continue
+        txs.append({"code": code_m.group(1).strip().upper(), "amount": shares * price,
+                    "date": date_m.group(1).strip()[:10] if date_m else ""})
+    return meta, txs
+
+
+def _ng(xml: str, tag: str) -> str:
+    m = re.search(fr"<(?:\w+:)?{tag}\b[^>]*>(.*?)</(?:\w+:)?{tag}>", xml, flags=re.S | re.I)
+    return html.unescape((m.group(1) if m else "").strip())
+
+
+def _ngv(xml: str, tag: str) -> str:
+    m = re.search(fr"<(?:\w+:)?{tag}\b[^>]*>\s*(?:<(?:\w+:)?value[^>]*>)?\s*([^<]+)", xml, flags=re.S | re.I)
+    return html.unescape((m.group(1) if m else "").strip())
+
+
+def _blks(xml: str, tag: str):
+    return re.findall(fr"<(?:\w+:)?{tag}\b[^>]*>(.+?)</(?:\w+:)?{tag}>", xml, flags=re.S | re.I)
+
+
+def regex_namespace_aware(xml: str):
+    """fetch_insiders_sec.parse_form4 / deepdive: g/gv/blks, beide tabellen, 10b5-1."""
+    head = {t: _ng(xml, t) for t in ("rptOwnerName", "officerTitle", "issuerTradingSymbol",
+                                      "issuerName", "issuerCik", "isDirector", "isOfficer",
+                                      "isTenPercentOwner")}
+    tenb5 = "10b5-1" in xml.lower()
+    txs = []
+    for blk in _blks(xml, "nonDerivativeTransaction") + _blks(xml, "derivativeTransaction"):
+        txs.append((_ng(blk, "transactionCode").upper(), _ngv(blk, "transactionAcquiredDisposedCode"),
+                    _ngv(blk, "transactionShares"), _ngv(blk, "transactionPricePerShare"),
+                    _ngv(blk, "transactionTotalValue"), _ngv(blk, "transactionDate")))
+    return head, tenb5, txs
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────────────
+
+def bench(name: str, fn, docs: list[str], n_bytes: int, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for d in docs:
+            fn(d)
+        best = min(best, time.perf_counter() - t0)
+    print(f"  {name:<28} {len(docs) / best:9.0f} docs/s  {n_bytes / best / 1e6:7.1f} MB/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Form 4 parsing: streaming vs regex")
+    parser.add_argument("--docs", type=int, default=1000, help="Aantal documenten")
+    parser.add_argument("--txs", type=int, default=6, help="nonDerivative transacties per synthetisch document")
+    parser.add_argument("--rounds", type=int, default=3, help="Herhalingen (beste telt)")
+    parser.add_argument("--from-cache", action="store_true", help="Echte Form 4's uit data/cache/archives")
+    args = parser.parse_args()
+
+    docs = load_cached_docs(args.docs) if args.from_cache else make_docs(args.docs, args.txs)
+    if not docs:
+        print("Geen documenten gevonden", file=sys.stderr)
+        sys.exit(1)
+    n_bytes = sum(len(d.encode("utf-8")) for d in docs)
+    print(f"{len(docs)} documenten, gemiddeld {n_bytes / len(docs) / 1024:.1f} KB")
+
+    t_new  = bench("form4.parse", form4.parse, docs, n_bytes, args.rounds)
+    t_mon  = bench("regex monitor", regex_monitor, docs, n_bytes, args.rounds)
+    t_ns   = bench("regex namespace-aware", regex_namespace_aware, docs, n_bytes, args.rounds)
+    print(f"  speedup vs monitor-regex: {t_mon / t_new:.2f}×, vs namespace-aware regex: {t_ns / t_new:.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,10 @@ Candidate Research — Diepgaande analyse van STERKE OVERTUIGING kandidaten.
 
 Wanneer de discovery pipeline een sterke kandidaat vindt, doet dit script
 automatisch dieper onderzoek en stuurt een Telegram bericht met aanbeveling.
+Alle kandidaten gaan als één batch (research_batch): gedeelde context, de
+netwerkcalls van alle kandidaten tegelijk (--workers). Marktdata en nieuws
+worden alleen opgehaald voor kandidaten die op basis van de insider-data nog
+MIN_SCORE kunnen halen (--full: altijd).
 
 Gebruik:
   python3 scripts/candidate_research.py \
@@ -25,9 +29,16 @@ import os
 import sys
 import time
 import urllib.parse
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from urllib.request import Request, urlopen
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from insider import concurrency, http_client, roles, scoring
+from insider.price_store import PRICES
+from insider.ratelimit import SEC_LIMITER, is_sec_url
+from insider.tx_store import TX_STORE
 
 # ── Constanten ────────────────────────────────────────────────────────────────
 
@@ -36,36 +47,41 @@ UA_YF  = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KH
 
 TIMEOUT        = 30
 RETRIES        = 3
-SLEEP_SEC      = 0.35   # SEC rate-limit (max 10 req/s, wij doen ~3/s)
-SLEEP_YF       = 0.5    # Yahoo Finance rate-limit
 
 MIN_SCORE      = 6      # Minimale score voor Telegram bericht
 TARGET_SIGNAL  = "STERKE OVERTUIGING"
+WORKERS        = 8      # Threads voor marktdata + nieuws van alle kandidaten samen
+PRICE_DAYS     = 400    # Dagbars in de koersen-store (insider/price_store.py): 52 weken + marge
 
-YF_CHART_URL   = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?interval=1d&range={range}"
-YF_CHART_WK    = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?interval=1wk&range=1y"
 YF_NEWS_URL    = "https://query1.finance.yahoo.com/v1/finance/search?q={ticker}&newsCount=3"
 
 # ── HTTP helpers ──────────────────────────────────────────────────────────────
 
-def fetch(url: str, ua: str = UA_SEC, sleep: float = SLEEP_SEC) -> str:
-    """Haal URL op met retries en exponential backoff. Geeft lege string bij fout."""
+def fetch(url: str, ua: str = UA_SEC) -> str:
+    """Haal URL op met retries en exponential backoff. Geeft lege string bij fout.
+
+    SEC-URL's gaan via de gedeelde token bucket; per host begrenst de adaptieve
+    concurrency-limiter (AIMD) het aantal gelijktijdige requests en pauzeert bij 429.
+    """
     for attempt in range(RETRIES):
         try:
-            time.sleep(sleep)
-            req = Request(url, headers={"User-Agent": ua, "Accept": "*/*"})
-            with urlopen(req, timeout=TIMEOUT) as r:
-                return r.read().decode("utf-8", "ignore")
+            if is_sec_url(url):
+                SEC_LIMITER.acquire()
+            r = concurrency.get(url, headers={"User-Agent": ua, "Accept": "*/*"}, timeout=TIMEOUT)
+            return r.text
         except Exception as e:
+            wait = concurrency.retry_wait(e, attempt)
+            if wait is None:
+                break
             if attempt < RETRIES - 1:
-                time.sleep(min(8, 0.8 * (2 ** attempt)))
+                time.sleep(wait)
             else:
                 print(f"[warn] fetch({url[:80]}): {e}", file=sys.stderr)
     return ""
 
 
-def fetch_json(url: str, ua: str = UA_SEC, sleep: float = SLEEP_SEC) -> dict | list:
-    text = fetch(url, ua=ua, sleep=sleep)
+def fetch_json(url: str, ua: str = UA_SEC) -> dict | list:
+    text = fetch(url, ua=ua)
     if not text:
         return {}
     try:
@@ -78,7 +94,11 @@ def fetch_json(url: str, ua: str = UA_SEC, sleep: float = SLEEP_SEC) -> dict | l
 
 def get_market_data(ticker: str) -> dict:
     """
-    Haal uitgebreide marktdata op via Yahoo Finance.
+    Marktdata uit de lokale dagkoersen-store (insider/price_store.py).
+
+    De eerste keer haalt de store ~13 maanden dagbars op (één Yahoo-request, i.p.v.
+    een 1d- én een 1y-weekgrafiek per run); daarna alleen de ontbrekende dagen.
+    Lukt aanvullen niet, dan wordt gerekend met wat er lokaal staat.
 
     Geeft terug:
       market_cap        : float | None
@@ -89,82 +109,19 @@ def get_market_data(ticker: str) -> dict:
       pct_from_52w_low  : float | None   — % boven 52-weeks low
       pct_change_4w     : float | None   — prijsverandering afgelopen 4 weken
       pct_change_3m     : float | None   — prijsverandering afgelopen 3 maanden
-      trend_4w          : str            — "STIJGEND" | "DALEND" | "ZIJWAARTS"
-      insider_vs_price  : str | None     — inschatting of insiders kochten na run-up of bij bodem
+      trend_4w          : str            — "STIJGEND" | "DALEND" | "ZIJWAARTS" | "ONBEKEND"
+      pct_change_30d    : float | None   — legacy alias van pct_change_4w (score_candidate)
     """
-    result: dict = {
-        "market_cap":        None,
-        "price_now":         None,
-        "week52_high":       None,
-        "week52_low":        None,
-        "pct_from_52w_high": None,
-        "pct_from_52w_low":  None,
-        "pct_change_4w":     None,
-        "pct_change_3m":     None,
-        "trend_4w":          "ONBEKEND",
-        # legacy field — behoud voor score_candidate
-        "pct_change_30d":    None,
-    }
-
-    # ── 1d: huidige prijs, marktcap, 52-weeks range ───────────────────────────
-    url_1d = YF_CHART_URL.format(ticker=ticker, range="1d")
-    data_1d = fetch_json(url_1d, ua=UA_YF, sleep=SLEEP_YF)
-    try:
-        meta = data_1d["chart"]["result"][0]["meta"]
-        price = meta.get("regularMarketPrice") or meta.get("previousClose")
-        result["price_now"]   = price
-        result["week52_high"] = meta.get("fiftyTwoWeekHigh")
-        result["week52_low"]  = meta.get("fiftyTwoWeekLow")
-        shares = meta.get("sharesOutstanding")
-        if shares and price:
-            result["market_cap"] = shares * price
-        if price and result["week52_high"] and result["week52_high"] > 0:
-            result["pct_from_52w_high"] = (price - result["week52_high"]) / result["week52_high"] * 100
-        if price and result["week52_low"] and result["week52_low"] > 0:
-            result["pct_from_52w_low"]  = (price - result["week52_low"])  / result["week52_low"]  * 100
-    except (KeyError, IndexError, TypeError):
-        pass
-
-    # ── 1y weekgrafiek: 4-weeks en 3-maands trend ────────────────────────────
-    url_1y = YF_CHART_WK.format(ticker=ticker)
-    data_1y = fetch_json(url_1y, ua=UA_YF, sleep=SLEEP_YF)
-    try:
-        closes = data_1y["chart"]["result"][0]["indicators"]["quote"][0]["close"]
-        valid  = [(i, c) for i, c in enumerate(closes) if c is not None]
-        if valid:
-            # Huidige prijs (meest recente week)
-            if result["price_now"] is None:
-                result["price_now"] = valid[-1][1]
-
-            price_now = result["price_now"]
-
-            # 4-weeks trend: vergelijk prijs nu met 4 weken geleden (~4 wekelijkse bars)
-            if len(valid) >= 5:
-                price_4w_ago = valid[-5][1]
-                result["pct_change_4w"] = (price_now - price_4w_ago) / price_4w_ago * 100
-                result["pct_change_30d"] = result["pct_change_4w"]   # legacy alias
-
-                if result["pct_change_4w"] > 3:
-                    result["trend_4w"] = "STIJGEND"
-                elif result["pct_change_4w"] < -3:
-                    result["trend_4w"] = "DALEND"
-                else:
-                    result["trend_4w"] = "ZIJWAARTS"
-
-            # 3-maands trend (~13 wekelijkse bars)
-            if len(valid) >= 14:
-                price_3m_ago = valid[-14][1]
-                result["pct_change_3m"] = (price_now - price_3m_ago) / price_3m_ago * 100
-    except (KeyError, IndexError, TypeError):
-        pass
-
-    return result
+    today = date.today()
+    if not PRICES.ensure(ticker, today - timedelta(days=PRICE_DAYS), today):
+        print(f"[warn] {ticker}: koersen aanvullen mislukt — gebruik lokale store", file=sys.stderr)
+    return PRICES.features(ticker, today)
 
 
 def get_news_headlines(ticker: str) -> list[str]:
     """Haal maximaal 3 recente nieuwskoppen op via Yahoo Finance search."""
     url = YF_NEWS_URL.format(ticker=urllib.parse.quote(ticker))
-    data = fetch_json(url, ua=UA_YF, sleep=SLEEP_YF)
+    data = fetch_json(url, ua=UA_YF)
 
     headlines = []
     try:
@@ -178,11 +135,12 @@ def get_news_headlines(ticker: str) -> list[str]:
     return headlines
 
 
-# ── Deepdive JSON reader ───────────────────────────────────────────────────────
+# ── Deepdive reader ────────────────────────────────────────────────────────────
 
 def load_deepdive_for_ticker(ticker: str, reports_dir: Path) -> dict:
     """
-    Laad insider detail-data voor een ticker uit de meest recente deepdive JSON.
+    Laad insider detail-data voor een ticker uit de meest recente deepdive
+    (transactie-store; deepdive_*.json in reports_dir worden eerst geïmporteerd).
 
     Geeft terug:
       buys_detail   : list van dicts met insider/role/amount/date
@@ -206,76 +164,60 @@ def load_deepdive_for_ticker(ticker: str, reports_dir: Path) -> dict:
         "days_since_buy": 999,
     }
 
-    for json_file in sorted(reports_dir.glob("deepdive_*.json"), reverse=True):
+    # Meest recente deepdive voor deze ticker uit de transactie-store
+    TX_STORE.sync_reports(reports_dir)
+    stored = TX_STORE.transactions(ticker)
+    if stored is None:
+        return empty
+
+    buys, sells = [], []
+    for tx in stored:
+        code = tx.get("code", "").upper()
+        if code not in ("P", "S"):
+            continue
         try:
-            data = json.loads(json_file.read_text(encoding="utf-8"))
-            tickers_in_file = [t.upper() for t in data.get("tickers", [])]
-            if ticker not in tickers_in_file:
-                continue
-
-            buys, sells = [], []
-            for tx in data.get("transactions", []):
-                if tx.get("ticker", "").upper() != ticker:
-                    continue
-                code = tx.get("code", "").upper()
-                if code not in ("P", "S"):
-                    continue
-                try:
-                    tx_date = datetime.strptime(str(tx.get("date", ""))[:10], "%Y-%m-%d").date()
-                except Exception:
-                    continue
-                amt = float(tx.get("BUY", 0) if code == "P" else tx.get("SELL", 0))
-                entry = {
-                    "insider": tx.get("insider", "Unknown"),
-                    "role":    tx.get("role", ""),
-                    "amount":  amt,
-                    "date":    tx_date.isoformat(),
-                }
-                if code == "P" and amt >= 50_000:
-                    buys.append(entry)
-                elif code == "S" and amt > 0:
-                    sells.append(entry)
-
-            today = datetime.now(timezone.utc).date()
-
-            # Laatste buy datum + days_since
-            buy_dates = [datetime.strptime(b["date"], "%Y-%m-%d").date() for b in buys]
-            last_buy = max(buy_dates) if buy_dates else None
-            days_since = (today - last_buy).days if last_buy else 999
-
-            # C-suite kopers (role_weight >= 4: CEO/CFO/President/COO)
-            csuite_roles = {"ceo", "chief executive", "president", "cfo", "chief financial",
-                            "coo", "chief operating"}
-            csuite = list({
-                b["insider"] for b in buys
-                if any(kw in b["role"].lower() for kw in csuite_roles)
-            })
-
-            return {
-                "buys_detail":    sorted(buys,  key=lambda x: x["date"], reverse=True),
-                "sells_detail":   sorted(sells, key=lambda x: x["date"], reverse=True),
-                "total_buy":      sum(b["amount"] for b in buys),
-                "total_sell":     sum(s["amount"] for s in sells),
-                "unique_buyers":  len({b["insider"] for b in buys}),
-                "csuite_buyers":  csuite,
-                "last_buy_date":  last_buy.isoformat() if last_buy else None,
-                "days_since_buy": days_since,
-            }
+            tx_date = datetime.strptime(str(tx.get("date", ""))[:10], "%Y-%m-%d").date()
         except Exception:
             continue
+        amt = float(tx.get("BUY", 0) if code == "P" else tx.get("SELL", 0))
+        entry = {
+            "insider": tx.get("insider", "Unknown"),
+            "role":    tx.get("role", ""),
+            "amount":  amt,
+            "date":    tx_date.isoformat(),
+        }
+        if code == "P" and amt >= 50_000:
+            buys.append(entry)
+        elif code == "S" and amt > 0:
+            sells.append(entry)
+
+    today = datetime.now(timezone.utc).date()
+
+    # Laatste buy datum + days_since
+    buy_dates = [datetime.strptime(b["date"], "%Y-%m-%d").date() for b in buys]
+    last_buy = max(buy_dates) if buy_dates else None
+    days_since = (today - last_buy).days if last_buy else 999
+
+    # C-suite kopers (roles.TOP_EXEC: CEO/CFO/President/COO)
+    csuite = list({b["insider"] for b in buys if _is_csuite(b["role"])})
 
-    return empty
+    return {
+        "buys_detail":    sorted(buys,  key=lambda x: x["date"], reverse=True),
+        "sells_detail":   sorted(sells, key=lambda x: x["date"], reverse=True),
+        "total_buy":      sum(b["amount"] for b in buys),
+        "total_sell":     sum(s["amount"] for s in sells),
+        "unique_buyers":  len({b["insider"] for b in buys}),
+        "csuite_buyers":  csuite,
+        "last_buy_date":  last_buy.isoformat() if last_buy else None,
+        "days_since_buy": days_since,
+    }
 
 
 # ── Scoringsmodel ──────────────────────────────────────────────────────────────
 
-CSUITE_ROLES = {"ceo", "chief executive", "president", "cfo", "chief financial",
-                "coo", "chief operating"}
-
-
 def _is_csuite(role: str) -> bool:
-    role_l = role.lower()
-    return any(kw in role_l for kw in CSUITE_ROLES)
+    """CEO/CFO/COO/President (roles.TOP_EXEC)."""
+    return roles.classify(role).is_top
 
 
 def score_emoji(score: int) -> str:
@@ -294,96 +236,32 @@ def score_candidate(
     market_data: dict,
 ) -> tuple[int, list[str]]:
     """
-    Score 1-10 voor een nieuwe kandidaat. Zelfde formule als score_position()
-    in portfolio_monitor.py (max ruwe score = 12) zodat scores consistent zijn.
+    Score 1-10 voor een nieuwe kandidaat. Zelfde opbouw als score_position()
+    in portfolio_monitor.py (max ruwe score = 12), rule set "candidate/1" in
+    insider/scoring.py: signaalsterkte uit de buy/sell-verhouding en koopomvang
+    als % van marktcap (indien bekend).
 
       9-10 : CEO koopt $5M+ binnen 7d, groot cluster, nul sells
       7-8  : Sterke overtuiging, vers, significante buy
       5-6  : Positief signaal, minder vers of kleiner
       3-4  : Positief zonder C-suite of verouderd
       1-2  : Zwak signaal
-
-    Ruwe punten genormaliseerd naar 1-10 (max raw = 12).
     """
-    raw    = 0
-    redenen: list[str] = []
-
-    buys_detail   = insider_data.get("buys_detail", [])
-    sells_detail  = insider_data.get("sells_detail", [])
-    total_buy     = insider_data.get("total_buy", 0.0)
-    total_sell    = insider_data.get("total_sell", 0.0)
-    unique_buyers = insider_data.get("unique_buyers", 0)
-    csuite_buyers = insider_data.get("csuite_buyers", [])
-    days_since    = insider_data.get("days_since_buy", 999)
-    market_cap    = market_data.get("market_cap")
-
-    # ── Signaalsterkte (max 3) — afgeleid van buy/sell verhouding ─────────────
-    if total_buy > 0 and total_sell < total_buy * 0.2:
-        raw += 3
-        redenen.append("Sterke overtuiging: buys domineren")
-    elif total_buy > 0 and total_buy >= total_sell:
-        raw += 2
-        redenen.append("Positief signaal: meer buys dan sells")
-    elif total_buy > 0:
-        raw += 1
-        redenen.append("Gemengd signaal: buys én sells aanwezig")
-
-    # ── C-suite koper (max 2, min -3) ─────────────────────────────────────────
-    csuite_in_detail = [b for b in buys_detail if _is_csuite(b.get("role", ""))]
-    csuite_sellers_d = [b for b in sells_detail if _is_csuite(b.get("role", ""))]
-    all_csuite_buy   = list({b["insider"] for b in csuite_in_detail} | set(csuite_buyers))
-    all_csuite_sell  = [b["insider"] for b in csuite_sellers_d]
-
-    if all_csuite_buy and not all_csuite_sell:
-        raw += 2
-        redenen.append(f"C-suite koper(s): {', '.join(all_csuite_buy[:3])}")
-    elif all_csuite_buy and all_csuite_sell:
-        redenen.append("C-suite koopt én verkoopt — gemengd")
-    elif all_csuite_sell:
-        raw -= 3
-        redenen.append(f"C-suite verkoopt: {', '.join(all_csuite_sell[:2])}")
-
-    # ── Versheid (max 3) ──────────────────────────────────────────────────────
-    if days_since <= 7:
-        raw += 3
-        redenen.append(f"Extreem vers: {days_since}d geleden")
-    elif days_since <= 14:
-        raw += 2
-        redenen.append(f"Vers signaal: {days_since}d geleden")
-    elif days_since <= 30:
-        raw += 1
-        redenen.append(f"Recent signaal: {days_since}d geleden")
-
-    # ── Cluster ≥ 3 kopers ≤ 30d (max 1) ─────────────────────────────────────
-    if unique_buyers >= 3 and days_since <= 30:
-        raw += 1
-        redenen.append(f"Koop-cluster: {unique_buyers} unieke insiders")
-
-    # ── Koopomvang (max 2) — marktcap% indien beschikbaar, anders absoluut ────
-    if market_cap and market_cap > 0 and total_buy > 0:
-        pct = total_buy / market_cap * 100
-        if pct >= 1.0:
-            raw += 2
-            redenen.append(f"Grote buy: {pct:.2f}% van marktcap")
-        elif pct >= 0.1:
-            raw += 1
-            redenen.append(f"Significante buy: {pct:.2f}% van marktcap")
-    elif total_buy > 0:
-        if total_buy >= 5_000_000:
-            raw += 2
-            redenen.append(f"Grote absolute buy: ${total_buy/1e6:.1f}M")
-        elif total_buy >= 1_000_000:
-            raw += 1
-            redenen.append(f"Significante buy: ${total_buy/1e6:.1f}M")
-
-    # ── Netto positief (max 1) ────────────────────────────────────────────────
-    if total_buy > total_sell and not all_csuite_sell:
-        raw += 1
-        redenen.append("Netto koopdruk")
-
-    # Normaliseer naar 1-10 (max ruwe score = 12)
-    score = round(max(0, raw) / 12 * 10)
-    return max(0, min(10, score)), redenen
+    row    = candidate_row(insider_data, market_data)
+    scores = scoring.score_batch([row], "candidate/1")
+    return int(scores.score[0]), scoring.explain(scores, 0, row)
+
+
+def candidate_row(insider_data: dict, market_data: dict) -> dict:
+    """Scoring-invoer voor een kandidaat: C-suite kopers/verkopers ook uit de detailregels."""
+    csuite_in_detail = [b for b in insider_data.get("buys_detail", []) if _is_csuite(b.get("role", ""))]
+    csuite_sellers_d = [b for b in insider_data.get("sells_detail", []) if _is_csuite(b.get("role", ""))]
+    return {
+        **insider_data,
+        "csuite_buyers":  list({b["insider"] for b in csuite_in_detail} | set(insider_data.get("csuite_buyers", []))),
+        "csuite_sellers": [b["insider"] for b in csuite_sellers_d],
+        "market_cap":     market_data.get("market_cap"),
+    }
 
 
 # ── Telegram formatting ───────────────────────────────────────────────────────
@@ -549,10 +427,9 @@ def send_telegram(message: str, bot_token: str, chat_id: str) -> bool:
         "text":       message,
         "parse_mode": "HTML",
     }).encode()
-    req = Request(url, data=data, method="POST")
     try:
-        with urlopen(req, timeout=15) as r:
-            return r.status == 200
+        r = http_client.post(url, data, timeout=15)
+        return r.status == 200
     except Exception as e:
         print(f"[warn] Telegram send fout: {e}", file=sys.stderr)
         return False
@@ -591,82 +468,11 @@ def load_candidates_from_monitor(
 def score_portfolio_position(r: dict) -> tuple[int, list[str]]:
     """
     Bereken een score (1-10) voor een bestaande portfoliopositie.
-    Zelfde herziene schaal als score_position() in portfolio_monitor.py:
-      9-10 : CEO koopt $5M+ binnen 7d, groot cluster, nul sells
-      7-8  : Sterke overtuiging, C-suite, vers en cluster
-      5-6  : Positief signaal met C-suite maar minder vers/groot
-      3-4  : Positief signaal zonder C-suite of verouderd
-      1-2  : Gemengd of zwak signaal
-    Ruwe punten (max 12) genormaliseerd naar 1-10.
+    Zelfde rule set ("position/1", insider/scoring.py) als score_position() in
+    portfolio_monitor.py; redenen beginnen met het signaallabel.
     """
-    raw = 0
-    redenen = []
-
-    signal         = r.get("signal", "UNKNOWN")
-    days           = r.get("days_since_buy", 999)
-    csuite_buyers  = r.get("csuite_buyers", [])
-    csuite_sellers = r.get("csuite_sellers", [])
-    unique_buyers  = r.get("unique_buyers", 0)
-    total_buy      = r.get("total_buy", 0)
-    net_flow       = r.get("net_flow_clean", r.get("net_flow", 0))
-
-    # Signaalsterkte (max 3)
-    raw += {
-        "STERKE OVERTUIGING": 3,
-        "POSITIEF SIGNAAL":   2,
-        "GEMENGD SIGNAAL":    1,
-        "NEGATIEF SIGNAAL":   0,
-        "SIGNAAL UITGEWERKT": 0,
-    }.get(signal, 0)
-
-    # C-suite kwaliteit (max 2, min -3)
-    if csuite_buyers and not csuite_sellers:
-        raw += 2
-        redenen.append(f"C-suite koopt: {', '.join(csuite_buyers[:2])}")
-    elif csuite_buyers and csuite_sellers:
-        raw += 0
-        redenen.append(f"C-suite koopt én verkoopt — gemengd signaal")
-    elif csuite_sellers:
-        raw -= 3  # Open market sell door C-suite = sterk negatief
-        redenen.append(f"C-suite verkoopt open market: {', '.join(csuite_sellers[:2])}")
-
-    # Versheid (max 3)
-    if days <= 7:
-        raw += 3
-        redenen.append(f"Extreem vers ({days}d)")
-    elif days <= 14:
-        raw += 2
-        redenen.append(f"Vers signaal ({days}d)")
-    elif days <= 30:
-        raw += 1
-        redenen.append(f"Actief signaal ({days}d)")
-    else:
-        redenen.append(f"Ouder signaal ({days}d)")
-
-    # Cluster (max 1)
-    if unique_buyers >= 3 and days <= 30:
-        raw += 1
-        redenen.append(f"Cluster: {unique_buyers} kopers")
-
-    # Koopomvang (max 2)
-    if total_buy >= 5_000_000:
-        raw += 2
-        redenen.append(f"Grote buy: ${total_buy/1e6:.1f}M")
-    elif total_buy >= 1_000_000:
-        raw += 1
-        redenen.append(f"Significante buy: ${total_buy/1e6:.1f}M")
-
-    # Netto positief (max 1)
-    if net_flow > 0 and not csuite_sellers:
-        raw += 1
-        redenen.append("Geen netto sells")
-
-    # Signaal label als eerste reden
-    redenen.insert(0, signal)
-
-    # Normaliseer naar 1-10 (max ruwe score = 12)
-    score = round(max(0, raw) / 12 * 10)
-    return max(0, min(10, score)), redenen
+    scores = scoring.score_batch([r], "position/1")
+    return int(scores.score[0]), scoring.explain(scores, 0, r)
 
 
 def portfolio_comparison(monitor_json: Path, portfolio_set: set) -> list[dict]:
@@ -680,12 +486,12 @@ def portfolio_comparison(monitor_json: Path, portfolio_set: set) -> list[dict]:
     except Exception:
         return []
 
-    scored = []
-    for r in results:
-        if r.get("ticker", "").upper() not in portfolio_set:
-            continue
-        score, redenen = score_portfolio_position(r)
-        scored.append({**r, "pos_score": score, "pos_redenen": redenen})
+    positions = [r for r in results if r.get("ticker", "").upper() in portfolio_set]
+    scores    = scoring.score_batch(positions, "position/1")
+    scored    = [
+        {**r, "pos_score": int(scores.score[i]), "pos_redenen": scoring.explain(scores, i, r)}
+        for i, r in enumerate(positions)
+    ]
 
     scored.sort(key=lambda x: (x["pos_score"], -x.get("days_since_buy", 0)))
     return scored
@@ -696,79 +502,210 @@ def weakest_portfolio_position(monitor_json: Path, portfolio_set: set) -> dict |
     return positions[0] if positions else None
 
 
-def research_ticker(
-    ticker: str,
-    reports_dir: Path,
-    send_tg: bool,
-    bot_token: str,
-    chat_id: str,
-    monitor_json: Path | None = None,
-    portfolio_set: set | None = None,
-) -> dict:
-    """
-    Voer volledig onderzoek uit op één ticker.
-    Geeft research-resultaat dict terug.
-    """
-    ticker = ticker.upper()
-    print(f"[research] Analyseer {ticker}...", file=sys.stderr)
-
-    # 1. Laad insider data uit deepdive JSON
-    insider_data = load_deepdive_for_ticker(ticker, reports_dir)
-    if not insider_data["buys_detail"]:
-        print(f"[research] {ticker}: geen deepdive data gevonden — sla over", file=sys.stderr)
-
-    # 2. Yahoo Finance marktdata (met graceful degradatie)
-    market_data: dict = {
-        "market_cap":     None,
-        "price_now":      None,
-        "price_30d_ago":  None,
-        "pct_change_30d": None,
-    }
+@dataclass
+class ResearchContext:
+    """Gedeelde state van een research-batch, één keer geladen i.p.v. per kandidaat:
+    de deepdive-JSON's (geïmporteerd in de transactie-store) en de gescoorde
+    portfolioposities uit de monitor JSON."""
+    reports_dir: Path
+    send_tg: bool = False
+    bot_token: str = ""
+    chat_id: str = ""
+    positions: list[dict] = field(default_factory=list)   # portfolio_comparison(), zwakste eerst
+
+    @classmethod
+    def load(cls, reports_dir: Path, monitor_json: Path | None = None, portfolio_set: set | None = None,
+             **kwargs) -> "ResearchContext":
+        """Fouten zijn niet fataal: de store houdt de vorige import, zonder
+        portfolio vervalt alleen de vergelijking met de zwakste positie."""
+        try:
+            TX_STORE.sync_reports(reports_dir)
+        except Exception as e:
+            print(f"[warn] deepdive-import in de transactie-store mislukt: {e} — ga door met de bestaande data",
+                  file=sys.stderr)
+        positions = []
+        if monitor_json and portfolio_set:
+            try:
+                positions = portfolio_comparison(monitor_json, portfolio_set)
+            except Exception as e:
+                print(f"[warn] portfolio-vergelijking mislukt: {e} — ga door zonder", file=sys.stderr)
+        return cls(reports_dir, positions=positions, **kwargs)
+
+    @property
+    def weakest(self) -> dict | None:
+        return self.positions[0] if self.positions else None
+
+
+def _market_data(ticker: str) -> tuple[dict, float]:
+    """get_market_data met graceful degradatie; geeft ook de duur terug."""
+    t0 = time.time()
     try:
-        market_data = get_market_data(ticker)
+        data = get_market_data(ticker)
     except Exception as e:
         print(f"[warn] {ticker}: Yahoo Finance fout: {e} — ga door zonder marktcap", file=sys.stderr)
+        data = {"market_cap": None, "price_now": None, "price_30d_ago": None, "pct_change_30d": None}
+    return data, time.time() - t0
 
-    # 3. Nieuws headlines (optioneel, fout is niet fataal)
-    news_headlines: list[str] = []
+
+def _news(ticker: str) -> tuple[list[str], float]:
+    """Nieuws headlines (optioneel, fout is niet fataal); geeft ook de duur terug."""
+    t0 = time.time()
     try:
-        news_headlines = get_news_headlines(ticker)
+        headlines = get_news_headlines(ticker)
     except Exception as e:
         print(f"[warn] {ticker}: nieuws ophalen mislukt: {e}", file=sys.stderr)
+        headlines = []
+    return headlines, time.time() - t0
 
-    # 4. Score berekenen
-    score, score_redenen = score_candidate(ticker, insider_data, market_data)
-    print(f"[research] {ticker}: score {score}/10 — {', '.join(score_redenen)}", file=sys.stderr)
 
-    # 4b. Portfoliovergelijking (voor herbalanceringsadvies)
-    all_positions: list[dict] = []
-    weakest = None
-    if monitor_json and portfolio_set:
-        all_positions = portfolio_comparison(monitor_json, portfolio_set)
-        weakest = all_positions[0] if all_positions else None
+def _per_candidate(fn, items: dict[str, object], errors: dict[str, Exception]) -> dict[str, object]:
+    """fn(lijst) → lijst, in één batch over alle kandidaten. Faalt de batch, dan
+    per kandidaat opnieuw: een fout komt zo alleen in `errors` van die kandidaat."""
+    try:
+        return dict(zip(items, fn(list(items.values()))))
+    except Exception:
+        out = {}
+        for t, v in items.items():
+            try:
+                out[t] = fn([v])[0]
+            except Exception as e:
+                errors[t] = e
+        return out
+
+
+def _bounds(rows: list[dict]) -> list[int]:
+    return scoring.upper_bound(scoring.columns(rows), "candidate/1").tolist()
+
+
+def _scores(rows: list[dict]) -> list[tuple[int, list[str]]]:
+    scores = scoring.score_batch(rows, "candidate/1")
+    return [(int(scores.score[i]), scoring.explain(scores, i, row)) for i, row in enumerate(rows)]
+
+
+def research_batch(tickers: list[str], ctx: ResearchContext, workers: int = WORKERS,
+                   prune: bool = True) -> list[dict]:
+    """
+    Onderzoek een lijst kandidaten in één batch; resultaten in de volgorde van `tickers`.
+
+    In fasen, de dure pas als de goedkope er ruimte voor laten:
+
+      1. insider  lokaal uit de deepdive-data; per kandidaat een bovengrens op de
+                  score (scoring.upper_bound: alleen de koopomvang hangt nog van
+                  de marktcap af). Kan een kandidaat MIN_SCORE niet meer halen,
+                  dan vervallen marktdata en nieuws (prune=False: altijd ophalen).
+      2. netwerk  marktdata + nieuws van de overgebleven kandidaten tegelijk in een
+                  thread pool; per host begrenst insider/concurrency.py (AIMD) hoeveel
+                  requests er tegelijk onderweg zijn, apart voor sec.gov en yahoo.com.
+      3. scoring  alle kandidaten in één batch, daarna de berichten in vaste volgorde.
+
+    Een fout bij één kandidaat (ook bij het opbouwen of scoren van zijn rij)
+    wordt de error-rij van die kandidaat en raakt de rest niet.
+    """
+    tickers = [t.upper() for t in tickers]
+    print(f"[research] Analyseer {len(tickers)} kandidaat(en): {', '.join(tickers)}", file=sys.stderr)
+    t0 = time.time()
+
+    # Fase 1: insider-data en de hoogst haalbare score
+    insider: dict[str, dict] = {}
+    base:    dict[str, dict] = {}   # Scoring-rij zonder marktdata, voor de bovengrens
+    errors:  dict[str, Exception] = {}
+    for t in tickers:
+        try:
+            insider[t] = load_deepdive_for_ticker(t, ctx.reports_dir)
+            base[t]    = candidate_row(insider[t], {})
+        except Exception as e:
+            errors[t] = e
+            continue
+        if not insider[t]["buys_detail"]:
+            print(f"[research] {t}: geen deepdive data gevonden — sla over", file=sys.stderr)
+    bound  = _per_candidate(_bounds, base, errors)
+    loaded = [t for t in tickers if t in bound]
+    fetch  = [t for t in loaded if not prune or bound[t] >= MIN_SCORE]
+    pruned = [t for t in loaded if t not in set(fetch)]
+    for t in pruned:
+        print(f"[research] {t}: max. score {bound[t]}/10 < {MIN_SCORE} — geen marktdata/nieuws", file=sys.stderr)
+
+    # Fase 2: netwerkcalls alleen voor kandidaten die de drempel nog kunnen halen
+    gathered: dict[str, tuple] = {t: ({}, [], 0.0, 0.0) for t in pruned}
+    t1 = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        market = {t: pool.submit(_market_data, t) for t in fetch}
+        news   = {t: pool.submit(_news, t) for t in fetch}
+        for t in fetch:
+            try:
+                (md, t_md), (nh, t_nh) = market[t].result(), news[t].result()
+                gathered[t] = (md, nh, max(t_md, t_nh), t_md + t_nh)
+            except Exception as e:
+                errors[t] = e
+    t_net = time.time() - t1
+
+    # Fase 3: alle kandidaten in één scoring-batch
+    rows: dict[str, dict] = {}
+    for t in loaded:
+        if t not in gathered:
+            continue
+        try:
+            rows[t] = candidate_row(insider[t], gathered[t][0])
+        except Exception as e:
+            errors[t] = e
+    scored = _per_candidate(_scores, rows, errors)
+    results: dict[str, dict] = {}
+    for t in loaded:
+        if t not in scored:
+            continue
+        md, nh, slowest, _ = gathered[t]
+        score, reasons = scored[t]
+        try:
+            results[t] = _report(t, insider[t], md, nh, score, reasons, ctx)
+            results[t]["research_secs"] = round(slowest, 2)
+            results[t]["score_max"]     = bound[t]
+            if t in pruned:
+                results[t]["pruned"] = f"max. score {bound[t]} < {MIN_SCORE}"
+        except Exception as e:
+            errors[t] = e
+
+    out = []
+    for t in tickers:
+        if t in results:
+            out.append(results[t])
+        else:
+            print(f"[error] {t}: onverwachte fout: {errors[t]}", file=sys.stderr)
+            out.append({"ticker": t, "error": str(errors[t]),
+                        "analyzed_at": datetime.now().isoformat(timespec="seconds")})
+
+    print(f"[research] {len(tickers)} kandidaat(en) in {time.time() - t0:.1f}s: "
+          f"{len(fetch)} met marktdata/nieuws, {len(pruned)} afgevallen na de insider-fase "
+          f"({2 * len(pruned)} netwerkcalls bespaard)", file=sys.stderr)
+    if fetch and any(t in gathered for t in fetch):
+        done    = [t for t in fetch if t in gathered]
+        total   = sum(gathered[t][3] for t in done)
+        slowest = max(done, key=lambda t: gathered[t][2])
+        print(f"[research] netwerk {t_net:.1f}s (opgeteld {total:.1f}s; traagste {slowest} "
+              f"{gathered[slowest][2]:.1f}s)", file=sys.stderr)
+    return out
+
+
+def _report(ticker: str, insider_data: dict, market_data: dict, news_headlines: list[str],
+            score: int, score_redenen: list[str], ctx: ResearchContext) -> dict:
+    """Telegram-bericht (bij score >= MIN_SCORE) en het research-resultaat van één kandidaat."""
+    print(f"[research] {ticker}: score {score}/10 — {', '.join(score_redenen)}", file=sys.stderr)
 
-    # 5. Telegram bericht (alleen bij score >= MIN_SCORE)
+    # Telegram bericht (alleen bij score >= MIN_SCORE)
     tg_sent = False
-    if score >= MIN_SCORE and send_tg:
+    if score >= MIN_SCORE:
         msg = format_telegram_message(
             ticker, insider_data, market_data, score, score_redenen,
-            news_headlines, weakest_position=weakest,
-            portfolio_positions=all_positions,
+            news_headlines, weakest_position=ctx.weakest,
+            portfolio_positions=ctx.positions,
         )
-        if bot_token and chat_id:
-            tg_sent = send_telegram(msg, bot_token, chat_id)
+        if ctx.send_tg and ctx.bot_token and ctx.chat_id:
+            tg_sent = send_telegram(msg, ctx.bot_token, ctx.chat_id)
             status = "verstuurd" if tg_sent else "MISLUKT"
             print(f"[research] {ticker}: Telegram {status}", file=sys.stderr)
         else:
-            print(f"[warn] Telegram tokens niet geconfigureerd — bericht niet verstuurd", file=sys.stderr)
+            if ctx.send_tg:
+                print(f"[warn] Telegram tokens niet geconfigureerd — bericht niet verstuurd", file=sys.stderr)
             print(f"\n{'─'*60}\n{msg}\n{'─'*60}\n")
-    elif score >= MIN_SCORE:
-        msg = format_telegram_message(
-            ticker, insider_data, market_data, score, score_redenen,
-            news_headlines, weakest_position=weakest,
-            portfolio_positions=all_positions,
-        )
-        print(f"\n{'─'*60}\n{msg}\n{'─'*60}\n")
 
     # Marktcap voor percentage-berekening in output
     market_cap = market_data.get("market_cap")
@@ -799,6 +736,24 @@ def research_ticker(
     }
 
 
+def research_ticker(
+    ticker: str,
+    reports_dir: Path,
+    send_tg: bool,
+    bot_token: str,
+    chat_id: str,
+    monitor_json: Path | None = None,
+    portfolio_set: set | None = None,
+) -> dict:
+    """
+    Voer volledig onderzoek uit op één ticker (research_batch met één kandidaat).
+    Geeft research-resultaat dict terug.
+    """
+    ctx = ResearchContext.load(reports_dir, monitor_json, portfolio_set,
+                               send_tg=send_tg, bot_token=bot_token, chat_id=chat_id)
+    return research_batch([ticker], ctx)[0]
+
+
 # ── CLI ────────────────────────────────────────────────────────────────────────
 
 def parse_args() -> argparse.Namespace:
@@ -838,6 +793,18 @@ def parse_args() -> argparse.Namespace:
         metavar="DIR",
         help="Output directory voor JSON resultaten (default: data/reports)",
     )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        metavar="N",
+        help=f"Gelijktijdige netwerkcalls over alle kandidaten (default: {WORKERS})",
+    )
+    p.add_argument(
+        "--full",
+        action="store_true",
+        help="Marktdata en nieuws ook ophalen voor kandidaten die de minimale score niet meer kunnen halen",
+    )
     p.add_argument(
         "--min-score",
         type=int,
@@ -900,26 +867,9 @@ def main() -> None:
         else Path(args.output_dir) / "portfolio_monitor.json"
     )
 
-    all_results: list[dict] = []
-    for ticker in candidates:
-        try:
-            result = research_ticker(
-                ticker       = ticker,
-                reports_dir  = reports_dir,
-                send_tg      = args.telegram,
-                bot_token    = bot_token,
-                chat_id      = chat_id,
-                monitor_json = monitor_json_path,
-                portfolio_set= portfolio_set,
-            )
-            all_results.append(result)
-        except Exception as e:
-            print(f"[error] {ticker}: onverwachte fout: {e}", file=sys.stderr)
-            all_results.append({
-                "ticker": ticker,
-                "error":  str(e),
-                "analyzed_at": datetime.now().isoformat(timespec="seconds"),
-            })
+    ctx = ResearchContext.load(reports_dir, monitor_json_path, portfolio_set,
+                               send_tg=args.telegram, bot_token=bot_token, chat_id=chat_id)
+    all_results = research_batch(candidates, ctx, workers=args.workers, prune=not args.full)
 
     # Sla resultaten op
     today_str = datetime.now().strftime("%Y-%m-%d")
@@ -929,6 +879,8 @@ def main() -> None:
         encoding="utf-8",
     )
     print(f"[research] Resultaten opgeslagen: {out_path}", file=sys.stderr)
+    print(f"[cache] {PRICES.summary()}", file=sys.stderr)
+    print(f"[http] {concurrency.LIMITS.summary()}", file=sys.stderr)
 
     # Console samenvatting
     strong = [r for r in all_results if r.get("score", 0) >= MIN_SCORE]
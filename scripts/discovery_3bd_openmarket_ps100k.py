@@ -14,7 +14,6 @@ import argparse
 import csv
 import json
 import os
-import re
 import sys
 import time
 import threading
@@ -22,22 +21,43 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta
 from pathlib import Path
 
-import requests
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from insider import concurrency, daily_index, efts, form4, http_client
+from insider.accession_store import AccessionStore
+from insider.doc_cache import FORM4_CACHE
+from insider.http_cache import HTTP_CACHE
+from insider.ratelimit import SEC_LIMITER
 
 UA = os.getenv("SEC_USER_AGENT", "InsiderMonitor/1.0 (contact: you@example.com)")
 HEADERS = {"User-Agent": UA, "Accept": "application/json"}
 
 NON_SIGNAL_CODES = {"M", "C", "A", "D", "G", "L", "W", "Z", "J", "K"}
 MIN_BUY_USD  = 100_000
-MAX_WORKERS  = 3    # 3 workers × ~0.4s per request = ~7.5 req/sec, ruim binnen SEC limiet van 10/sec
-REQUEST_DELAY = 0.4   # seconden tussen requests per worker
+IPO_MIN_DAYS = 365  # Bedrijf moet minimaal 1 jaar genoteerd zijn
+MAX_WORKERS  = 8    # Bovengrens workers; requests in flight regelt insider/concurrency.py (AIMD), rate SEC_MAX_RPS
+REQUEST_DELAY = 0.0   # Optionele minimale pauze per request voor dit proces (0 = eerlijk aandeel)
+
+# Verwerkte accessions + resultaat: bij overlappende runs alleen nieuwe filings ophalen.
+# De source bevat de filterregels van _buys_from_xml (drempel, IPO; v = overige regels
+# zoals de 10%-owner-uitsluiting): een wijziging daarin maakt de store ongeldig.
+PROCESSED = AccessionStore(source=f"discovery_openmarket/{MIN_BUY_USD}/{IPO_MIN_DAYS}/v1")
 
 
 # ── EFTS filings ophalen ──────────────────────────────────────────────────────
 
+def _fetch_efts(url: str) -> dict:
+    """Eén EFTS-pagina. Fouten (HTTPError met status) worden door insider.efts gelogd."""
+    SEC_LIMITER.acquire()
+    return concurrency.get(url, headers=HEADERS, timeout=15).json()
+
+
 def get_filings_efts(days_back: int = 3) -> list[dict]:
     """Haal Form 4 filings op via SEC EFTS search API.
 
+    Pagina 2..n worden parallel opgehaald zodra het totaal bekend is; ranges
+    boven de EFTS-resultaatlimiet worden per datum gesplitst (insider/efts.py).
+
     Returns lijst van dicts met: adsh, xml_filename, file_date, cik
     """
     today = date.today()
@@ -45,166 +65,128 @@ def get_filings_efts(days_back: int = 3) -> list[dict]:
     end   = today.isoformat()
 
     filings = []
-    page_size = 100
-    offset    = 0
-
-    while True:
-        url = (
-            f"https://efts.sec.gov/LATEST/search-index?forms=4"
-            f"&dateRange=custom&startdt={start}&enddt={end}"
-            f"&from={offset}"
-        )
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=15)
-            if r.status_code != 200:
-                print(f"[warn] EFTS status {r.status_code} — stop paginering", file=sys.stderr)
-                break
-            data  = r.json()
-            hits  = data.get("hits", {}).get("hits", [])
-            total = data.get("hits", {}).get("total", {}).get("value", 0)
-
-            if not hits:
-                break
-
-            for h in hits:
-                src  = h.get("_source", {})
-                adsh = src.get("adsh") or h.get("_id", "").split(":")[0]
-                # XML bestandsnaam zit in _id na ":"
-                raw_id   = h.get("_id", "")
-                xml_file = raw_id.split(":")[-1] if ":" in raw_id else "form4.xml"
-                # CIK: gebruik ciks[0] uit _source — dit is de reporting owner CIK
-                # (adsh-prefix is de filing agent CIK, niet de owner — levert 404 op)
-                ciks_list = src.get("ciks", [])
-                filer_cik = str(int(ciks_list[0])) if ciks_list else (adsh.replace("-", "")[:10].lstrip("0") or "0")
-                filings.append({
-                    "adsh":     adsh,
-                    "xml_file": xml_file,
-                    "file_date": src.get("file_date", ""),
-                    "cik":      filer_cik,
-                })
-
-            offset += len(hits)
-            if offset >= total:
-                break
-
-        except Exception as e:
-            print(f"[warn] EFTS fout: {e}", file=sys.stderr)
-            break
+    for h in efts.search(start, end, _fetch_efts):
+        src  = h.get("_source", {})
+        adsh = src.get("adsh") or h.get("_id", "").split(":")[0]
+        # XML bestandsnaam zit in _id na ":"
+        raw_id   = h.get("_id", "")
+        xml_file = raw_id.split(":")[-1] if ":" in raw_id else "form4.xml"
+        # CIK: gebruik ciks[0] uit _source — dit is de reporting owner CIK
+        # (adsh-prefix is de filing agent CIK, niet de owner — levert 404 op)
+        ciks_list = src.get("ciks", [])
+        filer_cik = str(int(ciks_list[0])) if ciks_list else (adsh.replace("-", "")[:10].lstrip("0") or "0")
+        filings.append({
+            "adsh":     adsh,
+            "xml_file": xml_file,
+            "file_date": src.get("file_date", ""),
+            "cik":      filer_cik,
+        })
 
     print(f"[info] {len(filings)} Form 4 filings gevonden via EFTS ({start} → {end})", file=sys.stderr)
     return filings
 
 
-# ── XML ophalen ───────────────────────────────────────────────────────────────
+def _fetch_index(url: str) -> str:
+    """Dag-index ophalen; 404 (nog niet gepubliceerd) gaat als HTTPError door. 403 kan
+    throttling zijn: backoff, daarna beslist DailyIndex via de kwartaal-listing."""
+    for attempt in range(3):
+        SEC_LIMITER.acquire()
+        try:
+            return concurrency.get(url, headers=HEADERS, timeout=30).text
+        except http_client.HTTPError as e:
+            if e.code == 403 and attempt < 2:
+                time.sleep(concurrency.retry_wait(e, attempt))
+                continue
+            if not concurrency.is_overload(e) or attempt == 2:
+                raise
+        except OSError as e:
+            if attempt == 2:
+                raise
+            time.sleep(concurrency.retry_wait(e, attempt))
+    raise ConnectionError(url)
 
-RATE_LIMITED      = threading.Event()
-RATE_LIMIT_COUNT  = 0
-RATE_LIMIT_LOCK   = threading.Lock()
-RATE_LIMIT_THRESHOLD = 20  # Na 20 × 429 → circuit breaker aan (harde stop)
-_REQUEST_SEMAPHORE = threading.Semaphore(MAX_WORKERS)
-PAUSE_ON_429 = 15  # Seconden pauze bij 429 voordat we doorgaan
 
+def get_filings_index(days_back: int = 3) -> list[dict]:
+    """Haal Form 4 filings op via de EDGAR dag-index (één request per werkdag).
 
-def fetch_with_retry(url: str, retries: int = 3, backoff: float = 3.0) -> requests.Response | None:
-    """GET met rate limiting + retry bij 429 + circuit breaker.
-    Bij 429: pauze en retry (geen harde stop tenzij threshold bereikt).
+    Afgelopen dagen komen uit de on-disk cache (insider/daily_index.py); dezelfde
+    range geeft altijd dezelfde lijst. Zelfde dict-vorm als get_filings_efts().
     """
-    global RATE_LIMIT_COUNT
-    if RATE_LIMITED.is_set():
-        return None
+    today   = date.today()
+    start   = today - timedelta(days=days_back)
+    index   = daily_index.DailyIndex(_fetch_index)
+    filings = index.filings(start, today)
+    print(f"[info] {len(filings)} Form 4 filings gevonden via dag-index ({start} → {today})", file=sys.stderr)
+    print(f"[cache] {index.summary()}", file=sys.stderr)
+    return filings
+
+
+# ── XML ophalen ───────────────────────────────────────────────────────────────
 
-    time.sleep(REQUEST_DELAY)  # Rate limiter: max ~7.5 req/sec totaal
+def fetch_with_retry(url: str, retries: int = 3) -> http_client.Response | None:
+    """GET met rate limiting + adaptieve concurrency + retry.
 
+    Bij 429/5xx pauzeert de host-limiter (Retry-After, gedeeld door alle workers
+    en via SEC_LIMITER ook door andere processen) en verlaagt de concurrency;
+    de retry wacht daar vanzelf op.
+    """
     for attempt in range(retries):
+        SEC_LIMITER.acquire()   # Gedeelde rate over alle processen
         try:
-            r = requests.get(url, headers=HEADERS, timeout=10)
-            if r.status_code == 200:
-                # Succesvolle request: reset teller gedeeltelijk
-                with RATE_LIMIT_LOCK:
-                    if RATE_LIMIT_COUNT > 0:
-                        RATE_LIMIT_COUNT = max(0, RATE_LIMIT_COUNT - 1)
-                return r
-            if r.status_code == 429:
-                with RATE_LIMIT_LOCK:
-                    RATE_LIMIT_COUNT += 1
-                    count = RATE_LIMIT_COUNT
-                if count >= RATE_LIMIT_THRESHOLD:
-                    RATE_LIMITED.set()
-                    print("[warn] Circuit breaker: SEC rate limit actief — discovery gestopt", file=sys.stderr)
-                    return None
-                # Pauze en daarna retry
-                wait = PAUSE_ON_429 * (attempt + 1)
-                print(f"[warn] 429 rate limit ({count}/{RATE_LIMIT_THRESHOLD}) — wacht {wait}s", file=sys.stderr)
-                time.sleep(wait)
-                continue
-            return None
-        except requests.RequestException:
-            time.sleep(backoff)
+            return concurrency.get(url, headers=HEADERS, timeout=10)
+        except http_client.HTTPError as e:
+            if not concurrency.is_overload(e):
+                return None   # 404 / overige 4xx: niet opnieuw proberen
+        except OSError as e:
+            if attempt < retries - 1:
+                time.sleep(concurrency.retry_wait(e, attempt))
     return None
 
 
+def _fetch_text(url: str) -> str:
+    r = fetch_with_retry(url)
+    return r.text if r is not None else ""
+
+
+def _is_form4_xml(text: str) -> bool:
+    return "ownershipDocument" in text or "transactionCode" in text
+
+
 def fetch_xml(filing: dict) -> str | None:
-    """Haal Form 4 XML op — URL rechtstreeks van EFTS, geen index-pagina nodig."""
+    """Haal Form 4 XML op — URL rechtstreeks van EFTS, geen index-pagina nodig.
+
+    Gaat via de gedeelde document-cache: een filing wordt maar één keer gedownload.
+    """
     adsh     = filing["adsh"]
     cik      = filing["cik"]
     xml_file = filing["xml_file"]
     acc_no   = adsh.replace("-", "")
 
     xml_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{acc_no}/{xml_file}"
-    r = fetch_with_retry(xml_url)
-    if r and ("ownershipDocument" in r.text or "transactionCode" in r.text):
-        return r.text
+    text = FORM4_CACHE.fetch(xml_url, _fetch_text, validate=_is_form4_xml)
+    if text and _is_form4_xml(text):
+        return text
 
     # Fallback: probeer alternatieve bestandsnamen
     for alt in ["form4.xml", "primarydocument.xml"]:
         if alt == xml_file:
             continue
-        r2 = fetch_with_retry(f"https://www.sec.gov/Archives/edgar/data/{cik}/{acc_no}/{alt}")
-        if r2 and "ownershipDocument" in r2.text:
-            return r2.text
+        text = FORM4_CACHE.fetch(f"https://www.sec.gov/Archives/edgar/data/{cik}/{acc_no}/{alt}",
+                                 _fetch_text, validate=lambda t: "ownershipDocument" in t)
+        if text and "ownershipDocument" in text:
+            return text
     return None
 
 
-# ── XML parsen ────────────────────────────────────────────────────────────────
-
-def extract_transactions(xml: str) -> list[dict]:
-    txs = []
-    for block in re.findall(r"<nonDerivativeTransaction>(.*?)</nonDerivativeTransaction>", xml, re.S):
-        code_m   = re.search(r"<transactionCode>(.*?)</transactionCode>", block)
-        shares_m = re.search(r"<transactionShares>.*?<value>(.*?)</value>", block, re.S)
-        price_m  = re.search(r"<transactionPricePerShare>.*?<value>(.*?)</value>", block, re.S)
-        if not code_m:
-            continue
-        code = code_m.group(1).strip().upper()
-        try:
-            shares = float(shares_m.group(1)) if shares_m else 0
-            price  = float(price_m.group(1))  if price_m  else 0
-        except (ValueError, TypeError):
-            continue
-        txs.append({"code": code, "total": shares * price})
-    return txs
-
-
-def extract_meta(xml: str) -> dict:
-    def g(tag):
-        m = re.search(fr"<{tag}>(.*?)</{tag}>", xml)
-        return m.group(1).strip() if m else ""
-    return {
-        "ticker":           g("issuerTradingSymbol"),
-        "issuer":           g("issuerName"),
-        "owner":            g("rptOwnerName"),
-        "role":             g("officerTitle"),
-        "isDirector":       g("isDirector"),
-        "isOfficer":        g("isOfficer"),
-        "isTenPercentOwner": g("isTenPercentOwner"),
-    }
-
-
 # ── IPO filter ────────────────────────────────────────────────────────────────
 
 IPO_CACHE: dict[str, bool] = {}
 IPO_CACHE_LOCK = threading.Lock()
-IPO_MIN_DAYS = 365  # Bedrijf moet minimaal 1 jaar genoteerd zijn
+
+
+def _get_submissions(url: str, headers: dict) -> http_client.Response:
+    SEC_LIMITER.acquire()
+    return concurrency.get(url, headers={**HEADERS, **headers}, timeout=10)
 
 
 def is_recent_ipo(cik: str) -> bool:
@@ -222,12 +204,12 @@ def is_recent_ipo(cik: str) -> bool:
     try:
         cik_padded = cik.zfill(10)
         url = f"https://data.sec.gov/submissions/CIK{cik_padded}.json"
-        r = requests.get(url, headers={"User-Agent": UA, "Accept": "application/json"}, timeout=10)
-        if r.status_code != 200:
+        try:
+            data = HTTP_CACHE.fetch_json(url, _get_submissions)
+        except http_client.HTTPError:
             # Bij fout: voorzichtig, behandel NIET als IPO (liever false positive dan missen)
             result = False
         else:
-            data = r.json()
             dates = data.get("filings", {}).get("recent", {}).get("filingDate", [])
             if not dates:
                 result = True  # Geen filings = onbekend, wees voorzichtig
@@ -249,38 +231,39 @@ def is_recent_ipo(cik: str) -> bool:
 def process_filing(filing: dict) -> list[dict]:
     xml = fetch_xml(filing)
     if not xml:
-        return []
+        return []   # Niet vastleggen: volgende run opnieuw proberen
+    found = _buys_from_xml(filing, xml)
+    PROCESSED.put(filing["adsh"], filing["file_date"], found)
+    return found
+
 
-    meta = extract_meta(xml)
-    txs  = extract_transactions(xml)
+def _buys_from_xml(filing: dict, xml: str) -> list[dict]:
+    doc   = form4.parse(xml)
     found = []
 
-    for t in txs:
-        if t["code"] != "P" or t["total"] < MIN_BUY_USD:
+    for t in doc.transactions:
+        if t.table != "nonDerivative" or t.code != "P" or t.amount < MIN_BUY_USD:
             continue
 
-        ticker = meta["ticker"]
+        ticker = doc.ticker
         cik    = filing["cik"]
 
         if is_recent_ipo(cik):
             print(f"[skip] {ticker} — recente IPO (<{IPO_MIN_DAYS}d), geen informatief signaal", file=sys.stderr)
             continue
 
-        if (meta.get("isTenPercentOwner") == "1"
-                and meta.get("isDirector") != "1"
-                and meta.get("isOfficer") != "1"
-                and not meta["role"]):
-            print(f"[skip] {ticker} — alleen 10% owner ({meta['owner']}), lagere informatiewaarde", file=sys.stderr)
+        if doc.is_ten_pct and not doc.is_director and not doc.is_officer and not doc.officer_title:
+            print(f"[skip] {ticker} — alleen 10% owner ({doc.owner}), lagere informatiewaarde", file=sys.stderr)
             continue
 
         found.append({
             "ticker":   ticker,
-            "issuer":   meta["issuer"],
+            "issuer":   doc.issuer_name,
             "date":     filing["file_date"],
-            "insider":  meta["owner"],
-            "role":     meta["role"],
-            "code":     t["code"],
-            "notional": round(t["total"], 0),
+            "insider":  doc.owner,
+            "role":     doc.officer_title,
+            "code":     t.code,
+            "notional": round(t.amount, 0),
         })
 
     return found
@@ -293,7 +276,10 @@ def main():
     parser.add_argument("--output-dir", default="data/reports", help="Directory voor JSON/CSV output")
     parser.add_argument("--days", type=int, default=3, help="Terugkijkperiode in dagen (default: 3)")
     parser.add_argument("--workers", type=int, default=0, help="Aantal parallelle workers (0 = gebruik default)")
-    parser.add_argument("--delay", type=float, default=0.0, help="Delay per request in seconden (0 = gebruik default)")
+    parser.add_argument("--delay", type=float, default=0.0, help="Minimale delay per request in seconden (0 = eerlijk aandeel van SEC_MAX_RPS)")
+    parser.add_argument("--rescan", action="store_true", help="Negeer de accession-store en verwerk alle filings opnieuw")
+    parser.add_argument("--source", choices=["efts", "index"], default="efts",
+                        help="Filinglijst via EFTS (default) of de EDGAR dag-index (gecachet per werkdag)")
     args = parser.parse_args()
 
     # Overschrijf globale instellingen op basis van CLI args
@@ -302,19 +288,21 @@ def main():
         MAX_WORKERS = args.workers
     if args.delay > 0.0:
         REQUEST_DELAY = args.delay
+    if REQUEST_DELAY > 0.0:
+        SEC_LIMITER.max_process_rps = 1.0 / REQUEST_DELAY
 
-    # Reset circuit breaker voor elke run
-    global RATE_LIMIT_COUNT
-    RATE_LIMIT_COUNT = 0
-    RATE_LIMITED.clear()
+    filings = get_filings_efts(days_back=args.days) if args.source == "efts" else get_filings_index(days_back=args.days)
 
-    filings = get_filings_efts(days_back=args.days)
+    # Al verwerkte accessions: resultaat uit de store, geen XML-fetch
+    known = {} if args.rescan else PROCESSED.lookup([f["adsh"] for f in filings])
+    new   = [f for f in filings if f["adsh"] not in known]
+    print(f"[info] {len(filings) - len(new)} filings al verwerkt, {len(new)} nieuw", file=sys.stderr)
 
-    results      = []
+    results      = [r for rows in known.values() for r in rows]
     results_lock = threading.Lock()
 
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(process_filing, f): f for f in filings}
+        futures = {executor.submit(process_filing, f): f for f in new}
         for future in as_completed(futures):
             try:
                 found = future.result()
@@ -356,6 +344,11 @@ def main():
             writer.writerows(results)
 
     print(f"\n[info] {len(results)} resultaten geschreven naar {json_path} en {csv_path}", file=sys.stderr)
+    print(f"[cache] Form 4 {FORM4_CACHE.summary()}", file=sys.stderr)
+    print(f"[cache] {PROCESSED.summary()}", file=sys.stderr)
+    print(f"[cache] {HTTP_CACHE.summary()}", file=sys.stderr)
+    print(f"[http] {concurrency.LIMITS.summary()}", file=sys.stderr)
+    PROCESSED.prune()
 
 
 if __name__ == "__main__":
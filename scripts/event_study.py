@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Event study: cumulatief abnormaal rendement (CAR) t.o.v. de benchmark na insider-aankopen.
+
+Events zijn discovery-rijen (ticker, date, amount, is_csuite): uit de Form 4-
+historie (tabel `history`, zie backfill_form4.py, met de discovery-filters) of
+uit een JSON-bestand met zulke rijen. Koersen komen uit de lokale dagkoersen-
+store (insider/price_store.py). CAR op +5/+20/+60/+120 handelsdagen, per rol,
+omvang en cluster, plus de tabellen om de drempels in de scoring te kalibreren
+(bedrag ≥ X, instap d dagen na de filing). Zie insider/event_study.py.
+
+  python3 scripts/event_study.py --start 2016-01-01 --end 2024-12-31
+  python3 scripts/event_study.py --input data/reports/discoveries.json --offline
+  python3 scripts/event_study.py --start 2018-01-01 --json data/reports/event_study.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import monitor
+from insider import backtest, concurrency, event_study
+from insider.price_store import PRICES
+from insider.tx_store import TX_STORE
+
+
+def _cell(s: dict) -> str:
+    if not s["n"]:
+        return f"{'—':>22}"
+    return f"{s['mean'] * 100:+7.2f}% t{s['t']:+5.1f} {s['hit_rate'] * 100:4.0f}%"
+
+
+def print_table(title: str, table: dict, horizons: tuple[int, ...]) -> None:
+    print(f"\n{title:<28}{'n':>7}" + "".join(f"{f'CAR +{h}d  t  hit':>24}" for h in horizons))
+    for name, per_h in table.items():
+        n = per_h[horizons[0]]["n"]
+        if n:
+            print(f"  {str(name):<26}{n:>7}" + "".join(f"  {_cell(per_h[h])}" for h in horizons))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event study: CAR na insider-aankopen per rol, omvang en cluster")
+    parser.add_argument("--start", default="", help="Eerste eventdatum (YYYY-MM-DD)")
+    parser.add_argument("--end", default="", help="Laatste eventdatum (default vandaag)")
+    parser.add_argument("--input", default="", help="JSON met discovery-rijen i.p.v. de Form 4-historie")
+    parser.add_argument("--benchmark", default="SPY", help="Benchmark-ticker (default SPY)")
+    parser.add_argument("--horizons", default=",".join(map(str, event_study.HORIZONS)),
+                        help="Horizons in handelsdagen (default 5,20,60,120)")
+    parser.add_argument("--offline", action="store_true", help="Alleen koersen uit de lokale store")
+    parser.add_argument("--workers", type=int, default=8, help="Threads voor het ophalen van koersen")
+    parser.add_argument("--json", default="", help="Schrijf het rapport naar dit bestand")
+    args = parser.parse_args()
+
+    horizons = tuple(int(h) for h in args.horizons.split(",") if h.strip())
+    end      = date.fromisoformat(args.end) if args.end else date.today()
+
+    t0 = time.time()
+    if args.input:
+        rows = json.loads(Path(args.input).read_text(encoding="utf-8"))
+        rows = rows.get("rows", rows) if isinstance(rows, dict) else rows
+    else:
+        if not args.start:
+            parser.error("--start is verplicht zonder --input")
+        rows = monitor.history_discoveries(TX_STORE.history(since=args.start, until=end, codes=("P",)))
+    ev = event_study.Events.from_rows(rows)
+    if args.start:
+        ev = event_study.Events(**{k: v[ev.day >= date.fromisoformat(args.start).toordinal()]
+                                   for k, v in vars(ev).items()})
+    if not len(ev):
+        print("[events] geen events — draai eerst backfill_form4.py of geef --input", file=sys.stderr)
+        sys.exit(1)
+    print(f"[events] {len(rows)} rijen → {len(ev)} events, {len(set(ev.ticker.tolist()))} tickers "
+          f"in {time.time() - t0:.1f}s", file=sys.stderr)
+
+    # Koersen: van de eerste event tot ~max(horizons) handelsdagen na de laatste
+    t1      = time.time()
+    first   = date.fromordinal(int(ev.day.min()))
+    last    = min(date.fromordinal(int(ev.day.max())) + timedelta(days=max(horizons) * 7 // 5 + 45), date.today())
+    tickers = sorted(set(ev.ticker.tolist()))
+    bench   = args.benchmark.upper()
+    if not args.offline:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            ok = list(pool.map(lambda t: PRICES.ensure(t, first, last), tickers + [bench]))
+        if not ok[-1]:
+            print(f"[warn] benchmark {bench} niet op te halen", file=sys.stderr)
+    calendar, matrix = PRICES.closes(tickers + [bench], first, last)
+    if not len(calendar) or not np.isfinite(matrix[:, -1]).any():
+        print(f"[events] geen koersen voor de benchmark {bench} in de store", file=sys.stderr)
+        sys.exit(1)
+    prices   = backtest.ffill(matrix[:, :-1])
+    bench_px = backtest.ffill(matrix[:, -1:])[:, 0]
+    print(f"[events] koersen: {len(calendar)} handelsdagen × {len(tickers)} tickers "
+          f"in {time.time() - t1:.1f}s", file=sys.stderr)
+
+    t2 = time.time()
+    report, _ = event_study.study(ev, tickers, calendar, prices, bench_px, horizons)
+    print(f"[events] CAR berekend in {time.time() - t2:.2f}s ({report['measured']} events met koersen)",
+          file=sys.stderr)
+
+    print(f"Event study {first} → {date.fromordinal(int(ev.day.max()))}, CAR t.o.v. {bench}")
+    print_table("Alle events", {"alle": report["all"]}, horizons)
+    print_table("Rol", report["role"], horizons)
+    print_table("Omvang", report["size"], horizons)
+    print_table(f"Cluster (≥{event_study.CLUSTER_MIN}/{event_study.CLUSTER_DAYS}d)", report["cluster"], horizons)
+    print_table("Rol / omvang", report["role_size"], horizons)
+    print_table("Bedrag ≥ (SIZE_1M/5M)", {f"${x:,.0f}": v for x, v in report["by_amount"].items()}, horizons)
+    print_table("Instap na filing (FRESH_*)", {f"+{d}d": v for d, v in report["by_delay"].items()}, horizons)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=1), encoding="utf-8")
+        print(f"[events] rapport → {args.json}", file=sys.stderr)
+    print(f"[cache] {PRICES.summary()}", file=sys.stderr)
+    print(f"[http] {concurrency.LIMITS.summary()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,13 @@
 # - optionele diagnose: SEC_DIAG=1 => print P/S/M/F counts voor eerste filings
 
 import os, re, json, html, time, pathlib, sys
-from urllib.request import Request, urlopen
 from urllib.parse import urljoin
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from insider import concurrency, form4
+from insider.ratelimit import SEC_LIMITER
+
 BASE = pathlib.Path("data")
 REPORTS = BASE / "reports"; REPORTS.mkdir(parents=True, exist_ok=True)
 STATE   = BASE / "state";   STATE.mkdir(parents=True, exist_ok=True)
@@ -23,11 +27,13 @@ DIAG = bool(os.getenv("SEC_DIAG"))
 def fetch(url: str, timeout=20, retries=2) -> str:
     for i in range(retries+1):
         try:
-            req = Request(url, headers={"User-Agent": UA})
-            with urlopen(req, timeout=timeout) as r:
-                return r.read().decode("utf-8", "ignore")
-        except Exception:
-            time.sleep(1 + i)
+            SEC_LIMITER.acquire()
+            return concurrency.get(url, headers={"User-Agent": UA}, timeout=timeout).text
+        except Exception as e:
+            wait = concurrency.retry_wait(e, i)
+            if wait is None:
+                break
+            time.sleep(wait)
     return ""
 
 def parse_atom(xml: str):
@@ -64,44 +70,16 @@ def find_xml_candidates(idx_url: str):
     cands.sort(key=lambda x: x[1], reverse=True)
     return cands
 
-# ===== XML helpers (namespace-aware) =====
-def g(xml: str, tag: str) -> str:
-    m = re.search(fr"<(?:\w+:)?{tag}\b[^>]*>(.*?)</(?:\w+:)?{tag}>", xml, flags=re.S|re.I)
-    return html.unescape((m.group(1) if m else "").strip())
-
-def gv(xml: str, tag: str) -> str:
-    m = re.search(fr"<(?:\w+:)?{tag}\b[^>]*>\s*(?:<(?:\w+:)?value[^>]*>)?\s*([^<]+)", xml, flags=re.S|re.I)
-    return html.unescape((m.group(1) if m else "").strip())
-
-def blks(xml: str, tag: str):
-    return re.findall(fr"<(?:\w+:)?{tag}\b[^>]*>(.+?)</(?:\w+:)?{tag}>", xml, flags=re.S|re.I)
-
+# ===== Form 4 parsing (insider/form4.py: streaming, namespace-aware) =====
 def parse_form4(xml: str):
-    owner  = g(xml,"rptOwnerName")
-    title  = g(xml,"officerTitle")
-    ticker = g(xml,"issuerTradingSymbol").upper()
-    issuer = g(xml,"issuerName")
+    doc = form4.parse(xml)
     txs=[]
-    for blk in blks(xml,"nonDerivativeTransaction") + blks(xml,"derivativeTransaction"):
-        code = g(blk,"transactionCode").upper()
-        ad   = gv(blk,"transactionAcquiredDisposedCode").upper()
-        sh   = gv(blk,"transactionShares")
-        pr   = (gv(blk,"transactionPricePerShare") or
-                gv(blk,"conversionOrExercisePrice") or
-                gv(blk,"exercisePrice"))
-        tv   = gv(blk,"transactionTotalValue")
-        try: shf = float((sh or "0").replace(",",""))
-        except: shf = 0.0
-        price = 0.0
-        if pr:
-            try: price = float((pr or "0").replace(",",""))
-            except: price = 0.0
-        elif tv and shf>0:
-            try: price = float((tv or "0").replace(",",""))/shf
-            except: price = 0.0
-        total = shf*price
-        txs.append({"code":code,"ad":ad,"shares":shf,"price":price,"total":total})
-    return {"ticker":ticker,"issuer":issuer,"owner":owner,"title":title,"txs":txs}
+    for t in doc.transactions:
+        price = t.price if t.price is not None else t.exercise_price
+        if not price and t.total_value and t.shares>0:
+            price = t.total_value/t.shares
+        txs.append({"code":t.code,"ad":t.acquired_disposed,"shares":t.shares,"price":price,"total":t.shares*price})
+    return {"ticker":doc.ticker.upper(),"issuer":doc.issuer_name,"owner":doc.owner,"title":doc.officer_title,"txs":txs}
 
 def summarize(txs):
     def s(sel): return sum(t["total"] for t in txs if sel(t))
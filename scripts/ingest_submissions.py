@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ingest van het SEC bulk submissions-archief in de lokale submissions-index.
+
+Download submissions.zip (alleen als het gewijzigd is) en laadt de gewijzigde
+members in data/cache/submissions_index.sqlite3. Daarna zoeken monitor.py,
+portfolio_monitor.py en portfolio_deepdive_270d.py de Form 4-filings per
+bedrijf lokaal op (zie insider/submissions_store.py).
+
+Gebruik:
+  python3 scripts/ingest_submissions.py                      # download + incrementele ingest
+  python3 scripts/ingest_submissions.py --archive fixture/   # lokale zip of directory (tests)
+  python3 scripts/ingest_submissions.py --full               # alle members opnieuw
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from insider.submissions_store import ARCHIVE_PATH, FORMS, SUBMISSIONS, archive_date, download
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laad het SEC submissions-archief in de lokale index")
+    parser.add_argument("--archive", default="",
+                        help="Lokale submissions.zip of directory met CIK*.json (geen download)")
+    parser.add_argument("--as-of", default="",
+                        help="Datum van de archiefdata (YYYY-MM-DD); default: mtime / Last-Modified")
+    parser.add_argument("--forms", nargs="+", default=sorted(FORMS), help="Forms om te indexeren")
+    parser.add_argument("--full", action="store_true", help="Alle members opnieuw inlezen")
+    args = parser.parse_args()
+
+    if args.archive:
+        archive = Path(args.archive)
+        if not archive.exists():
+            print(f"[error] {archive} bestaat niet", file=sys.stderr)
+            sys.exit(1)
+        as_of = args.as_of or archive_date(archive)
+    else:
+        archive = ARCHIVE_PATH
+        t0 = time.time()
+        try:
+            fresh, as_of = download(archive)
+        except OSError as e:
+            print(f"[error] download mislukt: {e}", file=sys.stderr)
+            sys.exit(1)
+        as_of = args.as_of or as_of
+        print(f"[ingest] archief {'gedownload' if fresh else 'ongewijzigd (304)'} "
+              f"in {time.time() - t0:.0f}s — data t/m {as_of}", file=sys.stderr)
+
+    t0 = time.time()
+    stats = SUBMISSIONS.ingest(
+        archive, as_of, forms=set(args.forms), full=args.full,
+        progress=lambda n, c: print(f"[ingest] {n} members gelezen, {c} gewijzigd…", file=sys.stderr),
+    )
+    print(f"[ingest] {stats['members']} members, {stats['changed']} gewijzigd, "
+          f"{stats['removed']} verwijderd, {stats['filings']} filings geladen "
+          f"in {time.time() - t0:.1f}s — index t/m {as_of}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Persistente cursor van verwerkte Form 4 accessions (SQLite).
+
+Discovery kijkt met overlap terug (DISCOVERY_DAYS), dus elke run ziet grotendeels
+dezelfde filings als de vorige. Per accession bewaren we het resultaat van de
+verwerking (ook een lege lijst); een volgende run haalt alleen nieuwe accessions
+op en geeft de rest terug uit de store.
+
+Resultaten zijn per `source` gescheiden, omdat monitor en de discovery-scan
+verschillende filters en rij-formaten hebben. De aanroeper neemt zijn filterregels
+op in de source (zoals de version van CikState), zodat een drempelwijziging niet
+stilletjes oude resultaten teruggeeft. Alleen filings waarvan de XML
+daadwerkelijk is opgehaald worden vastgelegd; fetch-fouten worden dus opnieuw
+geprobeerd.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+DB_PATH    = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "processed_accessions.sqlite3"
+KEEP_DAYS  = 30   # Ouder dan de grootste lookback: mag weg
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed (
+    source       TEXT NOT NULL,
+    accession    TEXT NOT NULL,
+    file_date    TEXT NOT NULL,
+    rows         TEXT NOT NULL,
+    processed_at REAL NOT NULL,
+    PRIMARY KEY (source, accession)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS processed_file_date ON processed (file_date);
+"""
+
+
+class AccessionStore:
+    """Thread-safe: één connectie, geserialiseerd met een lock (SQLite-writes zijn toch serieel)."""
+
+    def __init__(self, path: Path = DB_PATH, source: str = "default"):
+        self.path   = Path(path)
+        self.source = source
+        self.reused = 0   # Filings teruggegeven uit de store
+        self.added  = 0   # Nieuw verwerkte filings
+        self._lock  = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, accessions: list[str]) -> dict[str, list[dict]]:
+        """Opgeslagen rijen voor de accessions die al verwerkt zijn."""
+        found: dict[str, list[dict]] = {}
+        with self._lock:
+            db = self._db()
+            for i in range(0, len(accessions), 500):   # SQLite parameter-limiet
+                chunk = accessions[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for acc, rows in db.execute(
+                    f"SELECT accession, rows FROM processed WHERE source = ? AND accession IN ({marks})",
+                    [self.source, *chunk],
+                ):
+                    found[acc] = json.loads(rows)
+            self.reused += len(found)
+        return found
+
+    def put(self, accession: str, file_date: str, rows: list[dict]) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?, ?)",
+                (self.source, accession, file_date, json.dumps(rows, default=str), time.time()),
+            )
+            db.commit()
+            self.added += 1
+
+    def prune(self, keep_days: int = KEEP_DAYS) -> int:
+        cutoff = (date.today() - timedelta(days=keep_days)).isoformat()
+        with self._lock:
+            db  = self._db()
+            cur = db.execute("DELETE FROM processed WHERE file_date < ?", (cutoff,))
+            db.commit()
+            return cur.rowcount
+
+    def summary(self) -> str:
+        total = self.reused + self.added
+        pct   = self.reused / total if total else 0.0
+        return f"accessions: {self.reused} uit store, {self.added} nieuw ({pct:.0%} hergebruikt)"
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Vectorized backtest van de insider-signalen op lokale dagkoersen.
+
+Alles staat in matrices [handelsdag, ticker]:
+
+  sig     signaalcode (signal_engine.SIGNALS) zoals de monitor hem op die dag zag
+  score   0–10 score van die dag (insider/scoring.py)
+  active  ticker had een buy in het analysevenster (days_since_buy < 999)
+  prices  slotkoers (adj_close), doorgetrokken over gaten
+
+replay() bouwt sig/score/active door de historie dag voor dag door de signaal-
+engine te halen met de peildatum als klok (point-in-time, geen look-ahead).
+
+Het advies wordt gesimuleerd zoals de monitor het geeft: AANHOUDEN = positie
+(openen of houden), VERKOPEN = sluiten, MONITOREN = niets doen. Een signaal op
+dag t (na sluiting bekend) wordt uitgevoerd op de slotkoers van t + LAG.
+
+Uitkomst per signaalniveau:
+  trades     per positie (entry-niveau): rendement, hit rate, max drawdown,
+             en het rendement van de benchmark over dezelfde periode
+  forward    rendement t+LAG → t+LAG+h voor alle actieve ticker-dagen per niveau
+  portfolio  equal-weight portefeuille per entry-niveau: totaal, CAGR, max drawdown
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Callable
+
+import numpy as np
+
+from insider import scoring
+from insider.signal_engine import ADVIES, SIGNALS
+
+LAG      = 1             # Handelsdagen tussen signaal en uitvoering
+HORIZONS = (5, 20, 60)   # Forward-rendementen in handelsdagen
+YEAR     = 252
+
+# Advies per signaalcode: 1 = aanhouden, 0 = verkopen, -1 = vorige toestand behouden
+_ACTION = np.array([{"AANHOUDEN": 1, "VERKOPEN": 0}.get(ADVIES[s], -1) for s in SIGNALS], dtype=np.int8)
+
+
+def replay(calendar: np.ndarray, signals: Callable[[date], dict], rules: str = "monitor/1",
+           step: int = 1) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Signaal, score en actief per [dag, ticker] over de kalender (ordinals).
+
+    signals(as_of) geeft signal_engine.compute() voor die peildatum (bijv.
+    monitor.signals_as_of). Met step > 1 wordt elke step-de handelsdag herberekend
+    en houden de dagen ertussen de laatste uitkomst.
+    """
+    sig = score = active = None
+    for t in range(0, len(calendar), step):
+        col = signals(date.fromordinal(int(calendar[t])))
+        if sig is None:
+            shape  = (len(calendar), len(col["signal"]))
+            sig    = np.zeros(shape, dtype=np.int8)
+            score  = np.zeros(shape, dtype=np.int8)
+            active = np.zeros(shape, dtype=bool)
+        sig[t:t + step]    = col["signal"]
+        score[t:t + step]  = scoring.score_columns(scoring.engine_columns(col), rules).score
+        active[t:t + step] = col["days_since_buy"] < 999
+    return sig, score, active
+
+
+def ffill(m: np.ndarray) -> np.ndarray:
+    """NaN's per kolom vullen met de laatste bekende waarde (vóór de eerste blijft NaN).
+
+    Na een delisting blijft de laatste koers staan: een open positie sluit daar.
+    """
+    idx = np.where(np.isfinite(m), np.arange(len(m))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return m[idx, np.arange(m.shape[1])]
+
+
+def holdings(sig: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """True waar het advies een positie aanhoudt (alleen met een koers)."""
+    act = _ACTION[sig]
+    act[0] = np.where(act[0] < 0, 0, act[0])
+    idx = np.where(act >= 0, np.arange(len(act))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return (act[idx, np.arange(act.shape[1])] == 1) & np.isfinite(prices)
+
+
+def trades(hold: np.ndarray, sig: np.ndarray, score: np.ndarray, prices: np.ndarray,
+           bench: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """Eén rij per positie: van de eerste dag AANHOUDEN tot de eerste dag VERKOPEN.
+
+    Uitvoering op t + LAG; een positie die aan het einde nog open is wordt op de
+    laatste dag gewaardeerd (open=True).
+    """
+    n, m   = hold.shape
+    padded = np.zeros((m, n + 2), dtype=np.int8)
+    padded[:, 1:-1] = hold.T
+    edges  = np.diff(padded, axis=1)
+    col, start = np.nonzero(edges == 1)   # Zelfde (kolom, dag)-volgorde, dus paarsgewijs
+    _, stop    = np.nonzero(edges == -1)
+
+    keep = start + LAG < n
+    col, start, stop = col[keep], start[keep], stop[keep]
+    entry = start + LAG
+    exit_ = np.minimum(stop + LAG, n - 1)
+
+    ret = prices[exit_, col] / prices[entry, col] - 1
+    dd  = np.empty(len(col))
+    for k, (c, a, b) in enumerate(zip(col.tolist(), entry.tolist(), exit_.tolist())):
+        path  = prices[a:b + 1, c]
+        dd[k] = (path / np.maximum.accumulate(path)).min() - 1
+    out = {
+        "ticker": col, "entry": entry, "exit": exit_, "open": stop + LAG > n - 1,
+        "signal": sig[start, col], "score": score[start, col],
+        "days": exit_ - entry, "ret": ret, "max_dd": dd,
+    }
+    if bench is not None:
+        out["bench"] = bench[exit_] / bench[entry] - 1
+    return out
+
+
+def _stats(ret: np.ndarray) -> dict:
+    ret = ret[np.isfinite(ret)]
+    if not len(ret):
+        return {"n": 0}
+    return {"n": int(len(ret)), "mean": float(ret.mean()), "median": float(np.median(ret)),
+            "hit_rate": float((ret > 0).mean())}
+
+
+def trade_stats(tr: dict[str, np.ndarray], groups: np.ndarray) -> dict:
+    """Trade-statistiek per groep (bijv. tr["signal"] of een score-band)."""
+    out = {}
+    for g in np.unique(groups).tolist():
+        m = groups == g
+        s = _stats(tr["ret"][m])
+        if s["n"]:
+            s["mean_days"]   = float(tr["days"][m].mean())
+            s["mean_max_dd"] = float(tr["max_dd"][m].mean())
+            s["worst_dd"]    = float(tr["max_dd"][m].min())
+            if "bench" in tr:
+                s["mean_excess"] = float(np.nanmean(tr["ret"][m] - tr["bench"][m]))
+        out[g] = s
+    return out
+
+
+def forward(sig: np.ndarray, active: np.ndarray, prices: np.ndarray,
+            horizons: tuple[int, ...] = HORIZONS) -> dict:
+    """Forward-rendement per signaalniveau en horizon, over alle actieve ticker-dagen."""
+    n   = len(prices)
+    out = {s: {} for s in range(len(SIGNALS))}
+    for h in horizons:
+        fwd = np.full(prices.shape, np.nan)
+        if n > LAG + h:
+            fwd[:n - LAG - h] = prices[LAG + h:] / prices[LAG:n - h] - 1
+        ok = active & np.isfinite(fwd)
+        for s in out:
+            out[s][h] = _stats(fwd[ok & (sig == s)])
+    return out
+
+
+def portfolio(hold: np.ndarray, sig: np.ndarray, prices: np.ndarray) -> dict:
+    """Equal-weight portefeuille per entry-niveau: dagrendement, totaal, CAGR, max drawdown."""
+    n, m  = hold.shape
+    cols  = np.arange(m)
+    entry = hold & ~np.vstack([np.zeros((1, m), dtype=bool), hold[:-1]])
+    idx   = np.where(entry, np.arange(n)[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    level = np.where(hold, sig[idx, cols], -1)
+
+    # Positie die het rendement van dag t verdient: besloten op t-1-LAG
+    pos = np.full((n, m), -1, dtype=level.dtype)
+    pos[1 + LAG:] = level[:n - 1 - LAG]
+    daily = np.zeros((n, m))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        daily[1:] = prices[1:] / prices[:-1] - 1
+    daily = np.nan_to_num(daily, nan=0.0, posinf=0.0, neginf=0.0)
+
+    out = {}
+    for s in np.unique(level[level >= 0]).tolist():
+        mask = pos == s
+        cnt  = mask.sum(axis=1)
+        ret  = np.where(cnt > 0, np.where(mask, daily, 0.0).sum(axis=1) / np.maximum(cnt, 1), 0.0)
+        out[s] = {**curve(ret), "mean_positions": float(cnt.mean())}
+    return out
+
+
+def curve(daily: np.ndarray) -> dict:
+    """Totaalrendement, CAGR en max drawdown van een reeks dagrendementen."""
+    equity = np.cumprod(1 + daily)
+    years  = max(len(daily) / YEAR, 1e-9)
+    return {
+        "total":  float(equity[-1] - 1) if len(equity) else 0.0,
+        "cagr":   float(equity[-1] ** (1 / years) - 1) if len(equity) else 0.0,
+        "max_dd": float((equity / np.maximum.accumulate(equity)).min() - 1) if len(equity) else 0.0,
+    }
+
+
+def run(sig: np.ndarray, score: np.ndarray, active: np.ndarray, prices: np.ndarray,
+        bench: np.ndarray | None = None,
+        horizons: tuple[int, ...] = HORIZONS) -> tuple[dict, dict[str, np.ndarray]]:
+    """Volledige backtest: (rapport, trades). Niveau-tabellen hebben signaalnamen als sleutel."""
+    prices = ffill(prices)
+    if bench is not None:
+        bench = ffill(bench[:, None])[:, 0]
+    hold = holdings(sig, prices)
+    tr   = trades(hold, sig, score, prices, bench)
+    band = np.select([tr["score"] >= 8, tr["score"] >= 6, tr["score"] >= 4], ["8-10", "6-7", "4-5"], "0-3")
+
+    report = {
+        "trades":    {SIGNALS[k]: v for k, v in trade_stats(tr, tr["signal"]).items()},
+        "by_score":  trade_stats(tr, band),
+        "forward":   {SIGNALS[k]: v for k, v in forward(sig, active, prices, horizons).items()},
+        "portfolio": {SIGNALS[k]: v for k, v in portfolio(hold, sig, prices).items()},
+    }
+    if bench is not None:
+        daily = np.zeros(len(bench))
+        daily[1:] = np.nan_to_num(bench[1:] / bench[:-1] - 1)
+        report["benchmark"] = curve(daily)
+    return report, tr
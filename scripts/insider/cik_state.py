@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Persistente per-CIK state voor de 270d ticker-analyse (SQLite).
+
+Per issuer-CIK bewaren we welke Form 4 accessions al verwerkt zijn, met hun
+filing-datum en de daaruit afgeleide buys/sells. Een volgende run haalt alleen
+accessions op die nog niet in de state staan; filings die buiten het venster
+vallen worden lokaal weggelaten (op filing-datum, net als bij een volledige run).
+
+`version` hoort bij de filterregels van de aanroeper: wijzigen die, dan is de
+opgeslagen state ongeldig en wordt die genegeerd.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DB_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "cik_state.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cik_state (
+    scope      TEXT NOT NULL,
+    cik        TEXT NOT NULL,
+    version    TEXT NOT NULL,
+    newest     TEXT NOT NULL,
+    filings    TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (scope, cik)
+) WITHOUT ROWID;
+"""
+
+
+class CikState:
+    """filings: {accession: {"filing_date": iso, "buys": [...], "sells": [...]}}."""
+
+    def __init__(self, path: Path = DB_PATH, scope: str = "default", version: str = "1"):
+        self.path    = Path(path)
+        self.scope   = scope
+        self.version = version
+        self.reused  = 0   # Filings uit state
+        self.fetched = 0   # Nieuw opgehaalde filings
+        self._lock   = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def load(self, cik: str) -> dict[str, dict]:
+        with self._lock:
+            r = self._db().execute(
+                "SELECT version, filings FROM cik_state WHERE scope = ? AND cik = ?",
+                (self.scope, str(int(cik))),
+            ).fetchone()
+        if not r or r[0] != self.version:
+            return {}
+        return json.loads(r[1])
+
+    def save(self, cik: str, filings: dict[str, dict]) -> None:
+        newest = max((f["filing_date"] for f in filings.values()), default="")
+        with self._lock, self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO cik_state VALUES (?, ?, ?, ?, ?, ?)",
+                (self.scope, str(int(cik)), self.version, newest,
+                 json.dumps(filings, default=str), time.time()),
+            )
+
+    def count(self, reused: int, fetched: int) -> None:
+        with self._lock:
+            self.reused  += reused
+            self.fetched += fetched
+
+    def summary(self) -> str:
+        total = self.reused + self.fetched
+        pct   = self.reused / total if total else 0.0
+        return f"Form 4 per ticker: {self.reused} uit state, {self.fetched} opgehaald ({pct:.0%} hergebruikt)"
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Adaptieve concurrency per host (AIMD), gestuurd door 429/5xx en latency.
+
+De token bucket (ratelimit.py) begrenst het aantal requests per seconde; dit
+module begrenst hoeveel requests er per host tegelijk onderweg zijn, en past
+die limiet aan op wat de server terugmeldt:
+
+  - gezond (2xx/404, latency ≤ target) → additive increase: +1 per venster
+  - traag (latency > 2× target)        → limiet × 0.9
+  - 429 of 5xx                         → limiet × 0.5 en een gedeelde pauze:
+                                         Retry-After als de server die geeft,
+                                         anders COOLDOWN, verdubbelend per
+                                         opeenvolgende overload (max MAX_PAUSE)
+
+De state is gedeeld door alle threads van een proces; een pauze voor sec.gov
+gaat ook naar SEC_LIMITER, zodat andere processen meewachten. Retry-loops
+hoeven bij 429 dus niet zelf te slapen: de volgende acquire wacht.
+
+Limieten per host via env, bijv. HOST_CONCURRENCY="sec.gov=1:3:12,yahoo.com=1:2:6"
+(min:start:max). Hosts zonder configuratie gaan ongelimiteerd door.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from insider import http_client
+from insider.ratelimit import SEC_LIMITER
+
+COOLDOWN  = 10.0   # Pauze na 429/5xx zonder Retry-After (s)
+MAX_PAUSE = 120.0
+BETA      = 0.5    # Multiplicative decrease bij overload
+SLOW_BETA = 0.9    # Milde decrease bij hoge latency
+
+
+@dataclass
+class HostConfig:
+    min_limit: int = 1
+    initial: int = 2
+    max_limit: int = 8
+    target_latency: float = 1.5   # Seconden; daarboven geen increase meer
+
+
+DEFAULT_HOSTS = {
+    "sec.gov":   HostConfig(min_limit=1, initial=3, max_limit=12, target_latency=1.5),
+    "yahoo.com": HostConfig(min_limit=1, initial=2, max_limit=6,  target_latency=2.0),
+}
+
+
+def _parse_hosts(spec: str) -> dict[str, HostConfig]:
+    hosts = dict(DEFAULT_HOSTS)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        try:
+            host, limits = part.split("=", 1)
+            lo, start, hi = (int(x) for x in limits.split(":"))
+        except ValueError:
+            print(f"[warn] HOST_CONCURRENCY: ongeldige waarde '{part}' genegeerd", file=sys.stderr)
+            continue
+        base = hosts.get(host.strip(), HostConfig())
+        hosts[host.strip()] = HostConfig(max(1, lo), max(lo, min(start, hi)), max(lo, hi), base.target_latency)
+    return hosts
+
+
+def retry_after(headers: dict | None) -> float | None:
+    """Retry-After in seconden (delta-seconds of HTTP-datum), None als afwezig."""
+    value = (headers or {}).get("retry-after", "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_overload(e: Exception) -> bool:
+    code = getattr(e, "code", None)
+    return code == 429 or (code is not None and code >= 500)
+
+
+class AIMDLimiter:
+    """Concurrency-limiet voor één host. Thread-safe."""
+
+    def __init__(self, host: str, cfg: HostConfig, on_pause=None):
+        self.host      = host
+        self.cfg       = cfg
+        self.limit     = float(cfg.initial)
+        self.in_flight = 0
+        self.peak      = 0     # Hoogste aantal gelijktijdige requests
+        self.requests  = 0
+        self.overloads = 0
+        self.paused    = 0.0   # Totale pauzeduur (s)
+        self._on_pause = on_pause
+        self._streak   = 0     # Opeenvolgende overloads
+        self._paused_until   = 0.0
+        self._decrease_after = 0.0   # Eén decrease per venster, niet per request uit dezelfde burst
+        self._cond     = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    break
+                self._cond.wait(timeout=wait if wait > 0 else None)
+            self.in_flight += 1
+            self.requests  += 1
+            self.peak       = max(self.peak, self.in_flight)
+
+    def release(self, latency: float, overload: bool = False, pause: float | None = None) -> None:
+        notify_pause = 0.0
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if overload:
+                self.overloads += 1
+                self._streak   += 1
+                if now >= self._decrease_after:
+                    self.limit = max(self.cfg.min_limit, self.limit * BETA)
+                    self._decrease_after = now + max(latency, self.cfg.target_latency)
+                if pause is None:
+                    pause = COOLDOWN * 2 ** (self._streak - 1)
+                pause = min(MAX_PAUSE, pause)
+                until = now + pause
+                if until > self._paused_until:
+                    if self._paused_until <= now:   # Nieuwe pauze (geen verlenging): melden
+                        notify_pause = pause
+                    self.paused += until - max(now, self._paused_until)
+                    self._paused_until = until
+            else:
+                self._streak = 0
+                if latency > 2 * self.cfg.target_latency:
+                    if now >= self._decrease_after:
+                        self.limit = max(self.cfg.min_limit, self.limit * SLOW_BETA)
+                        self._decrease_after = now + latency
+                elif latency <= self.cfg.target_latency:
+                    self.limit = min(self.cfg.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+        if notify_pause:
+            print(f"[warn] {self.host}: overload — pauze {notify_pause:.0f}s, "
+                  f"concurrency → {int(self.limit)}", file=sys.stderr)
+            if self._on_pause:
+                self._on_pause(notify_pause)
+
+    def summary(self) -> str:
+        with self._cond:
+            return (f"{self.host}: limiet {self.cfg.initial}→{int(self.limit)} "
+                    f"(piek {self.peak} gelijktijdig, {self.requests} requests, "
+                    f"{self.overloads}× 429/5xx, {self.paused:.0f}s gepauzeerd)")
+
+
+class HostLimits:
+    def __init__(self, hosts: dict[str, HostConfig]):
+        self._hosts    = hosts
+        self._limiters: dict[str, AIMDLimiter] = {}
+        self._lock     = threading.Lock()
+
+    def for_url(self, url: str) -> AIMDLimiter | None:
+        host = (urlsplit(url).hostname or "").lower()
+        key  = next((h for h in self._hosts if host == h or host.endswith("." + h)), None)
+        if key is None:
+            return None
+        with self._lock:
+            lim = self._limiters.get(key)
+            if lim is None:
+                on_pause = SEC_LIMITER.pause if key == "sec.gov" else None
+                lim = self._limiters[key] = AIMDLimiter(key, self._hosts[key], on_pause)
+            return lim
+
+    def summary(self) -> str:
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return "; ".join(lim.summary() for lim in limiters) or "geen requests"
+
+
+LIMITS = HostLimits(_parse_hosts(os.getenv("HOST_CONCURRENCY", "")))
+
+
+def get(url: str, headers: dict | None = None,
+        timeout: float = http_client.DEFAULT_TIMEOUT) -> http_client.Response:
+    """http_client.get binnen de concurrency-limiet van de host, met terugkoppeling."""
+    lim = LIMITS.for_url(url)
+    if lim is None:
+        return http_client.get(url, headers=headers, timeout=timeout)
+    lim.acquire()
+    t0 = time.monotonic()
+    try:
+        r = http_client.get(url, headers=headers, timeout=timeout)
+    except http_client.HTTPError as e:
+        lim.release(time.monotonic() - t0, is_overload(e), retry_after(e.headers) if is_overload(e) else None)
+        raise
+    except BaseException:
+        lim.release(time.monotonic() - t0)   # Timeout/verbindingsfout: telt als (trage) latency
+        raise
+    lim.release(time.monotonic() - t0)
+    return r
+
+
+def retry_wait(e: Exception, attempt: int, cap: float = 8.0) -> float | None:
+    """Wachttijd vóór de volgende poging; None = niet opnieuw proberen (404).
+
+    Bij 429/5xx wacht de limiter zelf (gedeelde pauze), dus hier 0.
+    """
+    code = getattr(e, "code", None)
+    if code == 404:
+        return None
+    if is_overload(e):
+        return 0.0
+    return min(cap, 0.8 * (2 ** attempt))
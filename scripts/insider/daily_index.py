@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Form 4-discovery via de dagelijkse EDGAR master-index (alternatief voor EFTS).
+
+Per werkdag publiceert EDGAR daily-index/{jaar}/QTR{q}/master.{yyyymmdd}.idx:
+alle filings van die dag, één regel per betrokken CIK:
+
+    CIK|Company Name|Form Type|Date Filed|Filename
+
+We filteren Form 4/4A lokaal en ontdubbelen op accession (issuer en reporting
+owner staan er elk één keer in). Eén request per dag, geen paginering en geen
+resultaatlimiet zoals bij EFTS; dezelfde range geeft altijd dezelfde lijst.
+
+Indexen van afgelopen dagen zijn immutable en worden gzip op schijf bewaard.
+Alleen vandaag (en dagen die nog niet gepubliceerd zijn) wordt opnieuw
+opgehaald. Alleen een bevestigd ontbrekende index (404, of 403 terwijl de
+kwartaal-listing index.json de dag niet noemt) geldt als "geen filings"; een
+403 door throttling geeft IndexUnavailable en wordt nooit gecachet. Let op: de index van een dag verschijnt pas 's avonds (ET); voor
+filings van vandaag is EFTS dus actueler.
+
+Het XML-bestand van een filing staat niet in de index. Als bestandsnaam
+gebruiken we het volledige submission-bestand ({accession}.txt); form4.parse()
+haalt het ownershipDocument daaruit.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+CACHE_DIR   = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "daily_index"
+INDEX_URL   = "https://www.sec.gov/Archives/edgar/daily-index/{y}/QTR{q}/master.{ymd}.idx"
+LISTING_URL = "https://www.sec.gov/Archives/edgar/daily-index/{y}/QTR{q}/index.json"
+FORMS       = ("4", "4/A")
+SETTLE_DAYS = 3   # Ontbrekende index ouder dan dit = geen filings (feestdag), niet opnieuw proberen
+_EMPTY      = b"# geen index\n"
+
+
+class IndexUnavailable(OSError):
+    """Dag-index niet op te halen en niet bevestigd afwezig (bijv. 403 door throttling)."""
+
+
+def index_url(day: date) -> str:
+    return INDEX_URL.format(y=day.year, q=(day.month - 1) // 3 + 1, ymd=day.strftime("%Y%m%d"))
+
+
+def listing_url(day: date) -> str:
+    return LISTING_URL.format(y=day.year, q=(day.month - 1) // 3 + 1)
+
+
+def business_days(start: date, end: date) -> list[date]:
+    days, d = [], start
+    while d <= end:
+        if d.weekday() < 5:
+            days.append(d)
+        d += timedelta(days=1)
+    return days
+
+
+def parse_master(text: str, forms: tuple[str, ...] = FORMS) -> list[dict]:
+    """Filings uit een master.idx, ontdubbeld op accession (eerste CIK wint)."""
+    filings: dict[str, dict] = {}
+    body = text.split("\n-----", 1)[-1] if "\n-----" in text else text
+    for line in body.splitlines():
+        parts = line.split("|")
+        if len(parts) != 5 or parts[2] not in forms:
+            continue
+        cik, _, _, filed, filename = parts
+        adsh = filename.rsplit("/", 1)[-1].removesuffix(".txt")
+        if adsh in filings or not cik.isdigit():
+            continue
+        d = filed.strip()
+        filings[adsh] = {
+            "adsh":      adsh,
+            "xml_file":  f"{adsh}.txt",   # Volledige submission; bevat de XML
+            "file_date": f"{d[:4]}-{d[4:6]}-{d[6:8]}" if len(d) == 8 else d,
+            "cik":       str(int(cik)),
+        }
+    return list(filings.values())
+
+
+class DailyIndex:
+    """Dag-indexen met on-disk cache. fetch(url) geeft de tekst of gooit een
+    exceptie met .code (404 = geen index; 403 = geen index óf throttling)."""
+
+    def __init__(self, fetch: Callable[[str], str], cache_dir: Path = CACHE_DIR):
+        self.fetch     = fetch
+        self.cache_dir = Path(cache_dir)
+        self.cached    = 0   # Dagen uit de cache
+        self.fetched   = 0   # Dagen via het netwerk
+        self.missing   = 0   # Dagen zonder (gepubliceerde) index
+        self.failed    = 0   # Dagen niet op te halen (403/throttling): niet gecachet
+        self._listings: dict[str, set[str] | None] = {}
+
+    def _path(self, day: date) -> Path:
+        return self.cache_dir / f"master.{day:%Y%m%d}.idx.gz"
+
+    def day(self, day: date, today: date | None = None) -> list[dict]:
+        today = today or date.today()
+        path  = self._path(day)
+        if day < today and path.exists():
+            self.cached += 1
+            raw = gzip.decompress(path.read_bytes())
+            return [] if raw == _EMPTY else parse_master(raw.decode("latin-1"))
+
+        try:
+            text = self.fetch(index_url(day))
+        except OSError as e:
+            code = getattr(e, "code", None)
+            if code == 403 and not self._absent(day):
+                self.failed += 1
+                raise IndexUnavailable(f"dag-index {day}: HTTP 403, niet bevestigd afwezig") from e
+            if code not in (403, 404):
+                raise
+            self.missing += 1
+            if day < today - timedelta(days=SETTLE_DAYS):
+                self._store(path, _EMPTY)   # Feestdag: geen index, definitief
+            return []
+        self.fetched += 1
+        if day < today and text:
+            self._store(path, text.encode("latin-1", "replace"))
+        return parse_master(text)
+
+    def _absent(self, day: date) -> bool:
+        """True als de kwartaal-listing er is en de dag-index er niet in staat."""
+        url = listing_url(day)
+        if url not in self._listings:
+            try:
+                items = json.loads(self.fetch(url))["directory"]["item"]
+                self._listings[url] = {i.get("name", "") for i in items}
+            except (OSError, ValueError, KeyError, TypeError):
+                self._listings[url] = None   # Listing ook niet op te halen: onbekend
+        names = self._listings[url]
+        return names is not None and f"master.{day:%Y%m%d}.idx" not in names
+
+    def _store(self, path: Path, data: bytes) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(gzip.compress(data, compresslevel=6))
+            os.replace(tmp, path)
+        except OSError:
+            pass   # Cache is best-effort
+
+    def filings(self, start: date, end: date, today: date | None = None) -> list[dict]:
+        """Alle Form 4/4A-filings in [start, end], oudste dag eerst. Een dag die niet
+        op te halen is (IndexUnavailable) wordt overgeslagen met een waarschuwing."""
+        out: list[dict] = []
+        seen: set[str] = set()
+        for d in business_days(start, end):
+            try:
+                day_filings = self.day(d, today)
+            except IndexUnavailable as e:
+                print(f"[warn] {e} — dag overgeslagen", file=sys.stderr)
+                continue
+            for f in day_filings:
+                if f["adsh"] not in seen:
+                    seen.add(f["adsh"])
+                    out.append(f)
+        return out
+
+    def summary(self) -> str:
+        return (f"dag-indexen: {self.cached} uit cache, {self.fetched} opgehaald, {self.missing} (nog) niet gepubliceerd"
+                + (f", {self.failed} niet op te halen" if self.failed else ""))
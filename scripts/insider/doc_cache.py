@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Persistente on-disk cache voor SEC Archive documenten (Form 4 XML, index-pagina's).
+
+Gedeponeerde documenten wijzigen nooit: een accession + bestandsnaam levert altijd
+dezelfde inhoud op. De cache heeft daarom geen revalidatie nodig — alleen een
+grootte-limiet met LRU-eviction (op mtime, die bij elke hit wordt bijgewerkt).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable
+
+CACHE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "archives"
+MAX_BYTES = int(os.getenv("SEC_DOC_CACHE_MB", "512")) * 1024 * 1024
+EVICT_TO  = 0.9   # Na eviction: terug naar 90% van MAX_BYTES
+
+# https://www.sec.gov/Archives/edgar/data/{cik}/{accession zonder streepjes}/{bestand}
+_ARCHIVE_RE = re.compile(r"/Archives/edgar/data/\d+/(\d{18})/([^/?#]+)$", re.I)
+
+
+def archive_key(url: str) -> tuple[str, str] | None:
+    """(accession, bestandsnaam) voor een EDGAR Archive URL, anders None."""
+    m = _ARCHIVE_RE.search(url)
+    return (m.group(1), m.group(2)) if m else None
+
+
+class DocCache:
+    """Content-addressed cache: sha1(accession/bestandsnaam) → gzip-bestand.
+
+    Thread-safe binnen een proces; meerdere processen kunnen dezelfde directory
+    delen omdat schrijven atomisch gebeurt (tmp-bestand + os.replace).
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.root      = Path(root)
+        self.max_bytes = max_bytes
+        self.hits      = 0
+        self.misses    = 0
+        self._lock     = threading.Lock()
+        self._size: int | None = None   # Lazy: pas bij eerste put() de directory scannen
+
+    def _path(self, accession: str, filename: str) -> Path:
+        digest = hashlib.sha1(f"{accession.replace('-', '')}/{filename}".encode()).hexdigest()
+        return self.root / digest[:2] / f"{digest}.gz"
+
+    def get(self, accession: str, filename: str) -> str | None:
+        path = self._path(accession, filename)
+        try:
+            text = gzip.decompress(path.read_bytes()).decode("utf-8", "ignore")
+            os.utime(path)   # LRU: recent gebruikt
+        except (OSError, EOFError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, accession: str, filename: str, text: str) -> None:
+        path = self._path(accession, filename)
+        data = gzip.compress(text.encode("utf-8"), compresslevel=6)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            return   # Cache is best-effort: schrijffout mag de run niet breken
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def fetch(
+        self,
+        url: str,
+        fetcher: Callable[[str], str],
+        validate: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Haal url uit de cache, anders via fetcher. Alleen geldige documenten worden bewaard."""
+        key = archive_key(url)
+        if key is None:
+            return fetcher(url)
+        cached = self.get(*key)
+        if cached is not None:
+            return cached
+        text = fetcher(url)
+        if text and (validate is None or validate(text)):
+            self.put(*key, text)
+        return text
+
+    async def afetch(
+        self,
+        url: str,
+        afetcher: Callable[[str], Awaitable[str]],
+        validate: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Asyncio-variant van fetch(); de cache-lookup zelf is een kleine lokale read."""
+        key = archive_key(url)
+        if key is None:
+            return await afetcher(url)
+        cached = self.get(*key)
+        if cached is not None:
+            return cached
+        text = await afetcher(url)
+        if text and (validate is None or validate(text)):
+            self.put(*key, text)
+        return text
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits":     self.hits,
+                "misses":   self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return f"documenten: {s['hits']} hits, {s['misses']} misses ({s['hit_rate']:.0%} hit rate)"
+
+    # ── intern ────────────────────────────────────────────────────────────────
+
+    def _files(self) -> list[Path]:
+        return list(self.root.glob("*/*.gz")) if self.root.exists() else []
+
+    def _scan_size(self) -> int:
+        total = 0
+        for p in self._files():
+            try:
+                total += p.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _evict(self) -> None:
+        """Verwijder de minst recent gebruikte bestanden tot onder EVICT_TO × max_bytes."""
+        entries = []
+        for p in self._files():
+            try:
+                st = p.stat()
+                entries.append((st.st_mtime, st.st_size, p))
+            except OSError:
+                pass
+        entries.sort()
+        total  = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * EVICT_TO)
+        for _, size, p in entries:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+
+def is_ownership_doc(text: str) -> bool:
+    """Validator voor Form 4 XML: alleen echte ownershipDocuments cachen."""
+    return "ownershipDocument" in text
+
+
+# Gedeelde instantie voor alle fetchers binnen een proces
+FORM4_CACHE = DocCache()
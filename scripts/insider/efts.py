@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""EFTS full-text search (efts.sec.gov) met parallelle paginering en date-sharding.
+
+De eerste pagina levert hits.total; daarna liggen alle resterende from-offsets vast
+en worden ze gelijktijdig opgehaald en in volgorde samengevoegd. Het tempo bepaalt
+de meegegeven fetch-functie (die via SEC_LIMITER loopt), niet deze module.
+
+EFTS levert per query maximaal RESULT_CAP resultaten. Een range die daarop stuit
+wordt automatisch in twee datum-helften gesplitst, tot op één dag.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Iterator
+
+SEARCH_URL   = "https://efts.sec.gov/LATEST/search-index"
+RESULT_CAP   = 10_000   # EFTS/Elasticsearch max_result_window
+PAGE_WORKERS = int(os.getenv("EFTS_PAGE_WORKERS", "4"))
+
+
+def search_url(start: str, end: str, offset: int = 0, forms: str = "4") -> str:
+    return (
+        f"{SEARCH_URL}?forms={forms}"
+        f"&dateRange=custom&startdt={start}&enddt={end}"
+        f"&from={offset}"
+    )
+
+
+def _page(data: dict) -> tuple[list[dict], int, bool]:
+    """(hits, totaal, capped) uit één EFTS-response."""
+    block = data.get("hits", {}) if isinstance(data, dict) else {}
+    hits  = block.get("hits", [])
+    total = block.get("total", {})
+    value = int(total.get("value", 0))
+    return hits, value, total.get("relation") == "gte" or value >= RESULT_CAP
+
+
+def _split(start: str, end: str) -> list[tuple[str, str]] | None:
+    """Splits [start, end] in twee niet-overlappende helften; None bij één dag."""
+    d0, d1 = date.fromisoformat(start), date.fromisoformat(end)
+    if d1 <= d0:
+        return None
+    mid = d0 + (d1 - d0) // 2
+    return [(start, mid.isoformat()), ((mid + timedelta(days=1)).isoformat(), end)]
+
+
+def _offsets(first_hits: list[dict], total: int) -> list[int]:
+    step = len(first_hits)
+    return list(range(step, min(total, RESULT_CAP), step)) if step else []
+
+
+def _try(fetch_json: Callable[[str], dict], url: str) -> dict:
+    try:
+        return fetch_json(url)
+    except Exception as e:
+        print(f"[warn] EFTS {url.split('?', 1)[-1]}: {e}", file=sys.stderr)
+        return {}
+
+
+def _truncated(start: str, end: str, total: int) -> None:
+    print(f"[warn] EFTS {start}: >{total} hits op één dag — afgekapt op {RESULT_CAP}",
+          file=sys.stderr)
+
+
+def iter_pages(
+    start: str,
+    end: str,
+    fetch_json: Callable[[str], dict],
+    forms: str = "4",
+    workers: int = PAGE_WORKERS,
+) -> Iterator[list[dict]]:
+    """Levert de hits per pagina, in datum-shard- en offset-volgorde."""
+    hits, total, capped = _page(_try(fetch_json, search_url(start, end, 0, forms)))
+    if capped:
+        halves = _split(start, end)
+        if halves:
+            for s, e in halves:
+                yield from iter_pages(s, e, fetch_json, forms, workers)
+            return
+        _truncated(start, end, total)
+    if not hits:
+        return
+    yield hits
+
+    urls = [search_url(start, end, o, forms) for o in _offsets(hits, total)]
+    if not urls:
+        return
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        # map() levert in invoervolgorde, ongeacht welke pagina eerst binnen is
+        for data in ex.map(lambda u: _try(fetch_json, u), urls):
+            page, _, _ = _page(data)
+            if page:
+                yield page
+
+
+def search(
+    start: str,
+    end: str,
+    fetch_json: Callable[[str], dict],
+    forms: str = "4",
+    workers: int = PAGE_WORKERS,
+) -> list[dict]:
+    """Alle hits voor [start, end] als één lijst."""
+    return [h for page in iter_pages(start, end, fetch_json, forms, workers) for h in page]
+
+
+async def _atry(afetch_json: Callable[[str], Awaitable[dict]], url: str) -> dict:
+    try:
+        return await afetch_json(url)
+    except Exception as e:
+        print(f"[warn] EFTS {url.split('?', 1)[-1]}: {e}", file=sys.stderr)
+        return {}
+
+
+async def aiter_pages(
+    start: str,
+    end: str,
+    afetch_json: Callable[[str], Awaitable[dict]],
+    forms: str = "4",
+) -> AsyncIterator[list[dict]]:
+    """Asyncio-variant van iter_pages(): alle resterende pagina's staan direct
+    als task uit; pagina's worden in offset-volgorde geleverd zodra ze binnen zijn."""
+    hits, total, capped = _page(await _atry(afetch_json, search_url(start, end, 0, forms)))
+    if capped:
+        halves = _split(start, end)
+        if halves:
+            for s, e in halves:
+                async for page in aiter_pages(s, e, afetch_json, forms):
+                    yield page
+            return
+        _truncated(start, end, total)
+    if not hits:
+        return
+    yield hits
+
+    tasks = [
+        asyncio.create_task(_atry(afetch_json, search_url(start, end, o, forms)))
+        for o in _offsets(hits, total)
+    ]
+    try:
+        for task in tasks:
+            page, _, _ = _page(await task)
+            if page:
+                yield page
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Event study: abnormaal rendement na insider-aankopen, per rol, omvang en cluster.
+
+Een event is een discovery-rij (ticker, date, amount, is_csuite; zoals
+monitor.discover_recent_buys ze geeft), samengevoegd per (ticker, insider, dag).
+Per event en horizon h (handelsdagen):
+
+  CAR_h = Σ (r_ticker − r_benchmark) over de dagen t0+1 … t0+h
+
+met t0 de eerste handelsdag ná de filingdatum (+ delay kalenderdagen): de
+filing is pas na sluiting bekend, zoals in insider/backtest.py (LAG = 1).
+
+Uitlijning is volledig vectorized: één cumulatieve som van de dagelijkse
+abnormale rendementen per [dag, ticker] en per event twee indexen in die
+matrix (np.searchsorted op de kalender); geen lus per event.
+
+Buckets:
+  rol      C-suite (is_csuite) · officer/director · overig  (roles.classify().bucket)
+  omvang   <100k · 100k–1M · 1M–5M · ≥5M  (drempels van SIZE_1M / SIZE_5M in scoring.py)
+  cluster  ≥ CLUSTER_MIN unieke insiders kochten dezelfde ticker in CLUSTER_DAYS dagen
+
+Voor het kalibreren van de vaste drempels in scoring.score_columns():
+  by_amount  CAR voor events met amount ≥ X, over een raster van X (SIZE_5M/SIZE_1M)
+  by_delay   CAR bij instappen d dagen ná de filing (FRESH_7D/14D/30D)
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from insider import roles
+
+HORIZONS     = (5, 20, 60, 120)
+DELAYS       = (0, 7, 14, 30)   # Kalenderdagen tussen filing en instap
+SIZE_EDGES   = (100_000, 1_000_000, 5_000_000)
+SIZE_LABELS  = ("<100k", "100k-1M", "1M-5M", ">=5M")
+AMOUNT_GRID  = (100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000)
+CLUSTER_DAYS = 14
+CLUSTER_MIN  = 3
+
+_ROLE_LABELS = {"TOP": "officer/director", "OFF": "officer/director", "OTHER": "overig"}
+
+
+@dataclass
+class Events:
+    """Events in kolommen, één per (ticker, insider, dag)."""
+    ticker: np.ndarray     # str
+    day: np.ndarray        # ordinal van de filingdatum
+    amount: np.ndarray
+    is_csuite: np.ndarray
+    role: np.ndarray       # bucketlabel
+    cluster: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> "Events":
+        """Discovery-rijen → events; bedragen per (ticker, insider, dag) opgeteld."""
+        merged: dict[tuple, list] = {}
+        for r in rows:
+            ticker = str(r.get("ticker") or "").upper().strip()
+            try:
+                day = date.fromisoformat(str(r["date"])[:10]).toordinal()
+            except (KeyError, ValueError):
+                continue
+            if not ticker:
+                continue
+            key = (ticker, r.get("insider") or "", day)
+            ev  = merged.setdefault(key, [0.0, False, r.get("role") or ""])
+            ev[0] += float(r.get("amount") or r.get("notional") or 0)
+            ev[1] |= bool(r.get("is_csuite"))
+
+        keys  = list(merged)
+        vals  = list(merged.values())
+        is_cs = np.array([v[1] for v in vals], dtype=bool)
+        role  = np.array([_ROLE_LABELS[roles.classify(v[2]).bucket] for v in vals], dtype=object)
+        return cls(
+            ticker=np.array([k[0] for k in keys], dtype=object),
+            day=np.array([k[2] for k in keys], dtype=np.int64),
+            amount=np.array([v[0] for v in vals], dtype=np.float64),
+            is_csuite=is_cs,
+            role=np.where(is_cs, "C-suite", role),
+            cluster=cluster_flags([k[0] for k in keys], [k[2] for k in keys], [k[1] for k in keys]),
+        )
+
+    def size(self) -> np.ndarray:
+        return np.array(SIZE_LABELS, dtype=object)[np.searchsorted(SIZE_EDGES, self.amount, side="right")]
+
+
+def cluster_flags(ticker: list[str], day: list[int], insider: list[str],
+                  window: int = CLUSTER_DAYS, minimum: int = CLUSTER_MIN) -> np.ndarray:
+    """True als op de eventdag ≥ minimum unieke insiders de ticker kochten in [dag − window, dag]."""
+    n     = len(day)
+    order = sorted(range(n), key=lambda i: (ticker[i], day[i]))
+    flags = np.zeros(n, dtype=bool)
+    pos   = 0
+    while pos < n:
+        end = pos
+        while end < n and ticker[order[end]] == ticker[order[pos]]:
+            end += 1
+        # Schuivend venster over de dagen van één ticker
+        seen, lo, k = Counter(), pos, pos
+        while k < end:
+            d, j = day[order[k]], k
+            while j < end and day[order[j]] == d:
+                seen[insider[order[j]]] += 1
+                j += 1
+            while day[order[lo]] < d - window:
+                name = insider[order[lo]]
+                seen[name] -= 1
+                if not seen[name]:
+                    del seen[name]
+                lo += 1
+            flags[[order[m] for m in range(k, j)]] = len(seen) >= minimum
+            k = j
+        pos = end
+    return flags
+
+
+def abnormal(prices: np.ndarray, bench: np.ndarray) -> np.ndarray:
+    """Cumulatief abnormaal rendement per [dag, ticker] (cumsum van r − r_benchmark).
+
+    prices moet doorgetrokken zijn (backtest.ffill); vóór de eerste koers is het NaN.
+    """
+    r = np.zeros(prices.shape)
+    m = np.zeros(len(bench))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r[1:] = prices[1:] / prices[:-1] - 1
+        m[1:] = bench[1:] / bench[:-1] - 1
+    ar = np.nan_to_num(r, nan=0.0, posinf=0.0, neginf=0.0) - np.nan_to_num(m)[:, None]
+    cum = np.cumsum(ar, axis=0)
+    cum[~np.isfinite(prices)] = np.nan
+    return cum
+
+
+def car(col: np.ndarray, day: np.ndarray, calendar: np.ndarray, cum: np.ndarray,
+        horizons: tuple[int, ...] = HORIZONS, delay: int = 0) -> dict[int, np.ndarray]:
+    """CAR per event en horizon; NaN waar de ticker geen koers heeft of de horizon
+    voorbij de data valt. col = kolom van het event in `cum` (−1 = geen koersen)."""
+    n  = len(calendar)
+    t0 = np.searchsorted(calendar, day + delay, side="right")
+    ok = (col >= 0) & (t0 < n)
+    c  = np.where(ok, col, 0)
+    a  = np.where(ok, t0, 0)
+    start = np.where(ok, cum[a, c], np.nan)
+    out = {}
+    for h in horizons:
+        t1     = a + h
+        inside = ok & (t1 < n)
+        out[h] = np.where(inside, cum[np.minimum(t1, n - 1), c] - start, np.nan)
+    return out
+
+
+def stats(values: np.ndarray) -> dict:
+    v = values[np.isfinite(values)]
+    if not len(v):
+        return {"n": 0}
+    sd = float(v.std(ddof=1)) if len(v) > 1 else 0.0
+    return {
+        "n": int(len(v)), "mean": float(v.mean()), "median": float(np.median(v)),
+        "t": float(v.mean() / (sd / np.sqrt(len(v)))) if sd else 0.0,
+        "hit_rate": float((v > 0).mean()),
+    }
+
+
+def by_group(cars: dict[int, np.ndarray], groups: np.ndarray) -> dict:
+    """{groep: {horizon: stats}}."""
+    return {g: {h: stats(v[groups == g]) for h, v in cars.items()}
+            for g in sorted(set(groups.tolist()), key=str)}
+
+
+def study(ev: Events, tickers: list[str], calendar: np.ndarray, prices: np.ndarray, bench: np.ndarray,
+          horizons: tuple[int, ...] = HORIZONS, delays: tuple[int, ...] = DELAYS,
+          amount_grid: tuple[int, ...] = AMOUNT_GRID) -> tuple[dict, dict[int, np.ndarray]]:
+    """Volledige event study. prices: [dag, ticker] in de volgorde van `tickers`,
+    doorgetrokken; bench: benchmark-koersen op dezelfde kalender.
+
+    Geeft (rapport, CAR per horizon bij delay 0)."""
+    cum   = abnormal(prices, bench)
+    index = {t: i for i, t in enumerate(tickers)}
+    col   = np.array([index.get(t, -1) for t in ev.ticker.tolist()], dtype=np.int64)
+    cars  = car(col, ev.day, calendar, cum, horizons)
+
+    cluster = np.where(ev.cluster, "cluster", "los")
+    report  = {
+        "events":   len(ev),
+        "measured": int(np.isfinite(cars[horizons[0]]).sum()),
+        "all":      {h: stats(v) for h, v in cars.items()},
+        "role":     by_group(cars, ev.role),
+        "size":     by_group(cars, ev.size()),
+        "cluster":  by_group(cars, cluster),
+        "role_size": by_group(cars, np.array([f"{r} / {s}" for r, s in zip(ev.role, ev.size())], dtype=object)),
+        "by_amount": {x: {h: stats(v[ev.amount >= x]) for h, v in cars.items()} for x in amount_grid},
+        "by_delay":  {d: {h: stats(v) for h, v in car(col, ev.day, calendar, cum, horizons, d).items()}
+                      for d in delays},
+    }
+    return report, cars
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Gedeelde Form 4 parser: één parse-pass over het document, namespace-aware.
+
+Vervangt de losse regex-parsers (monitor, discovery, deepdive, fetch_insiders_sec),
+die per tag het hele document opnieuw doorzochten. parse() tokeniseert de XML één
+keer (expat, in C) en loopt één keer over de relevante takken; het resultaat is
+een getypeerd Form4-record:
+
+  - issuer / reporting owners (incl. rol-vlaggen en officerTitle)
+  - nonDerivative- én derivative-transacties, met footnote-referenties
+  - footnotes, remarks en de 10b5-1 indicatie (aff10b5One of vermelding in tekst)
+
+Elementnamen worden vergeleken binnen de namespace van het root-element (met of
+zonder default namespace / prefix). XML die expat weigert (HTML-entities,
+ongebonden prefixes) wordt één keer opgeschoond en opnieuw geparsed.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+_TRUE = {"1", "true", "yes"}
+
+# Velden die een <value>-kind hebben of direct tekst bevatten; beide vormen komen voor
+_TX_TEXT = {
+    "securityTitle":                   "security",
+    "transactionDate":                 "date",
+    "transactionCode":                 "code",
+    "transactionFormType":             "form_type",
+    "equitySwapInvolved":              "equity_swap",
+    "transactionShares":               "shares",
+    "transactionPricePerShare":        "price",
+    "transactionTotalValue":           "total_value",
+    "transactionAcquiredDisposedCode": "acquired_disposed",
+    "conversionOrExercisePrice":       "exercise_price",
+    "exercisePrice":                   "exercise_price",
+    "underlyingSecurityShares":        "underlying_shares",
+    "sharesOwnedFollowingTransaction": "shares_after",
+    "directOrIndirectOwnership":       "direct_indirect",
+}
+_TX_FLOAT = {"shares", "price", "total_value", "exercise_price", "underlying_shares", "shares_after"}
+
+_OWNER_TEXT = {
+    "rptOwnerCik":       "cik",
+    "rptOwnerName":      "name",
+    "isDirector":        "is_director",
+    "isOfficer":         "is_officer",
+    "isTenPercentOwner": "is_ten_pct",
+    "isOther":           "is_other",
+    "officerTitle":      "officer_title",
+    "otherText":         "other_text",
+}
+_OWNER_BOOL = {"is_director", "is_officer", "is_ten_pct", "is_other"}
+
+_DOC_TEXT = {
+    "documentType":        "document_type",
+    "periodOfReport":      "period_of_report",
+    "issuerCik":           "issuer_cik",
+    "issuerName":          "issuer_name",
+    "issuerTradingSymbol": "ticker",
+    "remarks":             "remarks",
+}
+
+_TX_TABLES = {"nonDerivativeTransaction": "nonDerivative", "derivativeTransaction": "derivative"}
+
+_RE_10B5_1    = re.compile(r"10b5[-\s]?1", re.I)
+_RE_ENTITY    = re.compile(r"&(?!(?:amp|lt|gt|quot|apos|#\d+|#x[0-9a-fA-F]+);)(\w+;)?")
+_RE_PREFIX    = re.compile(r"<(/?)[A-Za-z_][\w.-]*:")
+_RE_XMLNS_P   = re.compile(r"\sxmlns:[\w.-]+=(\"[^\"]*\"|'[^']*')")
+_RE_XML_BLOCK = re.compile(rb"<XML>\s*(.*?)\s*</XML>", re.S | re.I)
+_RE_CODE_P    = re.compile(r"<(?:[\w.-]+:)?transactionCode>\s*P\s*<", re.I)
+
+
+def _float(s: str) -> float:
+    try:
+        return float(s.replace(",", "").replace("$", "")) if s else 0.0
+    except ValueError:
+        return 0.0
+
+
+@dataclass
+class Transaction:
+    table: str                    # "nonDerivative" | "derivative"
+    security: str = ""
+    date: str = ""                # ISO yyyy-mm-dd (tijdzone-suffix gestript)
+    code: str = ""                # transactionCode, uppercase
+    form_type: str = ""
+    equity_swap: bool = False
+    shares: float = 0.0
+    price: float = 0.0
+    total_value: float = 0.0
+    acquired_disposed: str = ""   # "A" | "D"
+    exercise_price: float = 0.0   # Alleen derivative
+    underlying_shares: float = 0.0
+    shares_after: float = 0.0
+    direct_indirect: str = ""     # "D" | "I"
+    footnote_ids: list[str] = field(default_factory=list)
+
+    @property
+    def amount(self) -> float:
+        """Aandelen × prijs per aandeel (0 als een van beide ontbreekt)."""
+        return self.shares * self.price
+
+
+@dataclass
+class Owner:
+    cik: str = ""
+    name: str = ""
+    is_director: bool = False
+    is_officer: bool = False
+    is_ten_pct: bool = False
+    is_other: bool = False
+    officer_title: str = ""
+    other_text: str = ""
+
+
+@dataclass
+class Form4:
+    document_type: str = ""
+    period_of_report: str = ""
+    issuer_cik: str = ""
+    issuer_name: str = ""
+    ticker: str = ""
+    owners: list[Owner] = field(default_factory=list)
+    transactions: list[Transaction] = field(default_factory=list)
+    footnotes: dict[str, str] = field(default_factory=dict)
+    remarks: str = ""
+    aff10b5_one: bool | None = None   # Expliciete checkbox (sinds 2023), None = niet aanwezig
+
+    # ── afgeleide velden (eerste reporting owner is leidend) ─────────────────
+
+    @property
+    def owner(self) -> str:
+        return self.owners[0].name if self.owners else ""
+
+    @property
+    def officer_title(self) -> str:
+        return next((o.officer_title for o in self.owners if o.officer_title), "")
+
+    @property
+    def is_director(self) -> bool:
+        return bool(self.owners) and self.owners[0].is_director
+
+    @property
+    def is_officer(self) -> bool:
+        return bool(self.owners) and self.owners[0].is_officer
+
+    @property
+    def is_ten_pct(self) -> bool:
+        return bool(self.owners) and self.owners[0].is_ten_pct
+
+    def role_label(self, with_ten_pct: bool = False) -> str:
+        """officerTitle, anders 'Director, Officer[, 10% Owner]' uit de vlaggen."""
+        if self.officer_title:
+            return self.officer_title
+        parts = []
+        if self.is_director: parts.append("Director")
+        if self.is_officer:  parts.append("Officer")
+        if with_ten_pct and self.is_ten_pct: parts.append("10% Owner")
+        return ", ".join(parts)
+
+    @property
+    def role(self) -> str:
+        return self.role_label()
+
+    @property
+    def is_10b5_1(self) -> bool:
+        """Checkbox aangevinkt, of 10b5-1 genoemd in footnotes/remarks."""
+        if self.aff10b5_one:
+            return True
+        return any(_RE_10B5_1.search(t) for t in (*self.footnotes.values(), self.remarks))
+
+    def tx_10b5_1(self, tx: Transaction) -> bool:
+        """10b5-1 vermeld in een footnote van deze specifieke transactie."""
+        return any(_RE_10B5_1.search(self.footnotes.get(fid, "")) for fid in tx.footnote_ids)
+
+
+def has_purchase(xml: str | bytes) -> bool:
+    """Snelle voorselectie vóór parse(): staat er ergens transactiecode P in?
+
+    Een regex over de ruwe tekst, zonder XML-parse. Kan ten onrechte True geven
+    (bijv. P in de derivative-tabel), nooit ten onrechte False."""
+    text = xml.decode("utf-8", "ignore") if isinstance(xml, bytes) else xml
+    return bool(_RE_CODE_P.search(text))
+
+
+def parse(xml: str | bytes) -> Form4:
+    """Parse een Form 4/4A ownershipDocument, los of in een submission-.txt.
+    Geeft een (mogelijk leeg) record terug."""
+    data = xml.encode("utf-8") if isinstance(xml, str) else xml
+    data = data.lstrip()
+    if data.startswith((b"<SEC-DOCUMENT>", b"<DOCUMENT>")):
+        # Volledige submission (.txt, via de dag-index): XML staat tussen <XML>-tags
+        m    = _RE_XML_BLOCK.search(data)
+        data = m.group(1) if m else b""
+    try:
+        return _parse(data)
+    except ET.ParseError:
+        pass
+    text = data.decode("utf-8", "ignore")
+    text = _RE_ENTITY.sub(_entity, text)
+    text = _RE_XMLNS_P.sub("", _RE_PREFIX.sub(r"<\1", text))
+    try:
+        return _parse(text.encode("utf-8"))
+    except ET.ParseError:
+        return Form4()
+
+
+def _entity(m: re.Match) -> str:
+    """HTML-entity (&nbsp;) → teken; losse '&' → &amp;."""
+    if m.group(1):
+        char = html.unescape(m.group(0))
+        if char != m.group(0):
+            return html.escape(char, quote=False)
+    return "&amp;" + (m.group(1) or "")
+
+
+class _Tags:
+    """Opzoektabellen met volledig gekwalificeerde tagnamen voor één namespace.
+
+    ElementTree geeft tags als '{uri}naam'. Door de tabellen per namespace één keer
+    op te bouwen is per element alleen een dict-lookup nodig.
+    """
+
+    def __init__(self, ns: str):
+        q = lambda d: {ns + k: v for k, v in d.items()}
+        self.value      = ns + "value"
+        self.footnote   = ns + "footnoteId"
+        self.tx_text    = q(_TX_TEXT)
+        self.owner_text = q(_OWNER_TEXT)
+        self.doc_text   = q(_DOC_TEXT)
+        self.tx_tables  = q(_TX_TABLES)
+        self.sections   = q({
+            "nonDerivativeTable": "table", "derivativeTable": "table",
+            "reportingOwner": "owner", "issuer": "issuer", "footnotes": "footnotes",
+            "aff10b5One": "aff10b5One",
+        })
+
+
+@lru_cache(maxsize=8)
+def _tags(ns: str) -> _Tags:
+    return _Tags(ns)
+
+
+def _text(elem: ET.Element, t: _Tags) -> str:
+    """Tekst van <x>..</x> of van <x><value>..</value></x>."""
+    if len(elem) and elem[0].tag == t.value:
+        elem = elem[0]
+    return (elem.text or "").strip()
+
+
+def _parse(data: bytes) -> Form4:
+    # De boom wordt in C opgebouwd (expat); daarna één walk over de relevante takken.
+    # Dat is sneller dan een Python-callback per iterparse-event.
+    root = ET.fromstring(data)
+    t    = _tags(root.tag[:root.tag.rfind("}") + 1])
+    doc  = Form4()
+    for child in root:
+        section = t.sections.get(child.tag)
+        if section == "table":
+            for elem in child:
+                table = t.tx_tables.get(elem.tag)
+                if table:   # Holdings (zonder transactie) overslaan
+                    doc.transactions.append(_transaction(elem, table, t))
+        elif section == "owner":
+            doc.owners.append(_owner(child, t))
+        elif section == "issuer":
+            for elem in child:
+                attr = t.doc_text.get(elem.tag)
+                if attr:
+                    setattr(doc, attr, _text(elem, t))
+        elif section == "footnotes":
+            for elem in child:
+                doc.footnotes[elem.get("id", "")] = " ".join("".join(elem.itertext()).split())
+        elif section == "aff10b5One":
+            doc.aff10b5_one = _text(child, t).lower() in _TRUE
+        elif child.tag in t.doc_text:
+            setattr(doc, t.doc_text[child.tag], "".join(child.itertext()).strip())
+    return doc
+
+
+def _owner(elem: ET.Element, t: _Tags) -> Owner:
+    owner = Owner()
+    for e in elem.iter():
+        attr = t.owner_text.get(e.tag)
+        if attr:
+            text = (e.text or "").strip()
+            setattr(owner, attr, text.lower() in _TRUE if attr in _OWNER_BOOL else text)
+    return owner
+
+
+def _transaction(elem: ET.Element, table: str, t: _Tags) -> Transaction:
+    tx = Transaction(table=table)
+    for e in elem.iter():
+        attr = t.tx_text.get(e.tag)
+        if not attr:
+            if e.tag == t.footnote:
+                fid = e.get("id", "")
+                if fid and fid not in tx.footnote_ids:
+                    tx.footnote_ids.append(fid)
+            continue
+        text = _text(e, t)
+        if attr in _TX_FLOAT:
+            setattr(tx, attr, _float(text))
+        elif attr == "equity_swap":
+            tx.equity_swap = text.lower() in _TRUE
+        elif attr in ("code", "acquired_disposed", "direct_indirect"):
+            setattr(tx, attr, text.upper())
+        elif attr == "date":
+            tx.date = text[:10]
+        else:
+            setattr(tx, attr, text)
+    return tx
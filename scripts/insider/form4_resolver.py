@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Form 4 XML van een accession vinden met zo min mogelijk requests.
+
+Volgorde per filing:
+
+  1. primary  primaryDocument uit de submissions JSON, zonder de XSLT-prefix
+              ("xslF345X05/form4.xml" → "form4.xml"): meestal 1 request.
+  2. learned  bestandsnamen die eerder werkten, meest succesvolle eerst
+              (maximaal LEARNED_TRIES). Namen met de accession erin worden als
+              sjabloon bewaard ("{acc}.xml"), zodat ook die patronen te leren zijn.
+  3. index    de -index.htm pagina en de .xml links daarop, op naam gerangschikt
+              (het oude pad: ≥ 2 requests per filing).
+
+Namen gevonden via stap 2 of 3 tellen mee in de geleerde volgorde (SQLite,
+data/cache), ook over runs heen; stap 1 leert niets, die naam staat al in de
+submissions JSON. Eenmalige namen (bijv. "wf-form4_<timestamp>.xml") vallen
+na PRUNE_DAYS weg. Per filing wordt het aantal netwerkrequests bijgehouden;
+summary() geeft het gemiddelde en de verdeling over de stappen. Documenten gaan
+via FORM4_CACHE (immutable per accession): een cache-hit kost geen request.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urljoin
+
+from insider.doc_cache import FORM4_CACHE
+
+DB_PATH       = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "form4_names.sqlite3"
+LEARNED_TRIES = 2    # Geleerde namen per filing vóór de index-pagina
+MIN_HITS      = 2    # Een naam telt als patroon vanaf zoveel treffers
+PRUNE_DAYS    = 30   # Namen onder MIN_HITS die zo lang niet meer werkten: weg
+STAGES        = ("primary", "learned", "index", "none")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (
+    name       TEXT PRIMARY KEY,
+    hits       INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+_OWNERSHIP_RE = re.compile(r"<(?:\w+:)?ownershipDocument\b", re.I)
+
+
+def is_ownership_xml(text: str) -> bool:
+    return bool(_OWNERSHIP_RE.search(text))
+
+
+def primary_name(primary_doc: str) -> str:
+    """Bestandsnaam uit primaryDocument zonder XSLT-renderer prefix; leeg als het geen XML is."""
+    name = (primary_doc or "").rsplit("/", 1)[-1]
+    return name if name.lower().endswith(".xml") else ""
+
+
+def template(name: str, accession: str) -> str:
+    return name.replace(accession.replace("-", ""), "{acc}").replace(accession, "{accession}")
+
+
+def expand(pattern: str, accession: str) -> str:
+    return pattern.replace("{acc}", accession.replace("-", "")).replace("{accession}", accession)
+
+
+def index_candidates(page: str) -> list[str]:
+    """.xml links van een index-pagina, meest waarschijnlijke Form 4 eerst."""
+    cands = []
+    for m in re.finditer(r'href="([^"]+\.xml)"', page, flags=re.I):
+        href = html.unescape(m.group(1))
+        url  = href if href.startswith("http") else urljoin("https://www.sec.gov", href)
+        name = url.lower()
+        score = 0
+        if "ownership" in name:
+            score += 5
+        if "form4" in name:
+            score += 4
+        if "primary" in name:
+            score += 3
+        if "xml" in name:
+            score += 1
+        cands.append((url, score))
+    cands.sort(key=lambda x: x[1], reverse=True)
+    return [url for url, _ in cands]
+
+
+@dataclass
+class Resolved:
+    url: str
+    xml: str
+    stage: str      # primary | learned | index | none
+    requests: int   # Netwerkrequests voor deze filing (cache-hits tellen niet)
+
+
+class Form4Resolver:
+    def __init__(self, path: Path = DB_PATH, tries: int = LEARNED_TRIES):
+        self.path     = Path(path)
+        self.tries    = tries
+        self.stages   = Counter()
+        self.requests = 0
+        self._names: Counter | None = None
+        self._order: list[str] | None = None
+        self._lock    = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _load(self) -> Counter:
+        if self._names is None:
+            with self._db() as db:
+                db.execute("DELETE FROM names WHERE hits < ? AND updated_at < ?",
+                           (MIN_HITS, time.time() - PRUNE_DAYS * 86400))
+            self._names = Counter(dict(self._db().execute("SELECT name, hits FROM names")))
+        return self._names
+
+    def learned(self) -> list[str]:
+        """Geleerde naampatronen, meest succesvolle eerst."""
+        with self._lock:
+            if self._order is None:
+                self._order = [n for n, hits in self._load().most_common() if hits >= MIN_HITS]
+            return self._order
+
+    def learn(self, name: str) -> None:
+        with self._lock, self._db() as db:
+            names = self._load()
+            names[name] += 1
+            if names[name] >= MIN_HITS:
+                self._order = None
+            db.execute("INSERT OR REPLACE INTO names VALUES (?, ?, ?)", (name, names[name], time.time()))
+
+    def resolve(self, cik: str, accession: str, primary_doc: str, fetcher: Callable[[str], str]) -> Resolved:
+        """Form 4 XML voor één accession. fetcher(url) → tekst; een exception telt als 'niet gevonden'."""
+        base  = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{accession.replace('-', '')}"
+        calls = 0
+
+        def counted(url: str) -> str:
+            nonlocal calls
+            calls += 1
+            return fetcher(url)
+
+        def get(url: str, validate=None) -> str:
+            try:
+                return FORM4_CACHE.fetch(url, counted, validate=validate)
+            except Exception:
+                return ""
+
+        def done(url: str, xml: str, stage: str) -> Resolved:
+            if stage in ("learned", "index"):
+                self.learn(template(url.rsplit("/", 1)[-1], accession))
+            with self._lock:
+                self.stages[stage] += 1
+                self.requests      += calls
+            return Resolved(url, xml, stage, calls)
+
+        tried = set()
+        first = primary_name(primary_doc)
+        if first:
+            tried.add(first)
+            xml = get(f"{base}/{first}", is_ownership_xml)
+            if is_ownership_xml(xml):
+                return done(f"{base}/{first}", xml, "primary")
+
+        for name in [n for n in (expand(p, accession) for p in self.learned()) if n not in tried][:self.tries]:
+            tried.add(name)
+            xml = get(f"{base}/{name}", is_ownership_xml)
+            if is_ownership_xml(xml):
+                return done(f"{base}/{name}", xml, "learned")
+
+        page = get(f"{base}/{accession}-index.htm")
+        for url in index_candidates(page):
+            if url.rsplit("/", 1)[-1] in tried:
+                continue
+            xml = get(url, is_ownership_xml)
+            if is_ownership_xml(xml):
+                return done(url, xml, "index")
+        return done("", "", "none")
+
+    def summary(self) -> str:
+        with self._lock:
+            n = sum(self.stages.values())
+            if not n:
+                return "Form 4 resolver: geen filings"
+            steps = ", ".join(f"{s} {self.stages[s]}" for s in STAGES if self.stages[s])
+            return f"Form 4 resolver: {n} filings, {self.requests} requests ({self.requests / n:.2f}/filing; {steps})"
+
+
+# Gedeelde instantie voor alle fetchers binnen een proces
+RESOLVER = Form4Resolver()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""HTTP-cache met revalidatie (ETag / Last-Modified) voor SEC metadata-JSON.
+
+company_tickers.json en data.sec.gov/submissions/CIK*.json veranderen wel, maar
+zelden tussen twee runs. Per URL bewaren we de body (gzip) met de validators van
+de server:
+
+  - binnen de TTL          → direct uit de cache, geen request
+  - daarna                 → conditional GET (If-None-Match / If-Modified-Since);
+                             304 kost alleen de headers
+  - 200 of geen cache-item → volledige download, body + validators opslaan
+
+Faalt een request en is er een (verlopen) cache-item, dan wordt dat gebruikt.
+De TTL per URL-soort is instelbaar via env (seconden).
+
+fetch_json() voegt daar twee lagen per run aan toe: gelijktijdige aanvragen voor
+dezelfde URL wachten op één fetch (single-flight), en de geparste JSON wordt de
+rest van de run uit het geheugen geleverd. Aanroepers mogen die niet muteren.
+
+Beide lagen zijn begrensd: het geheugen houdt de MEMO_MAX laatst gebruikte URL's
+(LRU), de database verwijdert items ouder dan KEEP_DAYS en boven MAX_ROWS de
+oudste; bij het openen en daarna elke PRUNE_SECS, ook in een lange run.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+from insider.http_client import Response
+from insider.singleflight import SingleFlight
+
+DB_PATH   = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "http_cache.sqlite3"
+KEEP_DAYS  = 30       # Items die zo lang niet gecontroleerd zijn worden verwijderd
+MAX_ROWS   = 20_000   # Maximaal aantal opgeslagen URL's; daarboven gaan de oudste eruit
+MEMO_MAX   = 2_048    # Geparste JSON in het geheugen (LRU)
+PRUNE_SECS = 3600     # Opschonen van de database hooguit zo vaak
+
+TTL_TICKERS     = float(os.getenv("SEC_TICKERS_TTL", str(24 * 3600)))
+TTL_SUBMISSIONS = float(os.getenv("SEC_SUBMISSIONS_TTL", "900"))
+TTL_DEFAULT     = float(os.getenv("HTTP_CACHE_TTL", "0"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    checked_at    REAL NOT NULL,
+    body          BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_checked ON responses (checked_at);
+"""
+
+
+def default_ttl(url: str) -> float:
+    if url.endswith("/company_tickers.json"):
+        return TTL_TICKERS
+    if "/submissions/" in url:
+        return TTL_SUBMISSIONS
+    return TTL_DEFAULT
+
+
+class HttpCache:
+    """Thread-safe; meerdere processen kunnen dezelfde database delen (WAL)."""
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path        = Path(path)
+        self.fresh       = 0   # Binnen TTL, geen request
+        self.revalidated = 0   # 304 Not Modified
+        self.downloaded  = 0   # Volledige body opgehaald
+        self.stale       = 0   # Request mislukt, verlopen item gebruikt
+        self.memo_hits   = 0   # fetch_json: al geparst in deze run
+        self.evicted     = 0   # Uit het geheugen gevallen (LRU)
+        self.pruned      = 0   # Uit de database verwijderd (leeftijd / MAX_ROWS)
+        self._lock       = threading.Lock()
+        self._flight     = SingleFlight()
+        self._memo: OrderedDict[str, object] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._pruned_at  = 0.0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._prune()
+        return self._conn
+
+    def _prune(self) -> None:
+        """Items ouder dan KEEP_DAYS en boven MAX_ROWS de oudste verwijderen (onder _lock of bij openen)."""
+        now = time.time()
+        with self._conn as db:
+            n = db.execute("DELETE FROM responses WHERE checked_at < ?", (now - KEEP_DAYS * 86400,)).rowcount
+            n += db.execute(
+                "DELETE FROM responses WHERE url IN "
+                "(SELECT url FROM responses ORDER BY checked_at DESC LIMIT -1 OFFSET ?)", (MAX_ROWS,)
+            ).rowcount
+        self.pruned    += max(n, 0)
+        self._pruned_at = now
+
+    def fetch(self, url: str, get: Callable[[str, dict], Response], ttl: float | None = None) -> str:
+        """Body van url. `get(url, headers)` doet de request (incl. retry/rate limit) en
+        geeft een Response; 304 moet als Response terugkomen, niet als exceptie."""
+        ttl = default_ttl(url) if ttl is None else ttl
+        with self._lock:
+            row = self._db().execute(
+                "SELECT etag, last_modified, checked_at, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+
+        if row and time.time() - row[2] < ttl:
+            self._count("fresh")
+            return gzip.decompress(row[3]).decode("utf-8", "ignore")
+
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        try:
+            r = get(url, headers)
+        except Exception:
+            if not row:
+                raise
+            self._count("stale")
+            return gzip.decompress(row[3]).decode("utf-8", "ignore")
+
+        if r.status == 304 and row:
+            with self._lock, self._db() as db:
+                db.execute("UPDATE responses SET checked_at = ? WHERE url = ?", (time.time(), url))
+            self._count("revalidated")
+            return gzip.decompress(row[3]).decode("utf-8", "ignore")
+
+        self._count("downloaded")
+        if r.status == 200 and r.content:
+            with self._lock:
+                with self._db() as db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                        (url, r.headers.get("etag"), r.headers.get("last-modified"), time.time(),
+                         gzip.compress(r.content, compresslevel=6)),
+                    )
+                if time.time() - self._pruned_at > PRUNE_SECS:
+                    self._prune()
+        return r.text
+
+    def fetch_json(self, url: str, get: Callable[[str, dict], Response], ttl: float | None = None):
+        """Geparste JSON van url; per run één fetch per URL, ook bij gelijktijdige aanroepers."""
+        with self._lock:
+            if url in self._memo:
+                self.memo_hits += 1
+                self._memo.move_to_end(url)
+                return self._memo[url]
+
+        def load():
+            text = self.fetch(url, get, ttl)
+            data = json.loads(text) if text else {}
+            with self._lock:
+                self._memo[url] = data
+                self._memo.move_to_end(url)
+                while len(self._memo) > MEMO_MAX:
+                    self._memo.popitem(last=False)
+                    self.evicted += 1
+            return data
+
+        return self._flight.do(url, load)
+
+    def _count(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def summary(self) -> str:
+        with self._lock:
+            total  = self.fresh + self.revalidated + self.downloaded + self.stale
+            cached = total - self.downloaded
+            dupes  = self.memo_hits + self._flight.shared
+        pct = cached / total if total else 0.0
+        return (f"metadata: {self.fresh} vers, {self.revalidated}× 304, {self.downloaded} gedownload"
+                + (f", {self.stale} verouderd" if self.stale else "")
+                + f" ({pct:.0%} zonder download); {dupes} dubbele aanvragen zonder fetch"
+                + (f"; {self.evicted} uit geheugen, {self.pruned} opgeschoond" if self.evicted or self.pruned else ""))
+
+
+# Gedeelde instantie voor alle fetchers binnen een proces
+HTTP_CACHE = HttpCache()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Gedeelde HTTP-client met keep-alive connection pools per host.
+
+Alle fetchers (SEC, Yahoo, Telegram) gaan hierover zodat TCP- en TLS-setup
+maar één keer per host betaald wordt. Responses worden gzip/deflate
+gecomprimeerd opgevraagd — scheelt veel bij submissions JSON en
+company_tickers.json.
+
+Semantiek zoals urlopen: status >= 400 geeft HTTPError (met .code en
+.headers), transportfouten zijn OSError. Redirects worden gevolgd.
+"""
+
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import os
+import threading
+import zlib
+from urllib.parse import urljoin, urlsplit
+
+POOL_SIZE       = int(os.getenv("HTTP_POOL_SIZE", "8"))   # Max connecties per host
+DEFAULT_TIMEOUT = 30
+MAX_REDIRECTS   = 5
+IDEMPOTENT      = {"GET", "HEAD"}   # Mogen na een fout op een hergebruikte connectie opnieuw
+
+
+class HTTPError(OSError):
+    """HTTP status >= 400. Heeft .code zoals urllib.error.HTTPError."""
+
+    def __init__(self, url: str, code: int, reason: str, headers: dict):
+        super().__init__(f"HTTP {code} {reason} — {url}")
+        self.url     = url
+        self.code    = code
+        self.reason  = reason
+        self.headers = headers
+
+
+class _NotSent(Exception):
+    """Fout tijdens het versturen van het request: de server heeft het niet ontvangen."""
+
+    def __init__(self, error: Exception):
+        super().__init__(str(error))
+        self.error = error
+
+
+class Response:
+    def __init__(self, url: str, status: int, headers: dict, content: bytes):
+        self.url     = url
+        self.status  = status
+        self.headers = headers   # Lowercase header-namen
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "ignore")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ConnectionPool:
+    """Begrensde pool van persistente connecties naar één (scheme, host, port)."""
+
+    def __init__(self, scheme: str, host: str, port: int | None, maxsize: int = POOL_SIZE):
+        self.scheme = scheme
+        self.host   = host
+        self.port   = port
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock  = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxsize)
+
+    def _new(self, timeout: float) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=timeout)
+
+    def request(self, method: str, path: str, headers: dict, body: bytes | None,
+                timeout: float) -> tuple[int, str, dict, bytes]:
+        with self._slots:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            reused = conn is not None
+            if conn is None:
+                conn = self._new(timeout)
+            try:
+                status, reason, hdrs, data, keep = self._send(conn, method, path, headers, body, timeout)
+            except (_NotSent, OSError, http.client.HTTPException) as e:
+                conn.close()
+                err = e.error if isinstance(e, _NotSent) else e
+                # Hergebruikte connectie kan door de server gesloten zijn: één keer vers proberen.
+                # Niet-idempotent (POST) alleen als het request de server zeker niet bereikte:
+                # fout bij het versturen, of gesloten zonder enig antwoord (RemoteDisconnected).
+                # Een timeout ná het versturen kan anders een dubbel Telegram-bericht geven.
+                safe = (method in IDEMPOTENT or isinstance(e, _NotSent)
+                        or isinstance(err, http.client.RemoteDisconnected))
+                if not (reused and safe):
+                    raise ConnectionError(str(err)) from err
+                conn = self._new(timeout)
+                try:
+                    status, reason, hdrs, data, keep = self._send(conn, method, path, headers, body, timeout)
+                except (_NotSent, OSError, http.client.HTTPException) as e2:
+                    conn.close()
+                    err2 = e2.error if isinstance(e2, _NotSent) else e2
+                    raise ConnectionError(str(err2)) from err2
+            if keep:
+                with self._lock:
+                    self._idle.append(conn)
+            else:
+                conn.close()
+            return status, reason, hdrs, data
+
+    @staticmethod
+    def _send(conn, method, path, headers, body, timeout):
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+        except (OSError, http.client.HTTPException) as e:
+            raise _NotSent(e) from e
+        resp = conn.getresponse()
+        data = resp.read()
+        hdrs = {k.lower(): v for k, v in resp.getheaders()}
+        keep = not resp.will_close and hdrs.get("connection", "").lower() != "close"
+        return resp.status, resp.reason, hdrs, data, keep
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def _decode(data: bytes, encoding: str) -> bytes:
+    encoding = encoding.lower()
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(data)
+        except zlib.error:
+            return zlib.decompress(data, -zlib.MAX_WBITS)   # Raw deflate zonder zlib-header
+    return data
+
+
+class HTTPClient:
+    def __init__(self, pool_size: int = POOL_SIZE):
+        self.pool_size = pool_size
+        self._pools: dict[tuple, ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, scheme: str, host: str, port: int | None) -> ConnectionPool:
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = ConnectionPool(scheme, host, port, self.pool_size)
+            return pool
+
+    def request(self, method: str, url: str, headers: dict | None = None,
+                body: bytes | None = None, timeout: float = DEFAULT_TIMEOUT) -> Response:
+        hdrs = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        hdrs.update(headers or {})
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            path  = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            pool  = self._pool(parts.scheme, parts.hostname, parts.port)
+            status, reason, rh, data = pool.request(method, path, hdrs, body, timeout)
+            if status in (301, 302, 303, 307, 308) and rh.get("location"):
+                url = urljoin(url, rh["location"])
+                if status == 303:
+                    method, body = "GET", None
+                continue
+            if rh.get("content-encoding"):
+                try:
+                    data = _decode(data, rh["content-encoding"])
+                except (OSError, zlib.error) as e:
+                    raise ConnectionError(f"decompressie mislukt voor {url}: {e}") from e
+            if status >= 400:
+                raise HTTPError(url, status, reason, rh)
+            return Response(url, status, rh, data)
+        raise HTTPError(url, status, "too many redirects", rh)
+
+    def get(self, url: str, headers: dict | None = None, timeout: float = DEFAULT_TIMEOUT) -> Response:
+        return self.request("GET", url, headers=headers, timeout=timeout)
+
+    def post(self, url: str, data: bytes, headers: dict | None = None,
+             timeout: float = DEFAULT_TIMEOUT) -> Response:
+        hdrs = {"Content-Type": "application/x-www-form-urlencoded"}
+        hdrs.update(headers or {})
+        return self.request("POST", url, headers=hdrs, body=data, timeout=timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+
+# Gedeelde client voor het hele proces
+CLIENT = HTTPClient()
+
+
+def get(url: str, headers: dict | None = None, timeout: float = DEFAULT_TIMEOUT) -> Response:
+    return CLIENT.get(url, headers=headers, timeout=timeout)
+
+
+def post(url: str, data: bytes, headers: dict | None = None, timeout: float = DEFAULT_TIMEOUT) -> Response:
+    return CLIENT.post(url, data, headers=headers, timeout=timeout)
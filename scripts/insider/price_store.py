@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""Lokale dagkoersen-store (SQLite): daily OHLCV per ticker uit Yahoo Finance.
+
+Backtests lezen koersen voor duizenden tickers over jaren, en candidate_research
+haalde per ticker per run een jaar weekbars op; die één keer ophalen en daarna
+lokaal lezen scheelt per run tienduizenden requests.
+
+  prices    één rij per (ticker, dag): open/high/low/close, adj_close, volume
+  coverage  per ticker het opgehaalde bereik (first/last), alleen na een geldige
+            chart-response (ook zonder bars, bijv. een bereik zonder handelsdagen);
+            een 404 of onleesbare response legt niets vast en telt als mislukt
+  meta      de laatste chart-meta per ticker (sharesOutstanding e.d.)
+
+ensure() is incrementeel: na de eerste fetch wordt alleen het ontbrekende stuk
+opgehaald (nieuwe dagen vanaf de laatste bar, of oudere historie ervoor). Een
+bereik tot en met vandaag wordt na LIVE_TTL ververst, want de laatste bar kan
+intraday zijn geweest. Het aanvullen overlapt OVERLAP_DAYS met de store: wijkt
+een al vaste slotkoers af, of zit er een split/dividend in de nieuwe events,
+dan heeft Yahoo de historie herberekend en wordt het hele bereik opnieuw
+opgehaald en vervangen. features() rekent prijs, 52-weeks range en 4w/3m-trend
+uit de store (NumPy); closes() geeft de koersen van veel tickers als één
+matrix op een gedeelde kalender, voor vectorized evaluatie.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from insider import concurrency
+
+DB_PATH   = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "prices.sqlite3"
+CHART_URL = ("https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+             "?interval=1d&period1={p1}&period2={p2}&events=div%2Csplit")
+UA        = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+             "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+RETRIES   = 3
+LIVE_TTL  = 15 * 60   # Seconden; daarna wordt een bereik t/m vandaag opnieuw aangevuld
+OVERLAP_DAYS = 7      # Aanvullen begint zoveel dagen vóór de laatste bar (rebase-controle)
+REBASE_TOL   = 1e-3   # Relatief verschil in close/adj_close dat als herberekening telt
+TREND_PCT = 3.0       # 4-weeks verandering boven/onder ±3% = STIJGEND/DALEND
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    ticker    TEXT NOT NULL,
+    date      TEXT NOT NULL,
+    open      REAL,
+    high      REAL,
+    low       REAL,
+    close     REAL NOT NULL,
+    adj_close REAL,
+    volume    REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker     TEXT PRIMARY KEY,
+    first      TEXT NOT NULL,
+    last       TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    ticker     TEXT PRIMARY KEY,
+    json       TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+_PRICES = "ticker, date, open, high, low, close, adj_close, volume"
+
+
+def _iso(d) -> str:
+    return d.isoformat() if isinstance(d, date) else str(d)[:10]
+
+
+def _epoch(d: date) -> int:
+    return int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp())
+
+
+def chart_url(ticker: str, start: date, end: date) -> str:
+    """Yahoo chart-URL voor dagbars van start t/m end."""
+    return CHART_URL.format(ticker=ticker, p1=_epoch(start), p2=_epoch(end + timedelta(days=1)))
+
+
+def chart_result(data: dict) -> dict | None:
+    """Het result-object van een geldige chart-response, anders None."""
+    try:
+        res = data["chart"]["result"][0]
+    except (KeyError, IndexError, TypeError):
+        return None
+    return res if isinstance(res, dict) else None
+
+
+def chart_meta(data: dict) -> dict:
+    return (chart_result(data) or {}).get("meta") or {}
+
+
+def chart_events(data: dict) -> list[tuple[str, str]]:
+    """Splits en dividenden uit de chart-JSON → [(datum, "split" | "div")], oud → nieuw."""
+    res    = chart_result(data) or {}
+    offset = (res.get("meta") or {}).get("gmtoffset") or 0
+    out    = []
+    for key, kind in (("splits", "split"), ("dividends", "div")):
+        for ev in ((res.get("events") or {}).get(key) or {}).values():
+            ts = (ev or {}).get("date")
+            if isinstance(ts, (int, float)):
+                out.append((datetime.fromtimestamp(ts + offset, tz=timezone.utc).date().isoformat(), kind))
+    return sorted(out)
+
+
+def parse_chart(data: dict) -> list[tuple]:
+    """Yahoo chart-JSON → [(datum, open, high, low, close, adj_close, volume)], zonder lege bars.
+
+    Timestamps zijn in UTC; met de gmtoffset van de beurs valt elke bar op zijn handelsdag.
+    """
+    res = chart_result(data)
+    if res is None:
+        return []
+    stamps = res.get("timestamp") or []
+    offset = (res.get("meta") or {}).get("gmtoffset") or 0
+    quote  = ((res.get("indicators") or {}).get("quote") or [{}])[0]
+    adj    = ((res.get("indicators") or {}).get("adjclose") or [{}])[0].get("adjclose") or []
+
+    def col(values, i):
+        return values[i] if i < len(values) else None
+
+    rows = {}
+    for i, ts in enumerate(stamps):
+        close = col(quote.get("close") or [], i)
+        if close is None:
+            continue
+        day = datetime.fromtimestamp(ts + offset, tz=timezone.utc).date().isoformat()
+        rows[day] = (day, col(quote.get("open") or [], i), col(quote.get("high") or [], i),
+                     col(quote.get("low") or [], i), close, col(adj, i), col(quote.get("volume") or [], i))
+    return sorted(rows.values())
+
+
+def _fetch_json(url: str) -> dict:
+    """Yahoo GET met retries; {} bij 404 (onbekende ticker) of onleesbare JSON, exceptie bij andere fouten."""
+    for attempt in range(RETRIES):
+        try:
+            return json.loads(concurrency.get(url, headers={"User-Agent": UA, "Accept": "*/*"}, timeout=30).text)
+        except ValueError:
+            return {}
+        except OSError as e:
+            wait = concurrency.retry_wait(e, attempt)
+            if wait is None:
+                return {}
+            if attempt == RETRIES - 1:
+                raise
+            time.sleep(wait)
+    return {}
+
+
+class PriceStore:
+    def __init__(self, path: Path = DB_PATH, fetch: Callable[[str], dict] = _fetch_json):
+        self.path   = Path(path)
+        self.fetch  = fetch
+        self._lock  = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self.hits     = 0   # ensure() zonder request
+        self.fetched  = 0   # Geslaagde requests naar Yahoo
+        self.appended = 0   # Opgeslagen bars uit die requests
+        self.rebased  = 0   # Tickers waarvan de historie opnieuw is opgehaald (split/dividend)
+        self.failed   = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ── schrijven ─────────────────────────────────────────────────────────────
+
+    def write(self, ticker: str, rows: list[tuple], first: date | str, last: date | str,
+              meta: dict | None = None, replace: bool = False) -> None:
+        """Bars van één ticker opslaan en het gedekte bereik uitbreiden tot [first, last].
+
+        replace: eerst alle bars van de ticker in [first, last] wissen (herberekende historie).
+        """
+        ticker = ticker.upper()
+        with self._lock, self._db() as db:
+            if replace:
+                db.execute("DELETE FROM prices WHERE ticker = ? AND date BETWEEN ? AND ?",
+                           (ticker, _iso(first), _iso(last)))
+            db.executemany(f"INSERT OR REPLACE INTO prices ({_PRICES}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                           [(ticker, *r) for r in rows])
+            if meta:
+                db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?, ?)", (ticker, json.dumps(meta), time.time()))
+            prev  = db.execute("SELECT first, last FROM coverage WHERE ticker = ?", (ticker,)).fetchone()
+            first, last = _iso(first), _iso(last)
+            if prev:
+                first, last = min(first, prev[0]), max(last, prev[1])
+            db.execute("INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)", (ticker, first, last, time.time()))
+
+    # ── lezen ─────────────────────────────────────────────────────────────────
+
+    def coverage(self, ticker: str) -> tuple[str, str, float] | None:
+        """(first, last, fetched_at) van het opgehaalde bereik, of None."""
+        with self._lock:
+            row = self._db().execute("SELECT first, last, fetched_at FROM coverage WHERE ticker = ?",
+                                     (ticker.upper(),)).fetchone()
+        return tuple(row) if row else None
+
+    def meta(self, ticker: str) -> dict:
+        with self._lock:
+            row = self._db().execute("SELECT json FROM meta WHERE ticker = ?", (ticker.upper(),)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def missing(self, ticker: str, start: date, end: date, today: date | None = None) -> list[tuple[date, date]]:
+        """Bereiken die nog opgehaald moeten worden om [start, end] te dekken."""
+        cov = self.coverage(ticker)
+        if cov is None:
+            return [(start, end)]
+        first, last = date.fromisoformat(cov[0]), date.fromisoformat(cov[1])
+        todo = []
+        if start < first:
+            todo.append((start, first - timedelta(days=1)))
+        # De laatste bar kan bij de vorige fetch nog intraday zijn geweest; de OVERLAP_DAYS
+        # ervoor zijn vaste bars om een herberekening (split/dividend) aan te herkennen
+        live = end >= (today or date.today()) and time.time() - cov[2] > LIVE_TTL
+        if end > last or live:
+            todo.append((max(first, min(last, end) - timedelta(days=OVERLAP_DAYS)), end))
+        return todo
+
+    def _rebased(self, ticker: str, rows: list[tuple], data: dict, last: str) -> bool:
+        """Heeft Yahoo de opgeslagen historie herberekend sinds de vorige fetch?
+
+        Ja bij een split/dividend na de laatste opgeslagen bar, of als een vaste bar
+        (vóór `last`) in close of adj_close afwijkt van de verse response.
+        """
+        if any(day > last for day, _ in chart_events(data)):
+            return True
+        if not rows:
+            return False
+        stored = {r[0]: r for r in self.bars(ticker, rows[0][0], last)}
+        for r in rows:
+            old = stored.get(r[0])
+            if old is None or r[0] >= last:
+                continue
+            for a, b in ((old[4], r[4]), (old[5], r[5])):
+                if a and b and abs(a - b) > REBASE_TOL * abs(a):
+                    return True
+        return False
+
+    def _fetch(self, ticker: str, a: date, b: date) -> dict | None:
+        """Eén chart-request; None (en telt als mislukt) zonder geldige chart-response."""
+        try:
+            data = self.fetch(chart_url(ticker.upper(), a, b))
+        except OSError:
+            data = None
+        if chart_result(data) is None:
+            self.failed += 1
+            return None
+        self.fetched += 1
+        return data
+
+    def ensure(self, ticker: str, start: date, end: date, today: date | None = None) -> bool:
+        """Zorg dat [start, end] van `ticker` lokaal staat. False als ophalen mislukte.
+
+        Alleen de ontbrekende stukken worden opgehaald (zie missing()); blijkt de
+        historie herberekend, dan wordt het hele gedekte bereik vervangen.
+        """
+        todo = self.missing(ticker, start, end, today)
+        if not todo:
+            self.hits += 1
+            return True
+        for a, b in todo:
+            data = self._fetch(ticker, a, b)
+            if data is None:
+                return False
+            rows = parse_chart(data)
+            cov  = self.coverage(ticker)
+            if cov and a.isoformat() <= cov[1] and self._rebased(ticker, rows, data, cov[1]):
+                a    = date.fromisoformat(cov[0])
+                data = self._fetch(ticker, a, b)
+                if data is None:
+                    return False
+                rows = parse_chart(data)
+                self.rebased += 1
+                self.appended += len(rows)
+                self.write(ticker, rows, a, b, chart_meta(data), replace=True)
+                continue
+            self.appended += len(rows)
+            self.write(ticker, rows, a, b, chart_meta(data))
+        return True
+
+    def bars(self, ticker: str, start: date | str | None = None, end: date | str | None = None) -> list[tuple]:
+        """(datum, open, high, low, close, adj_close, volume) van één ticker, oud → nieuw."""
+        with self._lock:
+            return self._db().execute(
+                "SELECT date, open, high, low, close, adj_close, volume FROM prices"
+                " WHERE ticker = ? AND date BETWEEN ? AND ? ORDER BY date",
+                (ticker.upper(), _iso(start or "0000-00-00"), _iso(end or "9999-99-99"))).fetchall()
+
+    def closes(self, tickers: list[str], start: date, end: date,
+               adjusted: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """Slotkoersen als matrix [dag, ticker] op de gezamenlijke handelskalender.
+
+        Geeft (kalender als ordinals, matrix); NaN waar een ticker geen bar heeft.
+        Komt een ticker meer dan eens voor (bijv. de benchmark die ook verhandeld
+        is), dan krijgt elke kolom dezelfde koersen.
+        adjusted: adj_close (dividend/split-gecorrigeerd) waar beschikbaar.
+        """
+        col   = "COALESCE(adj_close, close)" if adjusted else "close"
+        index: dict[str, list[int]] = {}
+        for i, t in enumerate(tickers):
+            index.setdefault(t.upper(), []).append(i)
+        tid, day, px = [], [], []
+        with self._lock:
+            db = self._db()
+            for ticker, cols in index.items():
+                rows = db.execute(f"SELECT date, {col} FROM prices WHERE ticker = ? AND date BETWEEN ? AND ?",
+                                  (ticker, start.isoformat(), end.isoformat())).fetchall()
+                for i in cols:
+                    tid.extend([i] * len(rows))
+                    day.extend(r[0] for r in rows)
+                    px.extend(r[1] for r in rows)
+        epoch    = date(1970, 1, 1).toordinal()
+        ordinals = np.array(day, dtype="datetime64[D]").astype(np.int64) + epoch
+        calendar, row = np.unique(ordinals, return_inverse=True)
+        matrix = np.full((len(calendar), len(tickers)), np.nan)
+        matrix[row.reshape(-1), np.array(tid, dtype=np.int64)] = np.array(px, dtype=np.float64)
+        return calendar, matrix
+
+    def features(self, ticker: str, today: date | None = None) -> dict:
+        """Prijs, marktcap, 52-weeks range en 4w/3m-verandering uit de store.
+
+        Zelfde velden als candidate_research.get_market_data; None waar de
+        historie te kort is. Veranderingen t.o.v. de laatste slotkoers op of
+        vóór 28 resp. 91 dagen geleden (voorheen 4 resp. 13 weekbars).
+        """
+        today = today or date.today()
+        rows  = self.bars(ticker, today - timedelta(days=400), today)
+        out: dict = {
+            "market_cap": None, "price_now": None, "week52_high": None, "week52_low": None,
+            "pct_from_52w_high": None, "pct_from_52w_low": None,
+            "pct_change_4w": None, "pct_change_3m": None, "trend_4w": "ONBEKEND", "pct_change_30d": None,
+        }
+        if not rows:
+            return out
+        day   = np.array([r[0] for r in rows], dtype="datetime64[D]")
+        close = np.array([r[4] for r in rows], dtype=np.float64)
+        high  = np.array([r[2] for r in rows], dtype=np.float64)   # None → NaN
+        low   = np.array([r[3] for r in rows], dtype=np.float64)
+        price = float(close[-1])
+        out["price_now"] = price
+
+        year = day > np.datetime64(today - timedelta(days=365))
+        hi   = np.fmax(high, close)[year]
+        lo   = np.fmin(low, close)[year]
+        if len(hi):
+            out["week52_high"] = float(hi.max())
+            out["week52_low"]  = float(lo.min())
+            if out["week52_high"] > 0:
+                out["pct_from_52w_high"] = (price - out["week52_high"]) / out["week52_high"] * 100
+            if out["week52_low"] > 0:
+                out["pct_from_52w_low"] = (price - out["week52_low"]) / out["week52_low"] * 100
+
+        def change(days: int) -> float | None:
+            i = int(np.searchsorted(day, np.datetime64(today - timedelta(days=days)), side="right")) - 1
+            if i < 0 or not close[i]:
+                return None
+            return float((price - close[i]) / close[i] * 100)
+
+        out["pct_change_4w"]  = change(28)
+        out["pct_change_3m"]  = change(91)
+        out["pct_change_30d"] = out["pct_change_4w"]   # Legacy alias
+        if out["pct_change_4w"] is not None:
+            out["trend_4w"] = ("STIJGEND" if out["pct_change_4w"] > TREND_PCT else
+                               "DALEND" if out["pct_change_4w"] < -TREND_PCT else "ZIJWAARTS")
+
+        shares = self.meta(ticker).get("sharesOutstanding")
+        if shares:
+            out["market_cap"] = shares * price
+        return out
+
+    def summary(self) -> str:
+        return (f"koersen: {self.hits} uit store, {self.fetched} opgehaald "
+                f"({self.appended} bars), {self.rebased} herberekend, {self.failed} mislukt")
+
+
+PRICES = PriceStore()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Cross-process token bucket voor SEC requests (max 10 req/s over álle scripts).
+
+Monitor, discovery en deepdive draaien soms tegelijk (launchd). Elk proces had
+een eigen vaste pauze, waardoor de gezamenlijke rate boven de SEC-limiet kwam.
+Deze limiter deelt één bucket via een state-bestand met een exclusieve flock:
+
+  - Globaal: GCRA (token bucket) met SEC_MAX_RPS en een kleine burst.
+  - Per proces: eerlijk aandeel = SEC_MAX_RPS / aantal actieve processen, zodat
+    een proces met veel threads de anderen niet uithongert.
+
+reserve() claimt een slot en geeft de wachttijd terug zonder zelf te slapen;
+acquire() / acquire_async() slapen die tijd (threads resp. asyncio). pause()
+schuift de bucket voor alle processen op (Retry-After na een 429).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:   # Windows: alleen in-process coördinatie
+    fcntl = None
+
+STATE_DIR     = Path(__file__).resolve().parent.parent.parent / "data" / "state"
+STATE_FILE    = STATE_DIR / "sec_ratelimit.json"
+SEC_MAX_RPS   = float(os.getenv("SEC_MAX_RPS", "8"))   # Onder de SEC-limiet van 10/s
+BURST         = 2      # Requests die direct mogen na een stille periode
+ACTIVE_WINDOW = 10.0   # Proces telt als actief als het < 10s geleden een slot claimde
+
+
+def is_sec_url(url: str) -> bool:
+    return "sec.gov/" in url
+
+
+class RateLimiter:
+    def __init__(self, path: Path = STATE_FILE, rate: float = SEC_MAX_RPS, burst: int = BURST):
+        self.path  = Path(path)
+        self.rate  = rate
+        self.burst = burst
+        self.max_process_rps: float | None = None   # Optionele extra cap voor dit proces
+        self._lock  = threading.Lock()
+        self._p_tat = 0.0   # Theoretical arrival time van dit proces
+        self._local = {"tat": 0.0, "procs": {}}   # Fallback-state zonder fcntl
+
+    def reserve(self) -> float:
+        """Claim het eerstvolgende vrije slot; geeft het aantal seconden wachten terug."""
+        return self._update(self._reserve)
+
+    def pause(self, seconds: float) -> None:
+        """Geen slots uitgeven de komende `seconds` (bijv. Retry-After na een 429), voor alle processen."""
+        def push(state: dict) -> None:
+            until = time.time() + seconds
+            state["tat"] = max(float(state.get("tat", 0.0)), until)
+            self._p_tat  = max(self._p_tat, until)
+        self._update(push)
+
+    def _update(self, fn):
+        """Voer fn(state) uit onder de flock en schrijf de state terug."""
+        with self._lock:
+            if fcntl is None:
+                return fn(self._local)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            except OSError:
+                return fn(self._local)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = b""
+                while chunk := os.read(fd, 65536):
+                    raw += chunk
+                try:
+                    state = json.loads(raw) if raw else {}
+                except ValueError:
+                    state = {}
+                result = fn(state)
+                data   = json.dumps(state).encode()
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, data)
+                return result
+            finally:
+                os.close(fd)   # Sluiten geeft de flock vrij
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        # reserve() doet flock + JSON-file-I/O: niet op de event loop
+        wait = await asyncio.to_thread(self.reserve)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _reserve(self, state: dict) -> float:
+        now   = time.time()
+        pid   = str(os.getpid())
+        procs = {p: seen for p, seen in state.get("procs", {}).items() if now - seen < ACTIVE_WINDOW}
+        procs[pid] = now
+        n_active = len(procs)
+
+        interval   = 1.0 / self.rate
+        p_interval = interval * n_active
+        if self.max_process_rps:
+            p_interval = max(p_interval, 1.0 / self.max_process_rps)
+
+        g_tat = float(state.get("tat", 0.0))
+        slot  = max(now, g_tat - self.burst * interval, self._p_tat)
+        state["tat"]   = max(g_tat, slot) + interval
+        state["procs"] = procs
+        self._p_tat    = slot + p_interval
+        return slot - now
+
+
+# Gedeelde instantie voor alle SEC-fetchers binnen een proces
+SEC_LIMITER = RateLimiter()
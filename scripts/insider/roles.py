@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Gedeelde rol-classificatie: één voorgecompileerde regex voor alle keyword-sets.
+
+monitor, portfolio_monitor, candidate_research en prioritize_sec scanden elk een
+eigen keyword-set met `any(k in role for k in ...)`, per transactie opnieuw.
+Hier worden alle sets samen in één alternation gecompileerd (langste eerst, als
+lookahead zodat overlappende treffers als "evp"/"vp" allemaal gevonden worden).
+Eén scan geeft de gevonden keywords; daaruit volgt een compacte RoleCode met
+de uitkomst van elk van de oude regels. Dezelfde officerTitles komen duizenden
+keren terug, dus classify() en is_institutional() zijn gememoiseerd (LRU).
+
+De keyword-sets zelf zijn ongewijzigd overgenomen; de regels per module blijven
+dus gelijk, ook waar ze onderling verschillen (bijv. C-suite met of zonder EVP).
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Seyhun (1998): CEO/CFO/COO buys zijn het meest predictief (monitor: incl. EVP/SVP)
+CSUITE = {"ceo", "chief executive", "president", "cfo", "chief financial",
+          "coo", "chief operating", "cto", "chief technology", "clo", "chief legal",
+          "evp", "executive vice", "svp", "senior vice"}
+
+# Kern-C-suite (candidate_research)
+TOP_EXEC = {"ceo", "chief executive", "president", "cfo", "chief financial",
+            "coo", "chief operating"}
+
+# monitor._role_weight: eerste tier die matcht wint
+WEIGHT_TIERS = (
+    (5.0, {"ceo", "chief executive", "president"}),
+    (4.0, {"cfo", "chief financial", "coo", "chief operating"}),
+    (3.0, {"cto", "evp", "svp"}),
+    (2.0, {"vp", "vice"}),
+    (2.0, {"director"}),
+)
+
+# portfolio_monitor: hoogste gewicht van alle matches (hoger = informatiever)
+ROLE_WEIGHTS = {
+    "ceo": 5, "chief executive": 5, "president": 4,
+    "cfo": 4, "chief financial": 4,
+    "coo": 4, "chief operating": 4,
+    "cto": 3, "chief technology": 3,
+    "clo": 3, "chief legal": 3,
+    "evp": 3, "svp": 3,
+    "vp": 2,
+    "director": 2,
+    "10%": 1, "owner": 1,
+}
+
+# prioritize_sec buckets
+BUCKET_TOP = {"ceo", "chief executive", "cfo", "president", "chair"}
+BUCKET_OFF = {"officer", "dir"}
+
+# Institutionele kopers (activists, hedge funds, PE) — op de naam van de insider
+INSTITUTIONAL_KEYWORDS = {"partners", "management", "capital", "fund", " lp", ", lp",
+                          " llc", ", llc", " inc.", ", inc", "group", "holdings llc"}
+
+
+class RoleCode(NamedTuple):
+    weight: float     # monitor: gewicht voor de tijdsgecorrigeerde flow (1–5)
+    is_csuite: bool   # monitor: C-suite incl. CTO/CLO/EVP/SVP
+    is_top: bool      # candidate_research: CEO/CFO/COO/President
+    rank: int         # portfolio_monitor: hoogste ROLE_WEIGHTS-match, anders 1
+    bucket: str       # prioritize_sec: "TOP" | "OFF" | "OTHER"
+
+
+class _Matcher:
+    """Alle keywords in één regex; found(text) = set van keywords die substring zijn."""
+
+    def __init__(self, keywords: set[str]):
+        kws = sorted(keywords, key=lambda k: (-len(k), k))
+        self._rx = re.compile("(?=(" + "|".join(map(re.escape, kws)) + "))")
+        # Per positie levert de regex alleen de langste match; kortere keywords die
+        # daarin vervat zijn (dir ⊂ director, vp ⊂ evp) komen uit deze afsluiting
+        self._implied = {k: frozenset(j for j in kws if j in k) for k in kws}
+
+    def found(self, text: str) -> frozenset[str]:
+        hits: set[str] = set()
+        for m in self._rx.finditer(text):
+            hits |= self._implied[m.group(1)]
+        return frozenset(hits)
+
+
+_ROLE_KEYWORDS = (CSUITE | TOP_EXEC | set(ROLE_WEIGHTS) | BUCKET_TOP | BUCKET_OFF
+                  | {k for _, tier in WEIGHT_TIERS for k in tier})
+_ROLES = _Matcher(_ROLE_KEYWORDS)
+_NAMES = _Matcher(INSTITUTIONAL_KEYWORDS)
+
+
+@lru_cache(maxsize=8192)
+def classify(role: str | None) -> RoleCode:
+    """RoleCode voor een rol-string (officerTitle of 'Director, Officer')."""
+    hits = _ROLES.found((role or "").lower())
+    return RoleCode(
+        weight=next((w for w, tier in WEIGHT_TIERS if hits & tier), 1.0),
+        is_csuite=bool(hits & CSUITE),
+        is_top=bool(hits & TOP_EXEC),
+        rank=max((ROLE_WEIGHTS[k] for k in hits if k in ROLE_WEIGHTS), default=0) or 1,
+        bucket="TOP" if hits & BUCKET_TOP else ("OFF" if hits & BUCKET_OFF else "OTHER"),
+    )
+
+
+@lru_cache(maxsize=8192)
+def is_institutional(name: str | None) -> bool:
+    """True als de insider een institutionele partij is (activist, hedge fund, PE)."""
+    return bool(_NAMES.found((name or "").lower()))
+
+
+def cache_info() -> str:
+    r, n = classify.cache_info(), is_institutional.cache_info()
+    return (f"rollen: {r.hits} uit memo / {r.misses} geclassificeerd; "
+            f"namen: {n.hits} uit memo / {n.misses} geclassificeerd")
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Gedeelde 0–10 score met reason codes, batchgewijs en met geversioneerde regels.
+
+Vervangt de drie losse scorers (monitor.score, portfolio_monitor.score_position,
+candidate_research.score_portfolio_position/score_candidate). Die gebruikten
+dezelfde opbouw (max ruwe score 12, genormaliseerd naar 0–10):
+
+  signaalsterkte 0–3 · C-suite +2/−3 · versheid 0–3 · cluster +1 ·
+  koopomvang 0–2 · netto positief +1
+
+maar verschilden in details. Die verschillen zijn nu parameters van een RuleSet,
+geregistreerd onder een naam met versie ("monitor/1", "position/1",
+"candidate/1"). Een regelwijziging = een nieuwe versie; oude versies blijven
+beschikbaar zodat je ze naast elkaar kunt draaien (compare()).
+
+score_batch() werkt op een lijst dicts (of een DataFrame) in één keer: eerst
+kolommen (NumPy), dan elke regel als boolean-masker. Per regel is er een reason
+code; explain() maakt daar per rij de tekst van (in de stijl van de rule set).
+Voor het herscoren van de hele historie kan columns() ook direct de uitvoer van
+signal_engine.compute() krijgen, zonder dicts.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+MAX_RAW = 12
+
+SIGNAL_POINTS = {"STERKE OVERTUIGING": 3, "POSITIEF SIGNAAL": 2, "GEMENGD SIGNAAL": 1}
+
+# Reason codes, in de volgorde waarin de redenen getoond worden
+CODES = (
+    "SIG_STRONG", "SIG_POSITIVE", "SIG_MIXED", "SIG_NONE",
+    "CSUITE_BUY", "CSUITE_MIXED", "INST_BUY", "CSUITE_SELL",
+    "FRESH_7D", "FRESH_14D", "FRESH_30D", "STALE",
+    "CLUSTER",
+    "SIZE_MCAP_1PCT", "SIZE_MCAP_01PCT", "SIZE_5M", "SIZE_1M",
+    "NET_POSITIVE",
+)
+_SIG_CODES = ("SIG_STRONG", "SIG_POSITIVE", "SIG_MIXED", "SIG_NONE")
+
+# Standaardteksten; een RuleSet kan ze per code overschrijven of weglaten (None)
+TEXTS = {
+    "SIG_STRONG":      "{signal}",
+    "SIG_POSITIVE":    "{signal}",
+    "SIG_MIXED":       "{signal}",
+    "SIG_NONE":        "{signal}",
+    "CSUITE_BUY":      "C-suite koopt: {csuite_buyers}",
+    "CSUITE_MIXED":    "C-suite koopt én verkoopt — gemengd signaal",
+    "INST_BUY":        "Institutionele koper: {institutional_buyers}",
+    "CSUITE_SELL":     "C-suite verkoopt open market: {csuite_sellers}",
+    "FRESH_7D":        "Extreem vers ({days}d)",
+    "FRESH_14D":       "Vers signaal ({days}d)",
+    "FRESH_30D":       "Actief signaal ({days}d)",
+    "STALE":           "Ouder signaal ({days}d)",
+    "CLUSTER":         "Cluster: {unique_buyers} kopers",
+    "SIZE_MCAP_1PCT":  "Grote buy: {pct_mcap:.2f}% van marktcap",
+    "SIZE_MCAP_01PCT": "Significante buy: {pct_mcap:.2f}% van marktcap",
+    "SIZE_5M":         "Grote buy: ${total_buy_m:.1f}M",
+    "SIZE_1M":         "Significante buy: ${total_buy_m:.1f}M",
+    "NET_POSITIVE":    "Geen netto sells",
+}
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    name: str
+    signal_from_flows: bool = False   # Signaalsterkte uit buy/sell-verhouding i.p.v. het label
+    institutional_bonus: int = 0      # Punten voor institutionele koper zonder C-suite
+    size_by_mcap: bool = False        # Koopomvang als % van marktcap (indien bekend)
+    net: str = "net_flow"             # "net_flow" | "net_flow_clean" | "buy_gt_sell"
+    texts: dict = field(default_factory=dict)
+    csuite_names: int = 2             # Aantal C-suite kopers in de reden
+
+
+RULESETS: dict[str, RuleSet] = {}
+
+
+def register(rules: RuleSet) -> RuleSet:
+    RULESETS[rules.name] = rules
+    return rules
+
+
+# monitor.score: label-signaal, halve bonus voor institutionele kopers, netto flow
+register(RuleSet("monitor/1", institutional_bonus=1))
+
+# portfolio_monitor.score_position / candidate_research.score_portfolio_position
+register(RuleSet("position/1", net="net_flow_clean"))
+
+# candidate_research.score_candidate: signaal uit flows, omvang t.o.v. marktcap
+register(RuleSet(
+    "candidate/1", signal_from_flows=True, size_by_mcap=True, net="buy_gt_sell", csuite_names=3,
+    texts={
+        "SIG_STRONG":   "Sterke overtuiging: buys domineren",
+        "SIG_POSITIVE": "Positief signaal: meer buys dan sells",
+        "SIG_MIXED":    "Gemengd signaal: buys én sells aanwezig",
+        "SIG_NONE":     None,
+        "CSUITE_BUY":   "C-suite koper(s): {csuite_buyers}",
+        "CSUITE_MIXED": "C-suite koopt én verkoopt — gemengd",
+        "CSUITE_SELL":  "C-suite verkoopt: {csuite_sellers}",
+        "FRESH_7D":     "Extreem vers: {days}d geleden",
+        "FRESH_14D":    "Vers signaal: {days}d geleden",
+        "FRESH_30D":    "Recent signaal: {days}d geleden",
+        "STALE":        None,
+        "CLUSTER":      "Koop-cluster: {unique_buyers} unieke insiders",
+        "SIZE_5M":      "Grote absolute buy: ${total_buy_m:.1f}M",
+        "NET_POSITIVE": "Netto koopdruk",
+    },
+))
+
+
+def get(rules: str | RuleSet) -> RuleSet:
+    if isinstance(rules, RuleSet):
+        return rules
+    try:
+        return RULESETS[rules]
+    except KeyError:
+        raise ValueError(f"onbekende rule set '{rules}' (beschikbaar: {', '.join(RULESETS)})") from None
+
+
+# ── kolommen ──────────────────────────────────────────────────────────────────
+
+def _num(v, default=np.nan) -> float:
+    return default if v is None else v
+
+
+def columns(rows) -> dict[str, np.ndarray]:
+    """Scoringskolommen uit resultaat-dicts (of een DataFrame).
+
+    Gebruikte velden: signal, days_since_buy, csuite_buyers, csuite_sellers,
+    institutional_buyers, unique_buyers, total_buy, total_sell, net_flow,
+    net_flow_clean en market_cap (optioneel)."""
+    if hasattr(rows, "to_dict"):
+        rows = rows.to_dict("records")
+    return {
+        "signal":     np.array([r.get("signal", "UNKNOWN") for r in rows], dtype=object),
+        "days":       np.array([r.get("days_since_buy", 999) for r in rows], dtype=np.int64),
+        "cs_buy":     np.array([bool(r.get("csuite_buyers")) for r in rows], dtype=bool),
+        "cs_sell":    np.array([bool(r.get("csuite_sellers")) for r in rows], dtype=bool),
+        "inst_buy":   np.array([bool(r.get("institutional_buyers")) for r in rows], dtype=bool),
+        "buyers":     np.array([r.get("unique_buyers", 0) for r in rows], dtype=np.int64),
+        "total_buy":  np.array([r.get("total_buy", 0) for r in rows], dtype=np.float64),
+        "total_sell": np.array([r.get("total_sell", 0) for r in rows], dtype=np.float64),
+        "net_flow":   np.array([r.get("net_flow", 0) for r in rows], dtype=np.float64),
+        "net_clean":  np.array([_num(r.get("net_flow_clean")) for r in rows], dtype=np.float64),
+        "market_cap": np.array([_num(r.get("market_cap")) for r in rows], dtype=np.float64),
+    }
+
+
+def engine_columns(col: dict, market_cap: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """Scoringskolommen uit signal_engine.compute(), zonder tussenliggende dicts."""
+    from insider.signal_engine import SIGNALS
+    n = len(col["signal"])
+    return {
+        "signal":     np.array(SIGNALS, dtype=object)[col["signal"]],
+        "days":       np.asarray(col["days_since_buy"], dtype=np.int64),
+        "cs_buy":     col["csuite_buyers"] > 0,
+        "cs_sell":    col["csuite_sellers"] > 0,
+        "inst_buy":   col["institutional_buyers"] > 0,
+        "buyers":     np.asarray(col["unique_buyers"], dtype=np.int64),
+        "total_buy":  np.array(col["total_buy"], dtype=np.float64),
+        "total_sell": np.array(col["total_sell"], dtype=np.float64),
+        "net_flow":   np.asarray(col["net"], dtype=np.float64),
+        "net_clean":  np.full(n, np.nan),
+        "market_cap": np.full(n, np.nan) if market_cap is None else np.asarray(market_cap, dtype=np.float64),
+    }
+
+
+# ── scoren ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class Scores:
+    rules: str
+    score: np.ndarray            # int 0–10
+    raw: np.ndarray              # Ruwe punten
+    flags: dict[str, np.ndarray] # Reason code → masker
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def codes(self, i: int) -> list[str]:
+        return [c for c in CODES if c in self.flags and self.flags[c][i]]
+
+
+def score_columns(col: dict[str, np.ndarray], rules: str | RuleSet = "monitor/1") -> Scores:
+    rs   = get(rules)
+    days = col["days"]
+    tb, ts = col["total_buy"], col["total_sell"]
+    cs_buy, cs_sell = col["cs_buy"], col["cs_sell"]
+    f: dict[str, np.ndarray] = {}
+
+    # Signaalsterkte (max 3)
+    if rs.signal_from_flows:
+        bought = tb > 0
+        f["SIG_STRONG"]   = bought & (ts < tb * 0.2)
+        f["SIG_POSITIVE"] = bought & ~f["SIG_STRONG"] & (tb >= ts)
+        f["SIG_MIXED"]    = bought & ~f["SIG_STRONG"] & ~f["SIG_POSITIVE"]
+    else:
+        sig = col["signal"]
+        f["SIG_STRONG"]   = sig == "STERKE OVERTUIGING"
+        f["SIG_POSITIVE"] = sig == "POSITIEF SIGNAAL"
+        f["SIG_MIXED"]    = sig == "GEMENGD SIGNAAL"
+    f["SIG_NONE"] = ~(f["SIG_STRONG"] | f["SIG_POSITIVE"] | f["SIG_MIXED"])
+
+    # C-suite (max 2, min −3); institutioneel alleen zonder C-suite (halve bonus)
+    f["CSUITE_BUY"]   = cs_buy & ~cs_sell
+    f["CSUITE_MIXED"] = cs_buy & cs_sell
+    f["INST_BUY"]     = ~cs_buy & ~cs_sell & col["inst_buy"] if rs.institutional_bonus else np.zeros(len(days), bool)
+    f["CSUITE_SELL"]  = ~cs_buy & cs_sell
+
+    # Versheid (max 3) en cluster (max 1)
+    f["FRESH_7D"]  = days <= 7
+    f["FRESH_14D"] = (days > 7) & (days <= 14)
+    f["FRESH_30D"] = (days > 14) & (days <= 30)
+    f["STALE"]     = days > 30
+    f["CLUSTER"]   = (col["buyers"] >= 3) & (days <= 30)
+
+    # Koopomvang (max 2): % marktcap als die bekend is, anders absoluut
+    mcap = col["market_cap"]
+    if rs.size_by_mcap:
+        by_mcap = (np.nan_to_num(mcap) > 0) & (tb > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(by_mcap, tb / np.where(by_mcap, mcap, 1.0) * 100, 0.0)
+        f["SIZE_MCAP_1PCT"]  = by_mcap & (pct >= 1.0)
+        f["SIZE_MCAP_01PCT"] = by_mcap & (pct >= 0.1) & (pct < 1.0)
+        absolute = ~by_mcap
+    else:
+        absolute = np.ones(len(days), bool)
+    f["SIZE_5M"] = absolute & (tb >= 5_000_000)
+    f["SIZE_1M"] = absolute & (tb >= 1_000_000) & (tb < 5_000_000)
+
+    # Netto positief zonder C-suite sells (max 1)
+    if rs.net == "buy_gt_sell":
+        positive = tb > ts
+    elif rs.net == "net_flow_clean":
+        positive = np.where(np.isnan(col["net_clean"]), col["net_flow"], col["net_clean"]) > 0
+    else:
+        positive = col["net_flow"] > 0
+    f["NET_POSITIVE"] = positive & ~cs_sell
+
+    raw = (3 * f["SIG_STRONG"] + 2 * f["SIG_POSITIVE"] + f["SIG_MIXED"]
+           + 2 * f["CSUITE_BUY"] + rs.institutional_bonus * f["INST_BUY"] - 3 * f["CSUITE_SELL"]
+           + 3 * f["FRESH_7D"] + 2 * f["FRESH_14D"] + f["FRESH_30D"]
+           + f["CLUSTER"]
+           + 2 * f.get("SIZE_MCAP_1PCT", 0) + f.get("SIZE_MCAP_01PCT", 0) + 2 * f["SIZE_5M"] + f["SIZE_1M"]
+           + f["NET_POSITIVE"]).astype(np.int64)
+    # round() in de oude scorers = half-to-even, net als np.rint
+    score = np.clip(np.rint(np.maximum(raw, 0) / MAX_RAW * 10), 0, 10).astype(np.int64)
+    return Scores(rs.name, score, raw, f)
+
+
+def upper_bound(col: dict[str, np.ndarray], rules: str | RuleSet = "monitor/1") -> np.ndarray:
+    """Hoogst haalbare score per rij zolang market_cap nog onbekend is.
+
+    Alleen de koopomvang hangt van marktdata af: onder een rule set met
+    size_by_mcap levert een marktcap ≤ total_buy (≥ 1% van marktcap) het maximum
+    op; zonder marktcap valt de score terug op de absolute drempels. De rest van
+    de score ligt vast door de insider-data, dus de bound is exact op de omvang na."""
+    rs = get(rules)
+    n  = len(col["days"])
+    without = score_columns({**col, "market_cap": np.full(n, np.nan)}, rs).score
+    if not rs.size_by_mcap:
+        return without
+    tb   = col["total_buy"]
+    best = score_columns({**col, "market_cap": np.where(tb > 0, tb, np.nan)}, rs).score
+    return np.maximum(best, without)
+
+
+def score_batch(rows, rules: str | RuleSet = "monitor/1") -> Scores:
+    """Scores + reason codes voor een batch resultaten (lijst dicts of DataFrame)."""
+    return score_columns(columns(rows), rules)
+
+
+def score(row: dict, rules: str | RuleSet = "monitor/1") -> int:
+    """Eén resultaat scoren (gemak; voor lijsten score_batch gebruiken)."""
+    return int(score_batch([row], rules).score[0])
+
+
+def explain(scores: Scores, i: int, row: dict) -> list[str]:
+    """Leesbare redenen voor rij i, in de teksten van de rule set."""
+    rs    = get(scores.rules)
+    texts = {**TEXTS, **rs.texts}
+    tb    = row.get("total_buy", 0) or 0
+    mcap  = row.get("market_cap") or 0
+    ctx = {
+        "signal":               row.get("signal", "UNKNOWN"),
+        "days":                 row.get("days_since_buy", 999),
+        "unique_buyers":        row.get("unique_buyers", 0),
+        "csuite_buyers":        ", ".join(list(row.get("csuite_buyers") or [])[:rs.csuite_names]),
+        "csuite_sellers":       ", ".join(list(row.get("csuite_sellers") or [])[:2]),
+        "institutional_buyers": ", ".join(list(row.get("institutional_buyers") or [])[:2]),
+        "total_buy_m":          tb / 1e6,
+        "pct_mcap":             tb / mcap * 100 if mcap > 0 else 0.0,
+    }
+    out = []
+    for code in scores.codes(i):
+        text = texts.get(code)
+        if text:
+            out.append(text.format(**ctx))
+    return out
+
+
+def compare(rows, a: str | RuleSet, b: str | RuleSet) -> dict:
+    """A/B: scores onder twee rule sets en hoeveel rijen verschuiven."""
+    col = columns(rows) if not isinstance(rows, dict) else rows
+    sa, sb = score_columns(col, a), score_columns(col, b)
+    diff = sb.score - sa.score
+    return {
+        "a": sa, "b": sb, "changed": int(np.count_nonzero(diff)),
+        "up": int(np.count_nonzero(diff > 0)), "down": int(np.count_nonzero(diff < 0)),
+        "mean_a": float(sa.score.mean()) if len(sa) else 0.0,
+        "mean_b": float(sb.score.mean()) if len(sb) else 0.0,
+    }
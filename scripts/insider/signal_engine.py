@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Kolomgewijze signaal-engine: monitor._build_result voor alle tickers in één pass.
+
+_build_result rekent per ticker over dicts (math.exp en keyword-scans per
+transactie, sets per veld). Voor backtests over duizenden tickers en jaren data
+is dat de hotspot. Hier staat alles in NumPy-kolommen:
+
+  tid     ticker-id per transactie      day    datum als ordinal
+  buy     True = buy, False = sell      ins    insider-id
+  amount  bedrag                        role   rol-id
+
+Rollen en insiders worden gefactoriseerd: de classificatie (gewicht, C-suite,
+institutioneel) draait één keer per unieke string, niet per transactie. Decay
+per unieke leeftijd in dagen (math.exp, dus bitgelijk aan _build_result).
+
+Uniek tellen (kopers, C-suite, cluster) gaat via np.unique op (ticker, insider)-
+paren; het signaal via np.where in dezelfde volgorde als de regels in
+_build_result. Alleen de geldbedragen worden per ticker opgeteld met Python's
+sum() over een aaneengesloten slice: sinds 3.12 is die compensated, en alleen
+zo blijven total_buy/net_flow (en het teken van de gewogen flow) exact gelijk.
+
+compute() geeft de numerieke kolommen (backtests); results() bouwt daaruit de
+volledige dicts, identiek aan _build_result. _build_result blijft de referentie:
+wijzigt daar een regel, dan moet die hier mee.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable
+
+import numpy as np
+
+# Signaalcodes; volgorde is alleen intern
+SIGNALS = ("SIGNAAL UITGEWERKT", "POSITIEF SIGNAAL", "STERKE OVERTUIGING", "GEMENGD SIGNAAL", "NEGATIEF SIGNAAL")
+UITGEWERKT, POSITIEF, STERK, GEMENGD, NEGATIEF = range(len(SIGNALS))
+
+ADVIES = {
+    "STERKE OVERTUIGING": "AANHOUDEN",
+    "POSITIEF SIGNAAL":   "AANHOUDEN",
+    "GEMENGD SIGNAAL":    "MONITOREN",
+    "NEGATIEF SIGNAAL":   "VERKOPEN",
+    "SIGNAAL UITGEWERKT": "VERKOPEN",
+}
+
+
+@dataclass
+class Rules:
+    """Parameters van _build_result (uit monitor.py, zodat beide hetzelfde rekenen)."""
+    halflife: float
+    role_weight: Callable[[str], float]
+    is_csuite: Callable[[str], bool]
+    is_institutional: Callable[[str], bool]
+
+
+@dataclass
+class Trades:
+    """Transacties in kolommen, gegroepeerd per ticker: eerst de buys, dan de sells,
+    elk in de oorspronkelijke volgorde. bounds[i] = (start, einde buys, einde) van ticker i."""
+    tickers: list[str]
+    bounds: np.ndarray
+    tid: np.ndarray
+    buy: np.ndarray
+    amount: list
+    day: np.ndarray
+    ins: np.ndarray
+    insiders: list[str]
+    role: np.ndarray
+    roles: list[str]
+    filed: np.ndarray | None = None   # Filingdatum (ordinal), voor point-in-time selecties
+    # Classificatie van roles/insiders per Rules; gedeeld met select(), want die lijsten blijven gelijk
+    classified: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_columns(cls, ticker, buy, amount, day, insider, role, filed=None) -> "Trades":
+        """Uit losse kolommen (bijv. de backfill-historie); sorteert per ticker, buys eerst."""
+        tickers, tid  = np.unique(np.asarray(ticker, dtype=object).astype(str), return_inverse=True)
+        insiders, ins = np.unique(np.asarray(insider, dtype=object).astype(str), return_inverse=True)
+        roles, rid    = np.unique(np.asarray(role, dtype=object).astype(str), return_inverse=True)
+        buy   = np.asarray(buy, dtype=bool)
+        order = np.lexsort((np.arange(len(buy)), ~buy, tid.reshape(-1)))
+        tr = cls(
+            tickers=tickers.tolist(), bounds=np.zeros((0, 3), dtype=np.int64),
+            tid=tid.reshape(-1)[order], buy=buy[order],
+            amount=np.asarray(amount, dtype=np.float64)[order].tolist(),
+            day=np.asarray(day, dtype=np.int64)[order], ins=ins.reshape(-1)[order], insiders=insiders.tolist(),
+            role=rid.reshape(-1)[order], roles=roles.tolist(),
+            filed=None if filed is None else np.asarray(filed, dtype=np.int64)[order],
+        )
+        tr.bounds = tr._bounds()
+        return tr
+
+    def _bounds(self) -> np.ndarray:
+        ids   = np.arange(len(self.tickers))
+        start = np.searchsorted(self.tid, ids, side="left")
+        end   = np.searchsorted(self.tid, ids, side="right")
+        mid   = start + np.bincount(self.tid[self.buy], minlength=len(ids))
+        return np.stack([start, mid, end], axis=1)
+
+    def select(self, mask: np.ndarray) -> "Trades":
+        """Deelverzameling transacties (bijv. een venster); tickers en ids blijven gelijk."""
+        idx = np.flatnonzero(mask)
+        tr  = Trades(
+            tickers=self.tickers, bounds=self.bounds, tid=self.tid[idx], buy=self.buy[idx],
+            amount=np.asarray(self.amount, dtype=object)[idx].tolist(), day=self.day[idx],
+            ins=self.ins[idx], insiders=self.insiders, role=self.role[idx], roles=self.roles,
+            filed=None if self.filed is None else self.filed[idx], classified=self.classified,
+        )
+        tr.bounds = tr._bounds()
+        return tr
+
+    def classify(self, rules: Rules) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(gewicht, C-suite) per rol-id en institutioneel per insider-id, één keer per Rules."""
+        key = (rules.role_weight, rules.is_csuite, rules.is_institutional)
+        if key not in self.classified:
+            self.classified[key] = (
+                np.array([rules.role_weight(r) for r in self.roles], dtype=np.float64),
+                np.array([rules.is_csuite(r) for r in self.roles], dtype=bool),
+                np.array([rules.is_institutional(n) for n in self.insiders], dtype=bool),
+            )
+        return self.classified[key]
+
+    @classmethod
+    def from_groups(cls, groups: dict[str, tuple[list, list]]) -> "Trades":
+        """groups: ticker → (buys, sells), dicts met insider/role/amount/date (zoals _build_result)."""
+        ins_ids:  dict[str, int] = {}
+        role_ids: dict[str, int] = {}
+        tid, buy, amount, day, ins, role = [], [], [], [], [], []
+        bounds = np.zeros((len(groups), 3), dtype=np.int64)
+        for i, (buys, sells) in enumerate(groups.values()):
+            bounds[i, 0] = len(amount)
+            for side, txs in ((True, buys), (False, sells)):
+                for t in txs:
+                    tid.append(i)
+                    buy.append(side)
+                    amount.append(t["amount"])
+                    day.append(t["date"].toordinal())
+                    ins.append(ins_ids.setdefault(t["insider"], len(ins_ids)))
+                    role.append(role_ids.setdefault(t["role"], len(role_ids)))
+                if side:
+                    bounds[i, 1] = len(amount)
+            bounds[i, 2] = len(amount)
+        return cls(
+            tickers=list(groups), bounds=bounds,
+            tid=np.array(tid, dtype=np.int64), buy=np.array(buy, dtype=bool), amount=amount,
+            day=np.array(day, dtype=np.int64), ins=np.array(ins, dtype=np.int64), insiders=list(ins_ids),
+            role=np.array(role, dtype=np.int64), roles=list(role_ids),
+        )
+
+
+def _distinct(tid: np.ndarray, ins: np.ndarray, mask: np.ndarray, n_tickers: int, n_ins: int) -> np.ndarray:
+    """Aantal unieke insiders per ticker onder `mask`."""
+    pairs = np.unique(tid[mask] * max(n_ins, 1) + ins[mask])
+    return np.bincount(pairs // max(n_ins, 1), minlength=n_tickers)
+
+
+def compute(tr: Trades, rules: Rules, today: date) -> dict[str, np.ndarray]:
+    """Numerieke uitkomst per ticker (arrays in de volgorde van tr.tickers)."""
+    n_t   = len(tr.tickers)
+    n_ins = len(tr.insiders)
+    age   = today.toordinal() - tr.day
+
+    # Classificatie per unieke rol / insider i.p.v. per transactie
+    role_w, role_cs, inst = tr.classify(rules)
+
+    # Decay per unieke leeftijd, zelfde expressie als decay() in _build_result
+    ages, inv = np.unique(age, return_inverse=True)
+    decay     = np.array([math.exp(-int(a) * math.log(2) / rules.halflife) for a in ages])[inv.reshape(-1)]
+    weighted  = (np.array(tr.amount, dtype=np.float64) * decay * role_w[tr.role]).tolist()
+
+    total_buy, total_sell, w_net = [], [], np.empty(n_t)
+    for i, (s, m, e) in enumerate(tr.bounds.tolist()):
+        total_buy.append(sum(tr.amount[s:m]))
+        total_sell.append(sum(tr.amount[m:e]))
+        w_net[i] = sum(weighted[s:m]) - sum(weighted[m:e])
+    net_flow = [b - s for b, s in zip(total_buy, total_sell)]
+    net      = np.array(net_flow, dtype=np.float64)
+
+    last_buy = np.full(n_t, np.iinfo(np.int64).min)
+    np.maximum.at(last_buy, tr.tid[tr.buy], tr.day[tr.buy])
+    days_since = np.where(last_buy > np.iinfo(np.int64).min, today.toordinal() - last_buy, 999)
+
+    cs_row  = role_cs[tr.role] & ~inst[tr.ins]
+    buyers  = _distinct(tr.tid, tr.ins, tr.buy, n_t, n_ins)
+    cs_buy  = _distinct(tr.tid, tr.ins, tr.buy & cs_row, n_t, n_ins)
+    cs_sell = _distinct(tr.tid, tr.ins, ~tr.buy & cs_row, n_t, n_ins)
+    n_inst  = _distinct(tr.tid, tr.ins, tr.buy & inst[tr.ins], n_t, n_ins)
+    recent  = _distinct(tr.tid, tr.ins, tr.buy & (age <= 14), n_t, n_ins)
+
+    # Signaalclassificatie: zelfde regels, zelfde volgorde als _build_result
+    fresh = days_since <= 30
+    rule = {
+        "csuite":  (cs_buy > 0) & fresh & (cs_sell == 0) & (net > 0),
+        "inst":    (n_inst > 0) & (cs_buy == 0) & fresh,
+        "cluster": (recent >= 3) & fresh,
+        "mixed":   (net < 0) & fresh,
+        "cs_sell": (cs_sell > 0) & (cs_buy == 0) & ~fresh,
+        "w_neg":   (w_net < 0) & ~fresh,
+        "net_neg": (net < 0) & ~fresh,
+    }
+    signal = np.where(days_since <= 90, POSITIEF, UITGEWERKT)
+    signal = np.where(rule["csuite"], STERK, signal)
+    signal = np.where(rule["cluster"], STERK, signal)
+    signal = np.where(rule["mixed"], GEMENGD, signal)
+    signal = np.where(rule["cs_sell"], NEGATIEF, signal)
+    signal = np.where(rule["w_neg"], NEGATIEF, signal)
+    signal = np.where(rule["net_neg"], UITGEWERKT, signal)
+
+    return {
+        "signal": signal, "days_since_buy": days_since, "unique_buyers": buyers,
+        "csuite_buyers": cs_buy, "csuite_sellers": cs_sell, "institutional_buyers": n_inst,
+        "recent_buyers": recent, "net": net, "w_net": w_net,
+        # Python-waarden (int 0 zonder transacties, net als _build_result)
+        "total_buy": total_buy, "total_sell": total_sell, "net_flow": net_flow,
+        **{f"rule_{k}": v for k, v in rule.items()},
+    }
+
+
+def results(groups: dict[str, tuple[list, list]], rules: Rules, today: date) -> dict[str, dict]:
+    """Volledige resultaat-dicts per ticker, gelijk aan _build_result(ticker, buys, sells)."""
+    tr  = Trades.from_groups(groups)
+    col = compute(tr, rules, today)
+    out = {}
+    for i, (ticker, (buys, sells)) in enumerate(groups.items()):
+        days_since = int(col["days_since_buy"][i])
+        net_flow   = col["net_flow"][i]
+        signal     = SIGNALS[col["signal"][i]]
+
+        # Namen (en hun volgorde) exact als de set-comprehensions in _build_result
+        csuite_buyers  = {b["insider"] for b in buys
+                          if rules.is_csuite(b["role"]) and not rules.is_institutional(b["insider"])}
+        csuite_sellers = {s["insider"] for s in sells
+                          if rules.is_csuite(s["role"]) and not rules.is_institutional(s["insider"])}
+        institutional_buyers = {b["insider"] for b in buys if rules.is_institutional(b["insider"])}
+
+        if days_since <= 30:
+            reasons = [f"Vers buy signaal ({days_since}d geleden)"]
+        elif days_since <= 90:
+            reasons = [f"Buy signaal actief ({days_since}d geleden)"]
+        else:
+            reasons = [f"Geen insider buy in {days_since}d"]
+        if col["rule_csuite"][i]:
+            reasons.append(f"C-suite koper: {', '.join(list(csuite_buyers)[:2])}")
+        if col["rule_inst"][i]:
+            reasons.append(f"Institutionele koper: {', '.join(list(institutional_buyers)[:2])}")
+        if col["rule_cluster"][i]:
+            reasons.append(f"Cluster: {int(col['recent_buyers'][i])} insiders kochten in 14d")
+        if col["rule_mixed"][i]:
+            reasons.append(f"Netto sell ondanks verse buys: ${net_flow:,.0f}")
+        if col["rule_cs_sell"][i]:
+            reasons.append(f"C-suite verkoopt: {', '.join(list(csuite_sellers)[:2])}")
+        if col["rule_w_neg"][i]:
+            reasons.append("Gewogen netto negatief (sells zwaarder dan buys)")
+        if col["rule_net_neg"][i]:
+            reasons.append(f"Netto sell: ${net_flow:,.0f}")
+
+        out[ticker] = {
+            "ticker":        ticker,
+            "signal":        signal,
+            "advies":        ADVIES.get(signal, "MONITOREN"),
+            "reasons":       reasons,
+            "total_buy":     col["total_buy"][i],
+            "total_sell":    col["total_sell"][i],
+            "net_flow":      net_flow,
+            "days_since_buy": days_since,
+            "unique_buyers": int(col["unique_buyers"][i]),
+            "csuite_buyers": list(csuite_buyers),
+            "csuite_sellers": list(csuite_sellers),
+            "institutional_buyers": list(institutional_buyers),
+            "buys_detail":   _detail(buys),
+            "sells_detail":  _detail(sells),
+            "discovery":     None,
+        }
+    return out
+
+
+def _detail(txs: list, n: int = 8) -> list[dict]:
+    return [{"insider": t["insider"], "role": t["role"],
+             "amount": t["amount"], "date": t["date"].isoformat()}
+            for t in sorted(txs, key=lambda x: x["date"], reverse=True)[:n]]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Single-flight: gelijktijdige aanvragen voor dezelfde key delen één fetch.
+
+De eerste aanroeper (leader) voert de functie uit; wie tijdens die fetch met
+dezelfde key komt wacht op het resultaat (of dezelfde exceptie) in plaats van
+een tweede request te doen. Na afloop verdwijnt de key weer: memoization over
+de hele run gebeurt een laag hoger (zie HttpCache.fetch_json).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done   = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Thread-safe; ado() is de asyncio-variant (binnen één event loop)."""
+
+    def __init__(self):
+        self.leaders = 0   # Uitgevoerde fetches
+        self.shared  = 0   # Aanvragen die op een lopende fetch meeliften
+        self._lock   = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self._acalls: dict[str, asyncio.Future] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call   = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        fut = self._acalls.get(key)
+        if fut is not None:
+            with self._lock:
+                self.shared += 1
+            return await asyncio.shield(fut)
+        fut = self._acalls[key] = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()   # Geen "exception never retrieved" als niemand meewachtte
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            del self._acalls[key]
+
+    def summary(self) -> str:
+        with self._lock:
+            return f"{self.shared} dubbele requests samengevoegd ({self.leaders} uitgevoerd)"
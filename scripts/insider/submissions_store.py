@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""Lokale index van SEC submissions uit het nachtelijke bulk-archief (SQLite).
+
+SEC publiceert elke nacht submissions.zip: per bedrijf CIK##########.json (de
+"recent"-kolommen) plus CIK##########-submissions-###.json (oudere filings).
+ingest() laadt daaruit (cik, accession, form, filingDate, primaryDocument) voor
+de ownership-forms (3/4/5), zodat de analysers per ticker lokaal kunnen zoeken
+i.p.v. data.sec.gov/submissions live op te halen.
+
+Incrementeel: per archief-member bewaren we een signatuur (CRC32 + grootte uit de
+zip-directory). Een volgende ingest parseert alleen gewijzigde members en
+verwijdert rijen van members die uit het archief verdwenen zijn.
+
+Het archief loopt tot de vorige nacht. filings() geeft None als de CIK niet
+gedekt is of de index ouder is dan MAX_AGE_DAYS; de aanroeper valt dan terug
+op de live submissions API. Een lokale zip of directory met dezelfde JSON-
+bestanden (fixture) kan overal in plaats van het echte archief gebruikt worden.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+import zipfile
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+ROOT         = Path(__file__).resolve().parent.parent.parent
+DB_PATH      = ROOT / "data" / "cache" / "submissions_index.sqlite3"
+ARCHIVE_PATH = ROOT / "data" / "cache" / "submissions.zip"
+ARCHIVE_URL  = "https://www.sec.gov/Archives/edgar/daily-index/bulkdata/submissions.zip"
+FORMS        = {"3", "3/A", "4", "4/A", "5", "5/A"}
+MAX_AGE_DAYS = float(os.getenv("SEC_SUBMISSIONS_MAX_AGE_DAYS", "3"))
+
+_MEMBER_RE = re.compile(r"CIK(\d{10})(?:-submissions-\d+)?\.json$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    id         INTEGER PRIMARY KEY,
+    name       TEXT NOT NULL UNIQUE,
+    cik        INTEGER NOT NULL,
+    sig        TEXT NOT NULL,
+    first_date TEXT                  -- Oudste filingDate (alle forms) in deze member
+);
+CREATE INDEX IF NOT EXISTS members_cik ON members (cik);
+CREATE TABLE IF NOT EXISTS filings (
+    cik              INTEGER NOT NULL,
+    accession        TEXT NOT NULL,
+    form             TEXT NOT NULL,
+    filing_date      TEXT NOT NULL,
+    primary_document TEXT NOT NULL,
+    member           INTEGER NOT NULL,
+    PRIMARY KEY (cik, accession)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS filings_cik_form_date ON filings (cik, form, filing_date);
+CREATE INDEX IF NOT EXISTS filings_member        ON filings (member);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _columns(data: dict, name: str) -> dict:
+    """Kolommen (accessionNumber, filingDate, ...) van een member."""
+    if "-submissions-" in name:
+        return data
+    return data.get("filings", {}).get("recent", {})
+
+
+def _rows(cols: dict, forms: set[str]) -> tuple[list[tuple], str | None]:
+    """(accession, form, filing_date, primary_document) voor `forms`, plus de oudste datum."""
+    acc   = cols.get("accessionNumber", [])
+    dates = cols.get("filingDate", [])
+    types = cols.get("form", [])
+    docs  = cols.get("primaryDocument", [])
+    rows  = []
+    for i, a in enumerate(acc):
+        if i < len(types) and types[i] in forms and i < len(dates):
+            rows.append((a, types[i], dates[i], docs[i] if i < len(docs) else ""))
+    return rows, (min(dates) if dates else None)
+
+
+def _members(archive: Path) -> Iterator[tuple[str, str, Callable[[], bytes]]]:
+    """(naam, signatuur, loader) per submissions-JSON in een zip of directory."""
+    if archive.is_dir():
+        for p in sorted(archive.glob("CIK*.json")):
+            st = p.stat()
+            yield p.name, f"{st.st_size}:{st.st_mtime_ns}", p.read_bytes
+        return
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            name = info.filename.rsplit("/", 1)[-1]
+            if _MEMBER_RE.match(name):
+                yield name, f"{info.file_size}:{info.CRC:08x}", lambda info=info: zf.read(info)
+
+
+class SubmissionsStore:
+    def __init__(self, path: Path = DB_PATH):
+        self.path  = Path(path)
+        self.hits  = 0   # Lookups uit de index
+        self.falls = 0   # Niet gedekt / te oud → live API
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _meta(self, key: str) -> str | None:
+        with self._lock:
+            r = self._db().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return r[0] if r else None
+
+    def _set_meta(self, db: sqlite3.Connection, key: str, value: str) -> None:
+        db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    # ── ingest ────────────────────────────────────────────────────────────────
+
+    def ingest(self, archive: Path, as_of: str, forms: set[str] = FORMS,
+               full: bool = False, progress: Callable[[int, int], None] | None = None) -> dict:
+        """Laad gewijzigde members uit `archive`. as_of = datum (ISO) van de archiefdata."""
+        archive = Path(archive)
+        forms_key = ",".join(sorted(forms))
+        if self._meta("forms") != forms_key:
+            full = True   # Andere form-selectie: alles opnieuw
+        with self._lock:
+            known = {name: (mid, sig) for mid, name, sig in self._db().execute("SELECT id, name, sig FROM members")}
+
+        stats = {"members": 0, "changed": 0, "removed": 0, "filings": 0}
+        seen: set[str] = set()
+        batch = 0
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN")
+            try:
+                for name, sig, load in _members(archive):
+                    stats["members"] += 1
+                    seen.add(name)
+                    prev = known.get(name)
+                    if prev and prev[1] == sig and not full:
+                        continue
+                    try:
+                        data = json.loads(load())
+                    except (ValueError, OSError, zipfile.BadZipFile):
+                        continue
+                    cik = int(_MEMBER_RE.match(name).group(1))
+                    rows, first = _rows(_columns(data, name), forms)
+                    if prev:
+                        mid = prev[0]
+                        db.execute("DELETE FROM filings WHERE member = ?", (mid,))
+                        db.execute("UPDATE members SET sig = ?, first_date = ? WHERE id = ?", (sig, first, mid))
+                    else:
+                        mid = db.execute(
+                            "INSERT INTO members (name, cik, sig, first_date) VALUES (?, ?, ?, ?)",
+                            (name, cik, sig, first),
+                        ).lastrowid
+                    db.executemany(
+                        "INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?, ?)",
+                        [(cik, a, f, d, p, mid) for a, f, d, p in rows],
+                    )
+                    stats["changed"] += 1
+                    stats["filings"] += len(rows)
+                    batch += 1
+                    if batch >= 2000:   # Tussentijds committen: lezers blokkeren niet te lang
+                        db.execute("COMMIT")
+                        db.execute("BEGIN")
+                        batch = 0
+                    if progress and stats["changed"] % 10_000 == 0:
+                        progress(stats["members"], stats["changed"])
+
+                for name, (mid, _) in known.items():
+                    if name not in seen:
+                        db.execute("DELETE FROM filings WHERE member = ?", (mid,))
+                        db.execute("DELETE FROM members WHERE id = ?", (mid,))
+                        stats["removed"] += 1
+                self._set_meta(db, "forms", forms_key)
+                self._set_meta(db, "as_of", as_of)
+                self._set_meta(db, "ingested_at", datetime.now(timezone.utc).isoformat(timespec="seconds"))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return stats
+
+    # ── lezen ─────────────────────────────────────────────────────────────────
+
+    def as_of(self) -> str | None:
+        """Datum (ISO) tot waar de index de archiefdata bevat."""
+        return self._meta("as_of")
+
+    def is_fresh(self, max_age_days: float = MAX_AGE_DAYS) -> bool:
+        as_of = self.as_of()
+        if not as_of:
+            return False
+        return date.fromisoformat(as_of[:10]) >= date.today() - timedelta(days=max_age_days)
+
+    def covers(self, cik: str | int) -> bool:
+        with self._lock:
+            return self._db().execute(
+                "SELECT 1 FROM members WHERE cik = ? LIMIT 1", (int(cik),)
+            ).fetchone() is not None
+
+    def filings(self, cik: str | int, forms: tuple[str, ...] = ("4", "4/A"),
+                since: date | str | None = None) -> list[dict] | None:
+        """Filings van een CIK, nieuwste eerst, in de vorm van de submissions-kolommen.
+
+        None als de index deze CIK niet dekt of te oud is: gebruik dan de live API.
+        """
+        if not self.path.exists() or not self.is_fresh() or not self.covers(cik):
+            with self._lock:
+                self.falls += 1
+            return None
+        sql  = (f"SELECT accession, form, filing_date, primary_document FROM filings "
+                f"WHERE cik = ? AND form IN ({','.join('?' * len(forms))})")
+        args: list = [int(cik), *forms]
+        if since:
+            sql += " AND filing_date >= ?"
+            args.append(since.isoformat() if isinstance(since, date) else str(since))
+        sql += " ORDER BY filing_date DESC, accession DESC"
+        with self._lock:
+            rows = self._db().execute(sql, args).fetchall()
+            self.hits += 1
+        return [
+            {"accessionNumber": a, "form": f, "filingDate": d, "primaryDocument": p}
+            for a, f, d, p in rows
+        ]
+
+    def first_filing(self, cik: str | int) -> str | None:
+        """Oudste filingDate van het bedrijf over alle forms (voor de IPO-check)."""
+        if not self.path.exists() or not self.is_fresh():
+            return None
+        with self._lock:
+            r = self._db().execute(
+                "SELECT MIN(first_date), COUNT(*) FROM members WHERE cik = ?", (int(cik),)
+            ).fetchone()
+        return r[0] if r and r[1] else None
+
+    def summary(self) -> str:
+        with self._lock:
+            total = self.hits + self.falls
+        if not total:
+            return "submissions-index: niet gebruikt"
+        return (f"submissions-index (t/m {self.as_of() or '-'}): {self.hits} lokaal, "
+                f"{self.falls} via live API ({self.hits / total:.0%} lokaal)")
+
+
+def download(dest: Path = ARCHIVE_PATH, url: str = ARCHIVE_URL, user_agent: str = "") -> tuple[bool, str]:
+    """Download het bulk-archief als het gewijzigd is (If-Modified-Since).
+
+    Geeft (nieuw gedownload, datum van de data als ISO) terug. Gestreamd naar
+    schijf: het archief is enkele GB's, te groot voor http_client (in memory).
+    """
+    from insider.ratelimit import SEC_LIMITER
+
+    headers = {"User-Agent": user_agent or os.getenv("SEC_USER_AGENT", "InsiderMonitor/1.0 (contact: you@example.com)")}
+    if dest.exists():
+        headers["If-Modified-Since"] = format_datetime(
+            datetime.fromtimestamp(dest.stat().st_mtime, timezone.utc), usegmt=True)
+    SEC_LIMITER.acquire()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=120) as r:
+            modified = r.headers.get("Last-Modified")
+            tmp = dest.with_suffix(f".{os.getpid()}.tmp")
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                while chunk := r.read(1 << 20):
+                    f.write(chunk)
+            os.replace(tmp, dest)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return False, archive_date(dest)
+        raise
+    if modified:
+        try:
+            ts = parsedate_to_datetime(modified).timestamp()
+            os.utime(dest, (ts, ts))
+        except (TypeError, ValueError):
+            pass
+    return True, archive_date(dest)
+
+
+def archive_date(archive: Path) -> str:
+    """Datum van de data in een archief: mtime (= Last-Modified na download)."""
+    return datetime.fromtimestamp(Path(archive).stat().st_mtime, timezone.utc).date().isoformat()
+
+
+# Gedeelde instantie
+SUBMISSIONS = SubmissionsStore()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Lokale transactie-store (SQLite) voor deepdive-resultaten.
+
+portfolio_deepdive_270d.py schrijft per run de genormaliseerde P/S-transacties
+weg; portfolio_monitor en candidate_research lezen per ticker (en venster) via de
+index i.p.v. alle deepdive_*.json bestanden te openen tot de ticker gevonden is.
+
+Per ticker geldt de meest recente deepdive als snapshot: een nieuwe run vervangt
+de rijen van die ticker (net als voorheen "nieuwste JSON wint"). De tabel
+`tickers` legt vast welke tickers gedekt zijn, ook als er geen transacties waren.
+
+De JSON-bestanden blijven het exportformaat. sync_reports() importeert JSON's die
+de store nog niet kent (bijv. opgehaald uit CI), op basis van naam + mtime.
+
+Daarnaast: `history`, de Form 4-historie uit backfill_form4.py. Eén rij per
+nonDerivative-transactie (alle codes, geen bedragfilter), sleutel accession +
+volgnummer, zodat opnieuw verwerken idempotent is. `backfill_days` is het
+checkpoint: een dag staat er pas in als al zijn filings verwerkt zijn.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+DB_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "state" / "transactions.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickers (
+    ticker    TEXT PRIMARY KEY,
+    generated TEXT NOT NULL,
+    days      INTEGER,
+    source    TEXT,
+    loaded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    ticker  TEXT NOT NULL,
+    date    TEXT,
+    insider TEXT NOT NULL,
+    role    TEXT NOT NULL,
+    code    TEXT NOT NULL,
+    buy     REAL NOT NULL,
+    sell    REAL NOT NULL,
+    plan    TEXT NOT NULL,
+    xml     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tx_ticker_date  ON transactions (ticker, date);
+CREATE INDEX IF NOT EXISTS tx_insider_date ON transactions (insider, date);
+CREATE TABLE IF NOT EXISTS imports (
+    file  TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    accession   TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    issuer_cik  TEXT NOT NULL,
+    ticker      TEXT NOT NULL,
+    filing_date TEXT NOT NULL,
+    date        TEXT,
+    insider     TEXT NOT NULL,
+    role        TEXT NOT NULL,
+    code        TEXT NOT NULL,
+    shares      REAL NOT NULL,
+    price       REAL NOT NULL,
+    amount      REAL NOT NULL,
+    plan        INTEGER NOT NULL,
+    PRIMARY KEY (accession, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS history_ticker_date ON history (ticker, date);
+CREATE INDEX IF NOT EXISTS history_code_date   ON history (code, date);
+CREATE TABLE IF NOT EXISTS backfill_days (
+    day     TEXT PRIMARY KEY,
+    filings INTEGER NOT NULL,
+    rows    INTEGER NOT NULL,
+    done_at REAL NOT NULL
+);
+"""
+
+_COLUMNS = "ticker, date, insider, role, code, buy, sell, plan, xml"
+_HISTORY = "accession, seq, issuer_cik, ticker, filing_date, date, insider, role, code, shares, price, amount, plan"
+
+
+def _iso(d) -> str | None:
+    if not d:
+        return None
+    return d.isoformat() if isinstance(d, date) else str(d)[:10]
+
+
+def _row_dict(r: tuple) -> dict:
+    """Zelfde vorm als een transactie in de deepdive JSON."""
+    return {
+        "ticker": r[0], "date": r[1], "insider": r[2], "role": r[3], "code": r[4],
+        "BUY": r[5], "SELL": r[6], "10b5-1": r[7], "xml": r[8],
+    }
+
+
+class TransactionStore:
+    def __init__(self, path: Path = DB_PATH):
+        self.path  = Path(path)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._synced: set[Path] = set()   # Per proces één keer per reports-dir
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ── schrijven ─────────────────────────────────────────────────────────────
+
+    def write_run(self, tickers: list[str], generated: str, days: int | None,
+                  rows: list[dict], source: str = "") -> None:
+        """Vervang de snapshot van elke ticker in deze run door `rows`."""
+        by_ticker: dict[str, list[dict]] = {t.upper(): [] for t in tickers}
+        for r in rows:
+            by_ticker.setdefault(str(r.get("ticker", "")).upper(), []).append(r)
+
+        with self._lock:
+            db = self._db()
+            with db:   # Eén transactie: lezers zien nooit een halve snapshot
+                for ticker, tx in by_ticker.items():
+                    prev = db.execute("SELECT generated FROM tickers WHERE ticker = ?", (ticker,)).fetchone()
+                    if prev and prev[0] > generated:
+                        continue   # Oudere run (bijv. late import) overschrijft geen nieuwere
+                    db.execute("DELETE FROM transactions WHERE ticker = ?", (ticker,))
+                    db.executemany(
+                        f"INSERT INTO transactions ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(
+                            ticker, _iso(r.get("date")), r.get("insider") or "Unknown",
+                            r.get("role") or "", str(r.get("code", "")).upper(),
+                            float(r.get("BUY") or 0), float(r.get("SELL") or 0),
+                            r.get("10b5-1") or "", r.get("xml") or "",
+                        ) for r in tx],
+                    )
+                    db.execute(
+                        "INSERT OR REPLACE INTO tickers VALUES (?, ?, ?, ?, ?)",
+                        (ticker, generated, days, source, time.time()),
+                    )
+
+    def import_json(self, path: Path) -> None:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        self.write_run(data.get("tickers", []), str(data.get("generated", "")),
+                       data.get("days"), data.get("transactions", []), source=Path(path).name)
+
+    def sync_reports(self, reports_dir: Path) -> int:
+        """Importeer deepdive_*.json die nieuw of gewijzigd zijn. Geeft het aantal terug."""
+        reports_dir = Path(reports_dir).resolve()
+        if reports_dir in self._synced:
+            return 0
+        self._synced.add(reports_dir)
+        files = []
+        for p in reports_dir.glob("deepdive_*.json"):
+            try:
+                files.append((p, p.stat().st_mtime))
+            except OSError:
+                pass
+        if not files:
+            return 0
+        with self._lock:
+            known = dict(self._db().execute("SELECT file, mtime FROM imports"))
+        todo = [(p, m) for p, m in files if known.get(str(p.resolve())) != m]
+
+        imported = 0
+        for p, mtime in sorted(todo, key=lambda x: x[1]):   # Oud → nieuw: nieuwste wint
+            try:
+                self.import_json(p)
+                imported += 1
+            except (OSError, ValueError):
+                pass
+            with self._lock, self._db() as db:
+                db.execute("INSERT OR REPLACE INTO imports VALUES (?, ?)", (str(p.resolve()), mtime))
+        return imported
+
+    def mark_exported(self, path: Path) -> None:
+        """JSON-export van een run die al in de store staat: niet opnieuw importeren."""
+        path = Path(path)
+        with self._lock, self._db() as db:
+            db.execute("INSERT OR REPLACE INTO imports VALUES (?, ?)", (str(path.resolve()), path.stat().st_mtime))
+
+    def write_history(self, rows: list[tuple], day: date | str | None = None, filings: int = 0) -> None:
+        """Historie-rijen (volgorde als _HISTORY) opslaan; met `day` ook het checkpoint."""
+        with self._lock, self._db() as db:
+            db.executemany(f"INSERT OR REPLACE INTO history ({_HISTORY}) VALUES ({', '.join('?' * 13)})", rows)
+            if day is not None:
+                db.execute("INSERT OR REPLACE INTO backfill_days VALUES (?, ?, ?, ?)",
+                           (_iso(day), filings, len(rows), time.time()))
+
+    def backfilled_days(self, since: date | str, until: date | str) -> set[str]:
+        with self._lock:
+            return {r[0] for r in self._db().execute(
+                "SELECT day FROM backfill_days WHERE day BETWEEN ? AND ?", (_iso(since), _iso(until)))}
+
+    # ── lezen ─────────────────────────────────────────────────────────────────
+
+    def coverage(self, ticker: str) -> dict | None:
+        """{generated, days} van de laatste deepdive voor deze ticker, of None."""
+        with self._lock:
+            r = self._db().execute(
+                "SELECT generated, days FROM tickers WHERE ticker = ?", (ticker.upper(),)
+            ).fetchone()
+        return {"generated": r[0], "days": r[1]} if r else None
+
+    def transactions(self, ticker: str, since: date | str | None = None,
+                     until: date | str | None = None, undated: bool = False) -> list[dict] | None:
+        """Transacties van een ticker (optioneel binnen [since, until]); None als niet gedekt.
+
+        undated: rijen zonder datum (NULL of leeg) ook teruggeven, ongeacht het venster.
+        """
+        if self.coverage(ticker) is None:
+            return None
+        sql  = f"SELECT {_COLUMNS} FROM transactions WHERE ticker = ?"
+        args: list = [ticker.upper()]
+        window = []
+        if since:
+            window.append("date >= ?")
+            args.append(_iso(since))
+        if until:
+            window.append("date <= ?")
+            args.append(_iso(until))
+        if window:
+            cond = " AND ".join(window)
+            sql += f" AND (({cond}) OR COALESCE(date, '') = '')" if undated else f" AND {cond}"
+        sql += " ORDER BY date, insider, code"
+        with self._lock:
+            return [_row_dict(r) for r in self._db().execute(sql, args)]
+
+    def by_insider(self, insider: str, since: date | str | None = None) -> list[dict]:
+        sql  = f"SELECT {_COLUMNS} FROM transactions WHERE insider = ?"
+        args: list = [insider]
+        if since:
+            sql += " AND date >= ?"
+            args.append(_iso(since))
+        sql += " ORDER BY date"
+        with self._lock:
+            return [_row_dict(r) for r in self._db().execute(sql, args)]
+
+    def history(self, ticker: str | None = None, since: date | str | None = None,
+                until: date | str | None = None, codes: tuple[str, ...] = ("P", "S")) -> list[dict]:
+        """Backfill-transacties, optioneel per ticker en binnen [since, until], oud → nieuw."""
+        sql  = f"SELECT {_HISTORY} FROM history WHERE code IN ({', '.join('?' * len(codes))})"
+        args: list = list(codes)
+        if ticker:
+            sql += " AND ticker = ?"
+            args.append(ticker.upper())
+        if since:
+            sql += " AND date >= ?"
+            args.append(_iso(since))
+        if until:
+            sql += " AND date <= ?"
+            args.append(_iso(until))
+        sql += " ORDER BY date, accession, seq"
+        with self._lock:
+            cols = _HISTORY.split(", ")
+            return [{**dict(zip(cols, r)), "plan": bool(r[12])} for r in self._db().execute(sql, args)]
+
+
+# Gedeelde instantie
+TX_STORE = TransactionStore()
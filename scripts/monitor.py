@@ -18,19 +18,29 @@ Gebruik:
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import math
 import os
-import re
 import sys
 import time
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from urllib.request import Request, urlopen
 from urllib.parse import urlencode
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from insider import concurrency, daily_index, efts, form4, http_client, roles, scoring
+from insider.accession_store import AccessionStore
+from insider.cik_state import CikState
+from insider.doc_cache import FORM4_CACHE, is_ownership_doc
+from insider.http_cache import HTTP_CACHE
+from insider.ratelimit import SEC_LIMITER
+from insider.singleflight import SingleFlight
+from insider.submissions_store import SUBMISSIONS
+
 # ── Configuratie ──────────────────────────────────────────────────────────────
 
 UA        = os.getenv("SEC_USER_AGENT", "InsiderMonitor/2.0 (contact: you@example.com)")
@@ -44,55 +54,78 @@ MAX_BUY_USD      = 20_000_000  # Sanity cap: erboven = ADS-structuurfout (SVRE $
 MIN_BUY_ANALYSIS = 50_000     # Minimaal aankoopbedrag voor 270d analyse
 IPO_MIN_DAYS     = 365        # Bedrijf minimaal 1 jaar genoteerd
 DECAY_HALFLIFE   = 90         # Half-life tijdsdecay in dagen (Lakonishok & Lee 2001)
-MAX_WORKERS      = 3          # Parallelle threads voor analyse
-REQUEST_DELAY    = 0.35       # Seconden pauze per HTTP-request
+MAX_WORKERS      = 8          # Bovengrens threads; requests in flight regelt insider/concurrency.py (AIMD), rate SEC_MAX_RPS
+DISCOVERY_CONCURRENCY = 8     # Gelijktijdige filings in de asyncio discovery-engine
 HTTP_TIMEOUT     = 15         # Timeout per request in seconden
 HTTP_RETRIES     = 4          # Aantal retries bij fout
 TOP_N            = 3          # Kandidaten in Telegram
 
-# C-suite keywords — Seyhun (1998): CEO/CFO/COO buys zijn het meest predictief
-CSUITE = {"ceo", "chief executive", "president", "cfo", "chief financial",
-          "coo", "chief operating", "cto", "chief technology", "clo", "chief legal",
-          "evp", "executive vice", "svp", "senior vice"}
-
 # Sell-codes die géén bewuste marktkeuze zijn → negeren als sell-signaal
 IGNORE_SELL_CODES = {"F", "A", "M", "G", "W", "J", "C", "D", "L", "Z"}
 
 # ── HTTP ──────────────────────────────────────────────────────────────────────
 
-_rate_lock    = threading.Lock()
-_last_request = 0.0          # Tijdstip van de laatste request (voor throttling)
+def _get(url: str) -> str:
+    """Eén GET-poging binnen de adaptieve host-limiet; de aanroeper claimt het rate-slot."""
+    r = concurrency.get(url, headers={"User-Agent": UA, "Accept": "*/*"}, timeout=HTTP_TIMEOUT)
+    return r.text
+
+
+def _retry_wait(e: Exception, attempt: int, retries: int) -> float | None:
+    """Wachttijd na een mislukte poging; None = niet opnieuw proberen (404).
+
+    Bij 429/5xx pauzeert de host-limiter zelf (Retry-After, gedeeld door alle
+    workers); de volgende poging wacht daar vanzelf op.
+    """
+    wait = concurrency.retry_wait(e, attempt)
+    if wait is None:
+        return None
+    return wait if attempt < retries - 1 else 0.0
+
+
+# Gelijktijdige GET's naar dezelfde URL (bijv. meerdere EFTS-hits voor één filing)
+# wachten op één request
+FLIGHT = SingleFlight()
 
 
 def _fetch(url: str, retries: int = HTTP_RETRIES) -> str:
     """GET met retry, rate limiting en backoff. Thread-safe.
 
-    Rate limiting: globaal minimaal REQUEST_DELAY seconden tussen requests.
-    Sleep gebeurt BUITEN het lock zodat threads echt parallel draaien.
+    Rate limiting: gedeelde token bucket over alle processen (SEC_LIMITER).
+    Elke poging claimt een slot; het wachten gebeurt buiten elk lock.
+    Gelijktijdige aanroepen voor dezelfde URL delen één fetch (FLIGHT).
     """
-    global _last_request
-    with _rate_lock:
-        now       = time.time()
-        sleep_for = max(0.0, REQUEST_DELAY - (now - _last_request))
-        _last_request = now + sleep_for   # claim dit slot vooruit
-    if sleep_for > 0:
-        time.sleep(sleep_for)
+    return FLIGHT.do(url, lambda: _fetch_uncoalesced(url, retries))
 
+
+def _fetch_uncoalesced(url: str, retries: int) -> str:
     for attempt in range(retries):
+        SEC_LIMITER.acquire()
         try:
-            req = Request(url, headers={"User-Agent": UA, "Accept": "*/*"})
-            with urlopen(req, timeout=HTTP_TIMEOUT) as r:
-                return r.read().decode("utf-8", "ignore")
+            return _get(url)
         except Exception as e:
-            code = getattr(e, "code", None)
-            if code == 429:
-                wait = 20 * (attempt + 1)
-                print(f"[warn] 429 rate limit — wacht {wait}s", file=sys.stderr)
-                time.sleep(wait)
-            elif code == 404:
-                return ""   # 404 = bestand bestaat niet, niet opnieuw proberen
-            elif attempt < retries - 1:
-                time.sleep(min(8, 1.5 ** attempt))
+            wait = _retry_wait(e, attempt, retries)
+            if wait is None:
+                return ""
+            time.sleep(wait)
+    return ""
+
+
+async def _afetch(url: str, retries: int = HTTP_RETRIES) -> str:
+    """Asyncio-variant van _fetch: wacht op het rate-slot zonder een thread te blokkeren."""
+    return await FLIGHT.ado(url, lambda: _afetch_uncoalesced(url, retries))
+
+
+async def _afetch_uncoalesced(url: str, retries: int) -> str:
+    for attempt in range(retries):
+        await SEC_LIMITER.acquire_async()
+        try:
+            return await asyncio.to_thread(_get, url)
+        except Exception as e:
+            wait = _retry_wait(e, attempt, retries)
+            if wait is None:
+                return ""
+            await asyncio.sleep(wait)
     return ""
 
 
@@ -101,6 +134,65 @@ def _fetch_json(url: str) -> dict | list:
     return json.loads(text) if text else {}
 
 
+def _get_conditional(url: str, headers: dict) -> http_client.Response:
+    """GET met validators, retry en rate limiting; 304 komt terug als Response."""
+    for attempt in range(HTTP_RETRIES):
+        SEC_LIMITER.acquire()
+        try:
+            return concurrency.get(url, headers={"User-Agent": UA, "Accept": "*/*", **headers},
+                                   timeout=HTTP_TIMEOUT)
+        except Exception as e:
+            wait = _retry_wait(e, attempt, HTTP_RETRIES)
+            if wait is None or attempt == HTTP_RETRIES - 1:
+                raise
+            time.sleep(wait)
+    raise ConnectionError(url)
+
+
+def _fetch_index(url: str) -> str:
+    """Dag-index ophalen; 404 (niet gepubliceerd) direct doorgeven. 403 kan throttling
+    zijn en krijgt backoff; blijft het 403, dan beslist DailyIndex via de listing."""
+    for attempt in range(HTTP_RETRIES):
+        SEC_LIMITER.acquire()
+        try:
+            return concurrency.get(url, headers={"User-Agent": UA}, timeout=HTTP_TIMEOUT).text
+        except Exception as e:
+            wait = _retry_wait(e, attempt, HTTP_RETRIES)
+            if wait is None or attempt == HTTP_RETRIES - 1:
+                raise
+            time.sleep(wait)
+    raise ConnectionError(url)
+
+
+DAILY_INDEX = daily_index.DailyIndex(_fetch_index)
+
+
+def _fetch_meta_json(url: str) -> dict | list:
+    """company_tickers.json / submissions JSON via de revaliderende HTTP_CACHE.
+
+    Eén fetch per URL per run (memo + single-flight): _is_recent_ipo en
+    analyse_ticker delen zo de submissions JSON van een bedrijf. Niet muteren.
+    """
+    try:
+        return HTTP_CACHE.fetch_json(url, _get_conditional)
+    except Exception:
+        return {}
+
+
+async def _afetch_json(url: str) -> dict | list:
+    text = await _afetch(url)
+    return json.loads(text) if text else {}
+
+
+def _fetch_doc(url: str) -> str:
+    """Form 4 XML via de persistente document-cache (filings zijn immutable)."""
+    return FORM4_CACHE.fetch(url, _fetch, validate=is_ownership_doc)
+
+
+async def _afetch_doc(url: str) -> str:
+    return await FORM4_CACHE.afetch(url, _afetch, validate=is_ownership_doc)
+
+
 # ── CIK lookup ────────────────────────────────────────────────────────────────
 
 # Bekende Foreign Private Issuers die geen Form 4 hoeven in te dienen bij de SEC.
@@ -113,7 +205,7 @@ KNOWN_FPIS: dict[str, str] = {}
 def load_cik_map() -> dict[str, str]:
     """Laad ticker→CIK van SEC. Returns {} bij fout (non-fataal)."""
     try:
-        data = _fetch_json("https://www.sec.gov/files/company_tickers.json")
+        data = _fetch_meta_json("https://www.sec.gov/files/company_tickers.json")
         return {
             str(v.get("ticker", "")).upper(): str(v.get("cik_str", "")).zfill(10)
             for v in data.values()
@@ -126,9 +218,27 @@ def load_cik_map() -> dict[str, str]:
 
 # ── EFTS discovery ────────────────────────────────────────────────────────────
 
-def discover_recent_buys(days: int = DISCOVERY_DAYS) -> list[dict]:
+# Verwerkte accessions + hun resultaat: overlappende lookback haalt alleen nieuwe XML op.
+# De source bevat de filterregels van _buys_from_doc (bedragen, IPO-drempel; v = overige
+# regels zoals de 10%-owner-uitsluiting): een wijziging daarin maakt de store ongeldig.
+PROCESSED = AccessionStore(source=f"monitor/{MIN_BUY_USD}/{MAX_BUY_USD}/{IPO_MIN_DAYS}/v1")
+
+
+def discover_recent_buys(
+    days: int = DISCOVERY_DAYS, engine: str = "async", rescan: bool = False,
+    source: str = "efts",
+) -> list[dict]:
     """
-    Haal recente Form 4 open-market aankopen op via SEC EFTS API.
+    Haal recente Form 4 open-market aankopen op via SEC EFTS API of de dag-index.
+
+    engine="async"  : asyncio-engine, parseert filings zodra hun XML binnen is
+    engine="threads": oude ThreadPoolExecutor-route (referentie / fallback)
+    rescan=True     : negeer de accession-store en verwerk alles opnieuw
+    source="index"  : filinglijst uit de EDGAR master-index per werkdag
+                      (insider/daily_index.py) i.p.v. EFTS-zoekopdrachten
+
+    Al verwerkte accessions (PROCESSED) worden niet opnieuw opgehaald; hun
+    rijen komen uit de store.
 
     Geeft per filing terug:
       ticker, cik, issuer, insider, role, is_csuite, date, amount
@@ -137,137 +247,237 @@ def discover_recent_buys(days: int = DISCOVERY_DAYS) -> list[dict]:
     start = (today - timedelta(days=days)).isoformat()
     end   = today.isoformat()
 
-    filings = []
-    offset, page_size = 0, 100
-
-    while True:
-        url = (
-            f"https://efts.sec.gov/LATEST/search-index?forms=4"
-            f"&dateRange=custom&startdt={start}&enddt={end}"
-            f"&from={offset}"
-        )
-        data  = _fetch_json(url)
-        hits  = data.get("hits", {}).get("hits", [])
-        total = data.get("hits", {}).get("total", {}).get("value", 0)
-        if not hits:
-            break
-
-        for h in hits:
-            src  = h.get("_source", {})
-            adsh = src.get("adsh") or h.get("_id", "").split(":")[0]
-            # XML-bestandsnaam zit in _id na ":"
-            raw_id   = h.get("_id", "")
-            xml_file = raw_id.split(":")[-1] if ":" in raw_id else "form4.xml"
-            # CIK: gebruik ciks[0] (= reporting owner CIK, niet filing agent)
-            ciks = src.get("ciks", [])
-            cik  = str(int(ciks[0])) if ciks else None
-            if cik:
-                filings.append({
-                    "adsh": adsh, "xml_file": xml_file,
-                    "file_date": src.get("file_date", ""), "cik": cik,
-                })
-
-        offset += len(hits)
-        if offset >= total:
-            break
+    if engine == "threads":
+        filings = _list_filings(start, end) if source == "efts" else _index_filings(start, end)
+        new, rows = _split_known(filings, rescan)
+        rows += _discover_threads(new)
+        n_filings = len(filings)
+    else:
+        batches = _aiter_efts(start, end) if source == "efts" else _aiter_index(start, end)
+        n_filings, rows = asyncio.run(_discover_async(batches, rescan))
+    PROCESSED.prune()
 
-    print(f"[discovery] {len(filings)} Form 4 filings gevonden ({start} → {end})", file=sys.stderr)
+    print(f"[discovery] {n_filings} Form 4 filings gevonden ({start} → {end}, {source})", file=sys.stderr)
+    if source == "index":
+        print(f"[cache] {DAILY_INDEX.summary()}", file=sys.stderr)
 
     results = []
     seen    = set()
+    for row in rows:
+        key = (row["ticker"], row["insider"], row["date"])
+        if key not in seen:
+            seen.add(key)
+            results.append(row)
+
+    results.sort(key=lambda x: -x["amount"])
+    print(f"[discovery] {len(results)} kandidaten na filtering", file=sys.stderr)
+    return results
+
+
+def _efts_filings(hits: list[dict]) -> list[dict]:
+    """Filings uit een lijst EFTS-hits."""
+    filings = []
+    for h in hits:
+        src  = h.get("_source", {})
+        adsh = src.get("adsh") or h.get("_id", "").split(":")[0]
+        # XML-bestandsnaam zit in _id na ":"
+        raw_id   = h.get("_id", "")
+        xml_file = raw_id.split(":")[-1] if ":" in raw_id else "form4.xml"
+        # CIK: gebruik ciks[0] (= reporting owner CIK, niet filing agent)
+        ciks = src.get("ciks", [])
+        cik  = str(int(ciks[0])) if ciks else None
+        if cik:
+            filings.append({
+                "adsh": adsh, "xml_file": xml_file,
+                "file_date": src.get("file_date", ""), "cik": cik,
+            })
+    return filings
+
+
+def _list_filings(start: str, end: str) -> list[dict]:
+    """Alle EFTS-pagina's ophalen (thread-engine); pagina 2..n parallel."""
+    return _efts_filings(efts.search(start, end, _fetch_json))
+
+
+async def _aiter_efts(start: str, end: str):
+    """Async generator: levert per EFTS-pagina de filings, zodat parsen al start
+    terwijl de overige pagina's nog geladen worden."""
+    async for hits in efts.aiter_pages(start, end, _afetch_json):
+        yield _efts_filings(hits)
+
+
+def _index_filings(start: str, end: str) -> list[dict]:
+    """Filinglijst uit de dag-indexen (thread-engine)."""
+    return DAILY_INDEX.filings(date.fromisoformat(start), date.fromisoformat(end))
+
+
+async def _aiter_index(start: str, end: str):
+    """Async generator: één batch per werkdag uit de dag-index."""
+    for day in daily_index.business_days(date.fromisoformat(start), date.fromisoformat(end)):
+        try:
+            yield await asyncio.to_thread(DAILY_INDEX.day, day)
+        except daily_index.IndexUnavailable as e:
+            print(f"[warn] {e} — dag overgeslagen", file=sys.stderr)
+
+
+def _split_known(filings: list[dict], rescan: bool = False) -> tuple[list[dict], list[dict]]:
+    """(nog te verwerken filings, opgeslagen rijen van al verwerkte filings)."""
+    if rescan:
+        return filings, []
+    known = PROCESSED.lookup([f["adsh"] for f in filings])
+    rows  = [row for stored in known.values() for row in stored]
+    return [f for f in filings if f["adsh"] not in known], rows
 
+
+def _discover_threads(filings: list[dict]) -> list[dict]:
+    rows = []
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
         futures = {ex.submit(_parse_filing, f): f for f in filings}
         for future in as_completed(futures):
-            for row in (future.result() or []):
-                key = (row["ticker"], row["insider"], row["date"])
-                if key not in seen:
-                    seen.add(key)
-                    results.append(row)
+            rows.extend(future.result() or [])
+    return rows
 
-    results.sort(key=lambda x: -x["amount"])
-    print(f"[discovery] {len(results)} kandidaten na filtering", file=sys.stderr)
-    return results
 
+async def _discover_async(batches, rescan: bool = False) -> tuple[int, list[dict]]:
+    """Verwerk filings uit een async iterator van batches met begrensde concurrency.
 
-def _parse_filing(filing: dict) -> list[dict]:
-    """Haal XML op voor één filing en filter op open-market buys ≥ MIN_BUY_USD."""
-    cik      = filing["cik"]
-    adsh     = filing["adsh"]
+    Het tempo wordt bepaald door de gedeelde SEC_LIMITER; DISCOVERY_CONCURRENCY
+    bepaalt alleen hoeveel requests tegelijk onderweg mogen zijn.
+    """
+    sem   = asyncio.Semaphore(DISCOVERY_CONCURRENCY)
+    rows: list[dict] = []
+    tasks = []
+
+    async def handle(filing: dict) -> None:
+        async with sem:
+            rows.extend(await _aparse_filing(filing))
+
+    n_filings = 0
+    async for batch in batches:
+        n_filings += len(batch)
+        new, known_rows = await asyncio.to_thread(_split_known, batch, rescan)   # SQLite-lookup
+        rows.extend(known_rows)
+        tasks.extend(asyncio.create_task(handle(f)) for f in new)
+    await asyncio.gather(*tasks)
+    return n_filings, rows
+
+
+def _xml_urls(filing: dict) -> list[str]:
+    """Kandidaat-URL's voor de Form 4 XML: EFTS-bestandsnaam eerst, dan fallbacks."""
+    base     = f"https://www.sec.gov/Archives/edgar/data/{filing['cik']}/{filing['adsh'].replace('-', '')}"
     xml_file = filing["xml_file"]
-    acc_no   = adsh.replace("-", "")
+    return [f"{base}/{xml_file}"] + [
+        f"{base}/{alt}" for alt in ["form4.xml", "primarydocument.xml"] if alt != xml_file
+    ]
 
-    xml_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{acc_no}/{xml_file}"
-    xml = _fetch(xml_url)
-    if not xml or "ownershipDocument" not in xml:
-        # Fallback bestandsnamen
-        for alt in ["form4.xml", "primarydocument.xml"]:
-            if alt == xml_file:
-                continue
-            xml = _fetch(f"https://www.sec.gov/Archives/edgar/data/{cik}/{acc_no}/{alt}")
-            if xml and "ownershipDocument" in xml:
-                break
-        else:
-            return []
 
-    meta = _parse_meta(xml)
-    ticker = meta.get("ticker", "")
-    if not ticker:
+def _parse_filing(filing: dict) -> list[dict]:
+    """Haal XML op voor één filing en filter op open-market buys ≥ MIN_BUY_USD."""
+    for url in _xml_urls(filing):
+        xml = _fetch_doc(url)
+        if xml and "ownershipDocument" in xml:
+            # Geen transactiecode P: geen open-market buys, de volledige parse is niet nodig
+            rows, final = _buys_from_doc(filing, form4.parse(xml)) if form4.has_purchase(xml) else ([], True)
+            if final:   # IPO-status onbekend (lookup mislukt): niet vastleggen, volgende run opnieuw
+                PROCESSED.put(filing["adsh"], filing["file_date"], rows)
+            return rows
+    return []
+
+
+async def _aparse_filing(filing: dict) -> list[dict]:
+    for url in _xml_urls(filing):
+        xml = await _afetch_doc(url)
+        if xml and "ownershipDocument" in xml:
+            break
+    else:
         return []
-
-    # IPO-filter: bedrijf minimaal 1 jaar genoteerd
-    if _is_recent_ipo(cik):
+    if not form4.has_purchase(xml):
+        await asyncio.to_thread(PROCESSED.put, filing["adsh"], filing["file_date"], [])
         return []
+    # Parsen (CPU) en de SQLite-commit in een thread: de event loop blijft vrij voor I/O
+    doc = await asyncio.to_thread(form4.parse, xml)
+    # IPO-lookup (netwerk) vooraf in een thread, zodat _buys_from_doc uit de memo leest
+    if doc.ticker and filing["cik"] not in _ipo_cache:
+        await asyncio.to_thread(_is_recent_ipo, filing["cik"])
+    rows, final = _buys_from_doc(filing, doc)
+    if final:
+        await asyncio.to_thread(PROCESSED.put, filing["adsh"], filing["file_date"], rows)
+    return rows
+
+
+def _buys_from_doc(filing: dict, doc: form4.Form4) -> tuple[list[dict], bool]:
+    """Filter een geparsede Form 4 op open-market buys ≥ MIN_BUY_USD.
+
+    Geeft (rijen, definitief). Niet definitief als de IPO-status onbekend is
+    (submissions-lookup mislukt): de buys tellen deze run mee, maar het
+    resultaat mag niet in PROCESSED, anders blijft een fout 30 dagen hangen.
+    """
+    cik    = filing["cik"]
+    ticker = doc.ticker
+    if not ticker:
+        return [], True
+
+    # IPO-filter: bedrijf minimaal 1 jaar genoteerd (None = onbekend: niet filteren)
+    ipo = _is_recent_ipo(cik)
+    if ipo:
+        return [], True
 
     # Puur 10%-eigenaar zonder officer/director-rol → lagere informatiewaarde, skip
-    if (meta.get("is_ten_pct") == "1"
-            and meta.get("is_officer") != "1"
-            and meta.get("is_director") != "1"
-            and not meta.get("role")):
-        return []
+    role = doc.role
+    if doc.is_ten_pct and not doc.is_officer and not doc.is_director and not role:
+        return [], True
 
     found = []
-    for tx in _parse_transactions(xml):
-        if tx["code"] != "P":
+    for tx in doc.transactions:
+        if tx.table != "nonDerivative" or tx.code != "P":
             continue
-        amount = tx["amount"]
+        amount = tx.amount
         if amount < MIN_BUY_USD:
             continue
         if amount > MAX_BUY_USD:
             print(f"[skip] {ticker} ${amount/1e6:.0f}M > sanity cap — ADS-structuur?", file=sys.stderr)
             continue
-        role = meta.get("role", "")
         found.append({
             "ticker":    ticker,
             "cik":       cik,
-            "issuer":    meta.get("issuer", ""),
-            "insider":   meta.get("owner", ""),
+            "issuer":    doc.issuer_name,
+            "insider":   doc.owner,
             "role":      role,
             "is_csuite": _is_csuite(role),
             "date":      filing["file_date"],
             "amount":    amount,
         })
-    return found
+    return found, ipo is not None
 
 
 # ── IPO filter ────────────────────────────────────────────────────────────────
 
-_ipo_cache: dict[str, bool] = {}
+_ipo_cache: dict[str, bool | None] = {}
 _ipo_lock  = threading.Lock()
 
 
-def _is_recent_ipo(cik: str) -> bool:
-    """True als bedrijf < IPO_MIN_DAYS geleden genoteerd."""
+def _is_recent_ipo(cik: str) -> bool | None:
+    """True als bedrijf < IPO_MIN_DAYS geleden genoteerd; None als de submissions
+    JSON niet op te halen was (429/5xx/timeout). None blijft alleen deze run in
+    de memo, zodat een volgende run het opnieuw probeert."""
     with _ipo_lock:
         if cik in _ipo_cache:
             return _ipo_cache[cik]
     try:
-        cik_p = cik.zfill(10)
-        data  = _fetch_json(f"https://data.sec.gov/submissions/CIK{cik_p}.json")
-        dates = data.get("filings", {}).get("recent", {}).get("filingDate", [])
+        first = SUBMISSIONS.first_filing(cik)   # Lokale index: oudste filing over alle forms
+        if first:
+            dates = [first]
+        else:
+            cik_p = cik.zfill(10)
+            data  = HTTP_CACHE.fetch_json(f"https://data.sec.gov/submissions/CIK{cik_p}.json", _get_conditional)
+            dates = data.get("filings", {}).get("recent", {}).get("filingDate", [])
         result = (min(dates) and
                   (date.today() - date.fromisoformat(min(dates))).days < IPO_MIN_DAYS
                   ) if dates else True
+    except http_client.HTTPError as e:
+        result = True if e.code == 404 else None   # 404: geen submissions = als "geen filings"
+    except (OSError, ValueError):
+        result = None   # Lookup mislukt: onbekend, niet als "geen filings" behandelen
     except Exception:
         result = False
     with _ipo_lock:
@@ -275,226 +485,195 @@ def _is_recent_ipo(cik: str) -> bool:
     return result
 
 
-# ── XML parsing ───────────────────────────────────────────────────────────────
-
-def _g(xml: str, tag: str) -> str:
-    m = re.search(fr"<{tag}>(.*?)</{tag}>", xml)
-    return m.group(1).strip() if m else ""
-
-
-def _parse_meta(xml: str) -> dict:
-    role = _g(xml, "officerTitle")
-    if not role:
-        parts = []
-        if _g(xml, "isDirector") == "1": parts.append("Director")
-        if _g(xml, "isOfficer")  == "1": parts.append("Officer")
-        role = ", ".join(parts)
-    return {
-        "ticker":     _g(xml, "issuerTradingSymbol"),
-        "issuer":     _g(xml, "issuerName"),
-        "owner":      _g(xml, "rptOwnerName"),
-        "role":       role,
-        "is_officer": _g(xml, "isOfficer"),
-        "is_director":_g(xml, "isDirector"),
-        "is_ten_pct": _g(xml, "isTenPercentOwner"),
-    }
-
-
-def _parse_transactions(xml: str) -> list[dict]:
-    txs = []
-    for block in re.findall(r"<nonDerivativeTransaction>(.*?)</nonDerivativeTransaction>", xml, re.S):
-        code_m   = re.search(r"<transactionCode>(.*?)</transactionCode>", block)
-        shares_m = re.search(r"<transactionShares>.*?<value>(.*?)</value>", block, re.S)
-        price_m  = re.search(r"<transactionPricePerShare>.*?<value>(.*?)</value>", block, re.S)
-        date_m   = re.search(r"<transactionDate>.*?<value>(.*?)</value>", block, re.S)
-        if not code_m:
-            continue
-        code = code_m.group(1).strip().upper()
-        try:
-            shares = float(shares_m.group(1)) if shares_m else 0.0
-            price  = float(price_m.group(1))  if price_m  else 0.0
-            tx_date = date_m.group(1).strip()[:10] if date_m else ""
-        except (ValueError, TypeError):
-            continue
-        txs.append({"code": code, "amount": shares * price, "date": tx_date})
-    return txs
-
-
-# Keywords die duiden op institutionele/activist kopers (hedge funds, PE, LP etc.)
-# Deze hebben een boardzetel maar kopen niet vanuit interne bedrijfskennis
-INSTITUTIONAL_KEYWORDS = {"partners", "management", "capital", "fund", " lp", ", lp",
-                          " llc", ", llc", " inc.", ", inc", "group", "holdings llc"}
+# ── Insider-classificatie (XML parsing: insider/form4.py) ─────────────────────
 
+# Institutionele/activist kopers (hedge funds, PE, LP etc.; roles.INSTITUTIONAL_KEYWORDS)
+# hebben een boardzetel maar kopen niet vanuit interne bedrijfskennis
 
 def _is_csuite(role: str) -> bool:
-    r = role.lower()
-    return any(k in r for k in CSUITE)
+    """C-suite incl. CTO/CLO/EVP/SVP — Seyhun (1998); keywords in insider/roles.py."""
+    return roles.classify(role).is_csuite
 
 
 def _is_institutional(name: str) -> bool:
     """True als de insider een institutionele partij is (activist, hedge fund, PE)."""
-    n = name.lower()
-    return any(k in n for k in INSTITUTIONAL_KEYWORDS)
+    return roles.is_institutional(name)
 
 
 # ── 270d ticker analyse ───────────────────────────────────────────────────────
 
-MAX_FORM4_PER_TICKER = 60   # Cap op XML-fetches per ticker — voorkomt timeout bij actieve bedrijven
+MAX_FORM4_PER_TICKER = 60   # Cap op Form 4's per ticker (nieuwste eerst) — voorkomt timeout bij actieve bedrijven
+
+# Per-CIK state: verwerkte accessions + hun buys/sells. De versie bevat de filterregels
+# van _collect_trades, zodat een drempelwijziging de opgeslagen state ongeldig maakt.
+TICKER_STATE = CikState(
+    scope="monitor_270d",
+    version=f"1:{MIN_BUY_ANALYSIS}:{MAX_BUY_USD}:{''.join(sorted(IGNORE_SELL_CODES))}",
+)
 
 
-def analyse_ticker(ticker: str, cik: str, days: int = ANALYSIS_DAYS) -> dict:
+def analyse_ticker(ticker: str, cik: str, days: int = ANALYSIS_DAYS, rescan: bool = False,
+                   live: bool = False) -> dict:
     """
-    Haal 270d Form 4-history op via SEC submissions API en bereken signaal.
+    Haal 270d Form 4-history op en bereken signaal.
 
     Gebruikt de BEDRIJFS-CIK (issuer) zodat alle insider filings gevonden worden.
-    Cap op MAX_FORM4_PER_TICKER fetches zodat één ticker de pipeline niet blokkeert.
+    Cap op MAX_FORM4_PER_TICKER filings zodat één ticker de pipeline niet blokkeert.
+
+    De filing-lijst komt uit de lokale submissions-index (insider/submissions_store.py)
+    als die de CIK dekt en actueel is; anders (of met live=True, bijv. als discovery
+    filings van na de index zag) uit de live submissions API.
+
+    Incrementeel: accessions die al in TICKER_STATE staan worden niet opnieuw
+    opgehaald; filings buiten het venster vallen lokaal af. rescan=True negeert
+    de state (en bouwt die opnieuw op).
     """
     ticker = ticker.upper()
-    cik_p  = cik.zfill(10)
     cutoff = date.today() - timedelta(days=days)
 
-    subs = _fetch_json(f"https://data.sec.gov/submissions/CIK{cik_p}.json")
-    if not subs:
-        return _empty(ticker, "SEC submissions niet bereikbaar")
-
-    recent = subs.get("filings", {}).get("recent", {})
+    index = None if live else SUBMISSIONS.filings(cik, since=cutoff)
+    if index is not None:
+        print(f"[analyse] {ticker} CIK={int(cik)} — {len(index)} Form 4 in {days}d venster "
+              f"(lokale index t/m {SUBMISSIONS.as_of()})", file=sys.stderr)
+    else:
+        index = _live_form4_filings(ticker, cik, cutoff, days)
+        if index is None:
+            return _empty(ticker, "SEC submissions niet bereikbaar")
+
+    state  = {} if rescan else TICKER_STATE.load(cik)
+    filings: dict[str, dict] = {}   # accession → {filing_date, buys, sells}
+    n_reused = n_new = 0
+
+    for f in index[:MAX_FORM4_PER_TICKER]:
+        acc = f["accessionNumber"]
+        if acc in state:
+            filings[acc] = state[acc]
+            n_reused += 1
+            continue
+        n_new += 1
+        xml = _fetch_form4(cik, acc, f["primaryDocument"],
+                           [f"{acc.replace('-', '')}.xml", "form4.xml", "primarydocument.xml"])
+        if xml:   # Mislukte fetch niet vastleggen: volgende run opnieuw
+            filings[acc] = _filing_entry(form4.parse(xml), date.fromisoformat(f["filingDate"]))
+    fetched = n_reused + n_new
+
+    # State = precies de filings binnen het venster; verlopen accessions vallen zo af
+    TICKER_STATE.save(cik, filings)
+    TICKER_STATE.count(n_reused, n_new)
+    if n_reused:
+        print(f"[analyse] {ticker} — {n_new} nieuw, {n_reused} uit state", file=sys.stderr)
 
     buys:  list[dict] = []
     sells: list[dict] = []
+    for f in filings.values():
+        buys.extend({**b, "date": date.fromisoformat(b["date"])} for b in f["buys"])
+        sells.extend({**s, "date": date.fromisoformat(s["date"])} for s in f["sells"])
 
-    acc_numbers  = recent.get("accessionNumber", [])
-    filing_dates = recent.get("filingDate", [])
-    form_types   = recent.get("form", [])
-    primary_docs = recent.get("primaryDocument", [])
+    if not buys and not sells:
+        print(f"[analyse] {ticker} — geen buys/sells gevonden in {days}d (fetched={fetched})", file=sys.stderr)
 
-    n_form4_in_window = sum(
-        1 for i, ft in enumerate(form_types)
-        if ft in ("4", "4/A") and i < len(filing_dates)
-        and filing_dates[i] >= cutoff.isoformat()
-    )
-    print(f"[analyse] {ticker} CIK={int(cik)} — {len(acc_numbers)} recent filings, "
-          f"{n_form4_in_window} Form 4 in {days}d venster", file=sys.stderr)
+    return _build_result(ticker, buys, sells)
 
-    fetched = 0
-    for i, acc in enumerate(acc_numbers):
-        if fetched >= MAX_FORM4_PER_TICKER:
-            break
-        if form_types[i] not in ("4", "4/A"):
-            continue
-        try:
-            filing_date = date.fromisoformat(filing_dates[i])
-        except (ValueError, IndexError):
-            continue
-        if filing_date < cutoff:
-            continue
 
-        acc_clean = acc.replace("-", "")
-        prim_doc  = primary_docs[i] if i < len(primary_docs) else ""
-        # SEC submissions JSON bevat soms een XSLT-renderer prefix (bijv. "xslF345X05/filename.xml")
-        # Strip de directory-prefix zodat we het echte XML-bestand ophalen
-        if prim_doc and "/" in prim_doc:
-            prim_doc = prim_doc.split("/")[-1]
-        xml = ""
-
-        # Probeer primaryDocument eerst (1 request), daarna fallbacks
-        if prim_doc:
-            xml = _fetch(f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{acc_clean}/{prim_doc}")
-        if not xml or "ownershipDocument" not in xml:
-            for alt in [f"{acc_clean}.xml", "form4.xml", "primarydocument.xml"]:
-                if alt == prim_doc:
-                    continue
-                xml = _fetch(f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{acc_clean}/{alt}")
-                if xml and "ownershipDocument" in xml:
-                    break
-
-        fetched += 1
-        if not xml:
-            continue
+def _live_form4_filings(ticker: str, cik: str, cutoff: date, days: int) -> list[dict] | None:
+    """Form 4's binnen het venster via de live submissions API, nieuwste eerst.
+
+    Zelfde vorm als SUBMISSIONS.filings(); None als de API niet bereikbaar is.
+    """
+    subs = _fetch_meta_json(f"https://data.sec.gov/submissions/CIK{cik.zfill(10)}.json")
+    if not subs:
+        return None
+
+    def in_window(cols: dict) -> tuple[list[dict], bool]:
+        """Form 4's ≥ cutoff, plus of de kolommen tot vóór de cutoff reiken."""
+        out, older = [], False
+        docs = cols.get("primaryDocument", [])
+        for i, (acc, fd, ft) in enumerate(zip(cols.get("accessionNumber", []),
+                                               cols.get("filingDate", []), cols.get("form", []))):
+            if fd < cutoff.isoformat():
+                older = True
+                continue
+            if ft in ("4", "4/A"):
+                out.append({"accessionNumber": acc, "form": ft, "filingDate": fd,
+                            "primaryDocument": docs[i] if i < len(docs) else ""})
+        return out, older
 
-        meta  = _parse_meta(xml)
-        owner = meta.get("owner", "Unknown")
-        role  = meta.get("role", "")
-
-        for tx in _parse_transactions(xml):
-            code   = tx["code"]
-            amount = tx["amount"]
-            tx_date = filing_date
-            if tx.get("date"):
-                try:
-                    tx_date = date.fromisoformat(tx["date"])
-                except ValueError:
-                    pass
-
-            if code == "P" and MIN_BUY_ANALYSIS <= amount <= MAX_BUY_USD:
-                buys.append({"insider": owner, "role": role, "amount": amount, "date": tx_date})
-            elif code == "S" and code not in IGNORE_SELL_CODES and amount > 0:
-                sells.append({"insider": owner, "role": role, "amount": amount, "date": tx_date})
+    recent = subs.get("filings", {}).get("recent", {})
+    found, _ = in_window(recent)
+    print(f"[analyse] {ticker} CIK={int(cik)} — {len(recent.get('accessionNumber', []))} recent filings, "
+          f"{len(found)} Form 4 in {days}d venster", file=sys.stderr)
 
     # Als de recent-sectie geen Form 4s heeft, probeer archived filings
-    if n_form4_in_window == 0 and fetched == 0:
-        archive_files = subs.get("filings", {}).get("files", [])
-        for af in archive_files[:3]:   # Max 3 archive files checken (elk = honderden filings)
+    if not found:
+        for af in subs.get("filings", {}).get("files", [])[:3]:   # Max 3 archive files (elk = honderden filings)
             af_name = af.get("name", "")
-            if not af_name:
-                continue
-            af_data = _fetch_json(f"https://data.sec.gov/submissions/{af_name}")
+            af_data = _fetch_meta_json(f"https://data.sec.gov/submissions/{af_name}") if af_name else {}
             if not af_data:
                 continue
-            af_acc   = af_data.get("accessionNumber", [])
-            af_dates = af_data.get("filingDate", [])
-            af_types = af_data.get("form", [])
-            af_docs  = af_data.get("primaryDocument", [])
-            for i, acc in enumerate(af_acc):
-                if fetched >= MAX_FORM4_PER_TICKER:
-                    break
-                if af_types[i] not in ("4", "4/A"):
-                    continue
-                try:
-                    filing_date = date.fromisoformat(af_dates[i])
-                except (ValueError, IndexError):
-                    continue
-                if filing_date < cutoff:
-                    break   # Archief is chronologisch, oudere filings volgen
-                acc_clean = acc.replace("-", "")
-                prim_doc  = af_docs[i] if i < len(af_docs) else ""
-                if prim_doc and "/" in prim_doc:
-                    prim_doc = prim_doc.split("/")[-1]
-                xml = ""
-                if prim_doc:
-                    xml = _fetch(f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{acc_clean}/{prim_doc}")
-                if not xml or "ownershipDocument" not in xml:
-                    for alt in [f"{acc_clean}.xml", "form4.xml"]:
-                        if alt == prim_doc:
-                            continue
-                        xml = _fetch(f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{acc_clean}/{alt}")
-                        if xml and "ownershipDocument" in xml:
-                            break
-                fetched += 1
-                if not xml:
-                    continue
-                meta  = _parse_meta(xml)
-                owner = meta.get("owner", "Unknown")
-                role  = meta.get("role", "")
-                for tx in _parse_transactions(xml):
-                    code   = tx["code"]
-                    amount = tx["amount"]
-                    tx_date = filing_date
-                    if tx.get("date"):
-                        try:
-                            tx_date = date.fromisoformat(tx["date"])
-                        except ValueError:
-                            pass
-                    if code == "P" and MIN_BUY_ANALYSIS <= amount <= MAX_BUY_USD:
-                        buys.append({"insider": owner, "role": role, "amount": amount, "date": tx_date})
-                    elif code == "S" and code not in IGNORE_SELL_CODES and amount > 0:
-                        sells.append({"insider": owner, "role": role, "amount": amount, "date": tx_date})
-        if fetched > 0:
-            print(f"[analyse] {ticker} — {fetched} archived Form 4s verwerkt", file=sys.stderr)
+            more, older = in_window(af_data)
+            found += more
+            if older:
+                break   # Archief is chronologisch, oudere filings volgen
+        if found:
+            print(f"[analyse] {ticker} — {len(found)} archived Form 4s gevonden", file=sys.stderr)
+
+    found.sort(key=lambda f: f["filingDate"], reverse=True)
+    return found
 
-    if not buys and not sells:
-        print(f"[analyse] {ticker} — geen buys/sells gevonden in {days}d (fetched={fetched})", file=sys.stderr)
 
-    return _build_result(ticker, buys, sells)
+def _fetch_form4(cik: str, acc: str, prim_doc: str, alts: list[str]) -> str:
+    """Form 4 XML voor één accession: primaryDocument eerst (1 request), daarna fallbacks."""
+    acc_clean = acc.replace("-", "")
+    base      = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{acc_clean}"
+    # SEC submissions JSON bevat soms een XSLT-renderer prefix (bijv. "xslF345X05/filename.xml")
+    # Strip de directory-prefix zodat we het echte XML-bestand ophalen
+    if prim_doc and "/" in prim_doc:
+        prim_doc = prim_doc.split("/")[-1]
+    xml = ""
+    if prim_doc:
+        xml = _fetch_doc(f"{base}/{prim_doc}")
+    if not xml or "ownershipDocument" not in xml:
+        for alt in alts:
+            if alt == prim_doc:
+                continue
+            xml = _fetch_doc(f"{base}/{alt}")
+            if xml and "ownershipDocument" in xml:
+                break
+    return xml
+
+
+def _filing_entry(doc: form4.Form4, filing_date: date) -> dict:
+    """Buys/sells van één filing in opslagvorm (datums als ISO-string)."""
+    buys:  list[dict] = []
+    sells: list[dict] = []
+    _collect_trades(doc, filing_date, buys, sells)
+    return {
+        "filing_date": filing_date.isoformat(),
+        "buys":  [{**b, "date": b["date"].isoformat()} for b in buys],
+        "sells": [{**s, "date": s["date"].isoformat()} for s in sells],
+    }
+
+
+def _collect_trades(doc: form4.Form4, filing_date: date, buys: list, sells: list) -> None:
+    """Voeg de open-market buys/sells (nonDerivative-tabel) van één filing toe."""
+    owner = doc.owner
+    role  = doc.role
+    for tx in doc.transactions:
+        if tx.table != "nonDerivative":
+            continue
+        code    = tx.code
+        amount  = tx.amount
+        tx_date = filing_date
+        if tx.date:
+            try:
+                tx_date = date.fromisoformat(tx.date)
+            except ValueError:
+                pass
+
+        if code == "P" and MIN_BUY_ANALYSIS <= amount <= MAX_BUY_USD:
+            buys.append({"insider": owner, "role": role, "amount": amount, "date": tx_date})
+        elif code == "S" and code not in IGNORE_SELL_CODES and amount > 0:
+            sells.append({"insider": owner, "role": role, "amount": amount, "date": tx_date})
 
 
 def _empty(ticker: str, reason: str) -> dict:
@@ -508,9 +687,12 @@ def _empty(ticker: str, reason: str) -> dict:
     }
 
 
-def _build_result(ticker: str, buys: list, sells: list) -> dict:
-    """Bereken signaal en verzamel alle velden voor scoring + Telegram."""
-    today = date.today()
+def _build_result(ticker: str, buys: list, sells: list, today: date | None = None) -> dict:
+    """Bereken signaal en verzamel alle velden voor scoring + Telegram.
+
+    today: peildatum (default vandaag); backtests geven de gesimuleerde dag mee.
+    """
+    today = today or date.today()
 
     def decay(d: date) -> float:
         """Exponentiële tijdsdecay, half-life = DECAY_HALFLIFE dagen."""
@@ -622,21 +804,69 @@ def _build_result(ticker: str, buys: list, sells: list) -> dict:
 
 
 def _role_weight(role: str) -> float:
-    """Gewicht op basis van rol voor tijdsgecorrigeerde score."""
-    r = role.lower()
-    if any(k in r for k in {"ceo", "chief executive", "president"}): return 5.0
-    if any(k in r for k in {"cfo", "chief financial", "coo", "chief operating"}): return 4.0
-    if any(k in r for k in {"cto", "evp", "svp"}): return 3.0
-    if "vp" in r or "vice" in r: return 2.0
-    if "director" in r: return 2.0
-    return 1.0
+    """Gewicht op basis van rol voor tijdsgecorrigeerde score (roles.WEIGHT_TIERS)."""
+    return roles.classify(role).weight
+
+
+def build_results(groups: dict[str, tuple[list, list]], today: date | None = None) -> dict[str, dict]:
+    """_build_result voor veel tickers in één pass (insider/signal_engine.py).
+
+    groups: ticker → (buys, sells). Uitkomst per ticker gelijk aan _build_result;
+    voor alleen de numerieke kolommen: signal_engine.compute().
+    """
+    from insider import signal_engine   # NumPy alleen nodig voor batch/backtest
+    return signal_engine.results(groups, signal_rules(), today or date.today())
+
+
+def signal_rules():
+    """Parameters van _build_result voor insider/signal_engine.py."""
+    from insider import signal_engine
+    return signal_engine.Rules(DECAY_HALFLIFE, _role_weight, _is_csuite, _is_institutional)
+
+
+def history_trades(rows: list[dict]):
+    """TX_STORE.history()-rijen → signal_engine.Trades, met de filters van _collect_trades."""
+    import numpy as np
+    from insider import signal_engine
+    keep = [r for r in rows if r["ticker"] and (
+        (r["code"] == "P" and MIN_BUY_ANALYSIS <= r["amount"] <= MAX_BUY_USD)
+        or (r["code"] == "S" and r["code"] not in IGNORE_SELL_CODES and r["amount"] > 0))]
+    epoch = date(1970, 1, 1).toordinal()
+    def ordinals(key: str):
+        return np.array([r[key] for r in keep], dtype="datetime64[D]").astype(np.int64) + epoch
+    return signal_engine.Trades.from_columns(
+        [r["ticker"] for r in keep], [r["code"] == "P" for r in keep], [r["amount"] for r in keep],
+        ordinals("date"), [r["insider"] for r in keep], [r["role"] for r in keep], ordinals("filing_date"),
+    )
+
+
+def history_discoveries(rows: list[dict]) -> list[dict]:
+    """TX_STORE.history()-rijen → discovery-rijen (vorm van _buys_from_doc), met de
+    bedragfilters van discovery. De IPO- en 10%-owner-filters vragen filing-data
+    die de historie niet heeft en vallen hier weg."""
+    return [{
+        "ticker": r["ticker"], "cik": r.get("issuer_cik", ""), "issuer": "", "insider": r["insider"],
+        "role": r["role"], "is_csuite": _is_csuite(r["role"]), "date": r["filing_date"], "amount": r["amount"],
+    } for r in rows if r["ticker"] and r["code"] == "P" and MIN_BUY_USD <= r["amount"] <= MAX_BUY_USD]
+
+
+def signals_as_of(trades, as_of: date, days: int = ANALYSIS_DAYS) -> dict:
+    """signal_engine.compute() zoals analyse_ticker() het op `as_of` zou zien:
+    alleen filings uit [as_of - days, as_of] (point-in-time, geen look-ahead)."""
+    from insider import signal_engine
+    a    = as_of.toordinal()
+    mask = (trades.filed <= a) & (trades.filed >= a - days) & (trades.day <= a)
+    return signal_engine.compute(trades.select(mask), signal_rules(), as_of)
 
 
 # ── Scoring ───────────────────────────────────────────────────────────────────
 
+SCORE_RULES = "monitor/1"   # Rule set in insider/scoring.py; --score-rules voor A/B
+
+
 def score(r: dict) -> int:
     """
-    Uniformele score 0-10 voor zowel portefeuille als kandidaten.
+    Uniformele score 0-10 voor zowel portefeuille als kandidaten (insider/scoring.py).
 
     Formule (max ruwe score = 12, genormaliseerd):
       Signaalsterkte      : STERKE=3, POSITIEF=2, GEMENGD=1, anders=0
@@ -650,35 +880,21 @@ def score(r: dict) -> int:
     Literatuur: Seyhun (1998) — C-suite meest predictief
                 Lakonishok & Lee (2001) — cluster + recency sterkste combo
                 Cohen et al. (2012) — routine vs. opportunistische insider
-    """
-    raw = 0
-    sig           = r.get("signal", "UNKNOWN")
-    days          = r.get("days_since_buy", 999)
-    c_buyers      = r.get("csuite_buyers", [])
-    c_sellers     = r.get("csuite_sellers", [])
-    inst_buyers   = r.get("institutional_buyers", [])
-    n_buyers      = r.get("unique_buyers", 0)
-    total_buy     = r.get("total_buy", 0)
-    net_flow      = r.get("net_flow", 0)
-
-    raw += {"STERKE OVERTUIGING": 3, "POSITIEF SIGNAAL": 2, "GEMENGD SIGNAAL": 1}.get(sig, 0)
 
-    if c_buyers and not c_sellers:       raw += 2
-    elif inst_buyers and not c_sellers:  raw += 1   # Institutioneel: halve bonus
-    elif c_sellers and not c_buyers:     raw -= 3
-
-    if days <= 7:    raw += 3
-    elif days <= 14: raw += 2
-    elif days <= 30: raw += 1
-
-    if n_buyers >= 3 and days <= 30: raw += 1
-
-    if total_buy >= 5_000_000:   raw += 2
-    elif total_buy >= 1_000_000: raw += 1
+    Resultaten die in main() al in batch gescoord zijn hebben "score".
+    """
+    if r.get("score_rules") == SCORE_RULES:
+        return r["score"]
+    return scoring.score(r, SCORE_RULES)
 
-    if net_flow > 0 and not c_sellers: raw += 1
 
-    return max(0, min(10, round(max(0, raw) / 12 * 10)))
+def _score_all(results: list[dict]) -> None:
+    """Alle resultaten in één batch scoren; score + reason codes in het resultaat."""
+    scores = scoring.score_batch(results, SCORE_RULES)
+    for i, r in enumerate(results):
+        r["score"]       = int(scores.score[i])
+        r["score_codes"] = scores.codes(i)
+        r["score_rules"] = SCORE_RULES
 
 
 def score_emoji(s: int) -> str:
@@ -783,10 +999,9 @@ def send_telegram(msg: str) -> bool:
         return False
     try:
         data = urlencode({"chat_id": CHAT_ID, "text": msg, "parse_mode": "HTML"}).encode()
-        req  = Request(f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage", data=data,
-                       headers={"User-Agent": UA})
-        with urlopen(req, timeout=15) as r:
-            return r.status == 200
+        r = http_client.post(f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage", data,
+                             headers={"User-Agent": UA}, timeout=15)
+        return r.status == 200
     except Exception as e:
         print(f"[warn] Telegram fout: {e}", file=sys.stderr)
         return False
@@ -854,6 +1069,7 @@ def health_check(
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 def main():
+    global SCORE_RULES
     parser = argparse.ArgumentParser(description="Insider Monitor v2")
     parser.add_argument("--portfolio", nargs="+", default=[],
                         help="Portfolio tickers (bijv. BH NKE IPX SBSW)")
@@ -861,11 +1077,21 @@ def main():
                         help=f"Analyseperiode in dagen (default {ANALYSIS_DAYS})")
     parser.add_argument("--discovery-days", type=int, default=DISCOVERY_DAYS,
                         help=f"Discovery lookback (default {DISCOVERY_DAYS})")
+    parser.add_argument("--discovery-engine", choices=["async", "threads"], default="async",
+                        help="Discovery-engine: asyncio (default) of thread-pool")
+    parser.add_argument("--discovery-source", choices=["efts", "index"], default="efts",
+                        help="Filinglijst via EFTS-zoekopdrachten (default) of de EDGAR dag-index "
+                             "(één request per werkdag, gecachet; filings van vandaag pas 's avonds)")
+    parser.add_argument("--rescan", action="store_true",
+                        help="Negeer accession-store en per-ticker state; verwerk alle filings opnieuw")
     parser.add_argument("--output-dir", default="data/reports",
                         help="Output directory voor JSON en health log")
     parser.add_argument("--telegram", action="store_true",
                         help="Stuur resultaat via Telegram")
+    parser.add_argument("--score-rules", choices=sorted(scoring.RULESETS), default=SCORE_RULES,
+                        help=f"Scoring rule set (default {SCORE_RULES}); zie insider/scoring.py")
     args = parser.parse_args()
+    SCORE_RULES = args.score_rules
 
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -875,7 +1101,9 @@ def main():
 
     # Stap 1: Discovery — vind recente Form 4 open-market aankopen
     print(f"[monitor] Stap 1: discovery ({args.discovery_days}d lookback)...", file=sys.stderr)
-    discoveries = discover_recent_buys(args.discovery_days)
+    discoveries = discover_recent_buys(args.discovery_days, engine=args.discovery_engine,
+                                       source=args.discovery_source,
+                                       rescan=args.rescan)
 
     # Groepeer per ticker: totaal bedrag + C-suite aanwezig?
     disc_by_ticker: dict[str, dict] = {}
@@ -920,9 +1148,13 @@ def main():
     print(f"[monitor] Stap 3: 270d analyse van {len(all_tickers_cik)} tickers...", file=sys.stderr)
     results: dict[str, dict] = {}
 
+    # Discovery-tickers met filings van na de lokale submissions-index: live ophalen
+    index_age = (today - date.fromisoformat(SUBMISSIONS.as_of()[:10])).days if SUBMISSIONS.as_of() else -1
+    live = {t for t in all_tickers_cik if t in disc_by_ticker and disc_by_ticker[t]["days"] <= index_age}
+
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
         futures = {
-            ex.submit(analyse_ticker, ticker, cik, args.days): ticker
+            ex.submit(analyse_ticker, ticker, cik, args.days, args.rescan, ticker in live): ticker
             for ticker, cik in all_tickers_cik.items()
         }
         for future in as_completed(futures):
@@ -952,7 +1184,8 @@ def main():
                 "discovery": None, "in_portfolio": True,
             }
 
-    # Stap 4: Sorteer en splits
+    # Stap 4: Scoor (één batch), sorteer en splits
+    _score_all(list(results.values()))
     portfolio_results = [r for r in results.values() if r.get("in_portfolio")]
     portfolio_results.sort(key=lambda x: x["ticker"])
 
@@ -998,6 +1231,14 @@ def main():
     out_path = output_dir / "monitor.json"
     out_path.write_text(json.dumps(all_results, indent=2, default=str), encoding="utf-8")
     print(f"\n[monitor] JSON → {out_path}", file=sys.stderr)
+    print(f"[cache] Form 4 {FORM4_CACHE.summary()}", file=sys.stderr)
+    print(f"[cache] discovery {PROCESSED.summary()}", file=sys.stderr)
+    print(f"[cache] {TICKER_STATE.summary()}", file=sys.stderr)
+    print(f"[cache] {HTTP_CACHE.summary()}", file=sys.stderr)
+    print(f"[cache] {SUBMISSIONS.summary()}", file=sys.stderr)
+    print(f"[cache] requests: {FLIGHT.summary()}", file=sys.stderr)
+    print(f"[cache] {roles.cache_info()}", file=sys.stderr)
+    print(f"[http] {concurrency.LIMITS.summary()}", file=sys.stderr)
 
     # Stap 7: Telegram
     if args.telegram:
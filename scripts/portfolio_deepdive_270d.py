@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 
 import argparse
-import html
 import json
 import os
 import re
@@ -10,13 +9,22 @@ import sys
 import time
 from collections import Counter, defaultdict
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from urllib.parse import urljoin
-from urllib.request import Request, urlopen
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from insider import concurrency, form4, http_client
+from insider.doc_cache import FORM4_CACHE
+from insider.form4_resolver import RESOLVER
+from insider.http_cache import HTTP_CACHE
+from insider.ratelimit import SEC_LIMITER
+from insider.submissions_store import SUBMISSIONS
+from insider.tx_store import TX_STORE
 
 UA = os.getenv("SEC_USER_AGENT", "").strip() or "InsiderMonitor/1.0 (contact: you@example.com)"
 TIMEOUT = 30
 RETRIES = 6
-SLEEP = 0.35
 
 TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
 SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
@@ -25,29 +33,36 @@ OPEN_MARKET_CODES = {"P", "S"}
 
 # ---------- HTTP ----------
 
-def fetch(url: str, timeout: int = TIMEOUT) -> str:
+def get(url: str, headers: dict | None = None, timeout: int = TIMEOUT) -> http_client.Response:
     last_err = None
     for i in range(RETRIES):
         try:
-            time.sleep(SLEEP)
-            req = Request(
+            SEC_LIMITER.acquire()
+            return concurrency.get(
                 url,
                 headers={
                     "User-Agent": UA,
                     "Accept": "application/json,text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
                     "Referer": "https://www.sec.gov/",
-                    "Connection": "close",
+                    **(headers or {}),
                 },
+                timeout=timeout,
             )
-            with urlopen(req, timeout=timeout) as r:
-                return r.read().decode("utf-8", "ignore")
         except Exception as e:
             last_err = e
-            time.sleep(min(12, 0.8 * (2 ** i)))
+            wait = concurrency.retry_wait(e, i, cap=12)
+            if wait is None:
+                break   # 404: niet opnieuw proberen
+            time.sleep(wait)
     raise RuntimeError(f"Fetch failed for {url}: {last_err}")
 
-def fetch_json(url: str):
-    return json.loads(fetch(url))
+def fetch(url: str, timeout: int = TIMEOUT) -> str:
+    return get(url, timeout=timeout).text
+
+def fetch_meta_json(url: str):
+    """company_tickers.json / submissions JSON: revalidatie via HTTP_CACHE (ETag/TTL),
+    één fetch per URL per run. Het resultaat wordt gedeeld: niet muteren."""
+    return HTTP_CACHE.fetch_json(url, get)
 
 # ---------- Helpers ----------
 
@@ -81,94 +96,34 @@ def parse_date(s: str):
 def clean_text(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip())
 
-def parse_float(x: str) -> float:
-    x = (x or "").strip()
-    if not x:
-        return 0.0
-    try:
-        return float(x.replace(",", "").replace("$", ""))
-    except Exception:
-        return 0.0
-
 def money0(v: float) -> str:
     return f"{v:,.0f}" if abs(v) >= 0.5 else "0"
 
 # ---------- XML parsing ----------
 
-def g(xml: str, tag: str) -> str:
-    m = re.search(fr"<(?:\w+:)?{tag}\b[^>]*>(.*?)</(?:\w+:)?{tag}>", xml, flags=re.S | re.I)
-    return html.unescape((m.group(1) if m else "").strip())
-
-def gv(xml: str, tag: str) -> str:
-    m = re.search(
-        fr"<(?:\w+:)?{tag}\b[^>]*>\s*(?:<(?:\w+:)?value[^>]*>)?\s*([^<]+)",
-        xml,
-        flags=re.S | re.I,
-    )
-    return html.unescape((m.group(1) if m else "").strip())
-
-def tx_blocks(xml: str):
-    return (
-        re.findall(r"<(?:\w+:)?nonDerivativeTransaction\b[^>]*>(.+?)</(?:\w+:)?nonDerivativeTransaction>", xml, flags=re.S | re.I)
-        + re.findall(r"<(?:\w+:)?derivativeTransaction\b[^>]*>(.+?)</(?:\w+:)?derivativeTransaction>", xml, flags=re.S | re.I)
-    )
-
-def extract_tx_date_from_block(blk: str):
-    m = re.search(
-        r"<(?:\w+:)?transactionDate\b[^>]*>\s*(?:<(?:\w+:)?value\b[^>]*>)?\s*([^<\s]+)",
-        blk,
-        flags=re.S | re.I,
-    )
-    return parse_date(m.group(1)) if m else None
-
-def best_role(xml: str) -> str:
-    officer_title = g(xml, "officerTitle")
-    if officer_title:
-        return officer_title.strip()
-
-    is_director = g(xml, "isDirector")
-    is_officer = g(xml, "isOfficer")
-    is_tenpct = g(xml, "isTenPercentOwner")
-
-    parts = []
-    if is_director == "1":
-        parts.append("Director")
-    if is_officer == "1":
-        parts.append("Officer")
-    if is_tenpct == "1":
-        parts.append("10% Owner")
-    return ", ".join(parts) if parts else ""
-
-def extract_10b5_1(xml: str) -> str:
-    low = xml.lower()
-    return "YES" if ("10b5-1" in low or "10b5 1" in low) else "NO"
-
 def parse_form4_open_market_rows(xml: str, filing_date):
-    issuer = clean_text(g(xml, "issuerName"))
-    xml_ticker = clean_text(g(xml, "issuerTradingSymbol")).upper()
-    issuer_cik = clean_text(g(xml, "issuerCik"))
+    doc = form4.parse(xml)
+    issuer = clean_text(doc.issuer_name)
+    xml_ticker = clean_text(doc.ticker).upper()
+    issuer_cik = clean_text(doc.issuer_cik)
 
-    owner = clean_text(g(xml, "rptOwnerName")) or "Unknown"
-    role = best_role(xml)
-    tenb5 = extract_10b5_1(xml)
+    owner = clean_text(doc.owner) or "Unknown"
+    role = doc.role_label(with_ten_pct=True)
+    tenb5 = "YES" if doc.is_10b5_1 else "NO"
 
     rows = []
     codes_found = []
 
-    for blk in tx_blocks(xml):
-        code = g(blk, "transactionCode").upper()
+    for tx in doc.transactions:
+        code = tx.code
         if code:
             codes_found.append(code)
 
         if code not in OPEN_MARKET_CODES:
             continue
 
-        tx_date = extract_tx_date_from_block(blk) or filing_date
-        shares = parse_float(gv(blk, "transactionShares"))
-        price = parse_float(gv(blk, "transactionPricePerShare"))
-        total_value = parse_float(gv(blk, "transactionTotalValue"))
-
-        val = shares * price if (shares > 0 and price > 0) else total_value
+        tx_date = parse_date(tx.date) or filing_date
+        val = tx.amount if (tx.shares > 0 and tx.price > 0) else tx.total_value
         buy = val if code == "P" else 0.0
         sell = val if code == "S" else 0.0
 
@@ -190,7 +145,7 @@ def parse_form4_open_market_rows(xml: str, filing_date):
 # ---------- SEC navigation ----------
 
 def load_ticker_map():
-    data = fetch_json(TICKERS_URL)
+    data = fetch_meta_json(TICKERS_URL)
     out = {}
     for _, v in data.items():
         t = str(v.get("ticker", "")).upper()
@@ -203,8 +158,13 @@ def load_ticker_map():
         }
     return out
 
-def get_all_filings_for_cik(cik_str: str):
-    data = fetch_json(SUBMISSIONS_URL.format(cik=cik_str))
+def get_all_filings_for_cik(cik_str: str, since=None):
+    """Form 4 / 4A-filings van een CIK: lokale submissions-index, anders de live API."""
+    indexed = SUBMISSIONS.filings(cik_str, since=since)
+    if indexed is not None:
+        return indexed
+
+    data = fetch_meta_json(SUBMISSIONS_URL.format(cik=cik_str))
     filings = []
 
     recent = data.get("filings", {}).get("recent", {})
@@ -221,7 +181,7 @@ def get_all_filings_for_cik(cik_str: str):
         name = f.get("name")
         if not name:
             continue
-        older = fetch_json(urljoin("https://data.sec.gov/submissions/", name))
+        older = fetch_meta_json(urljoin("https://data.sec.gov/submissions/", name))
         m = len(older.get("accessionNumber", []))
         for i in range(m):
             filings.append({
@@ -244,31 +204,6 @@ def filing_index_url(cik_num: str, accession: str) -> str:
     acc_no = accession_nodashes(accession)
     return f"https://www.sec.gov/Archives/edgar/data/{cik_plain}/{acc_no}/{accession}-index.htm"
 
-def find_best_xml_from_index(index_url: str):
-    page = fetch(index_url)
-    cands = []
-    for m in re.finditer(r'href="([^"]+\.xml)"', page, flags=re.I):
-        href = html.unescape(m.group(1))
-        url = href if href.startswith("http") else urljoin("https://www.sec.gov", href)
-        name = url.lower()
-        score = 0
-        if "ownership" in name:
-            score += 5
-        if "form4" in name:
-            score += 4
-        if "primary" in name:
-            score += 3
-        if "xml" in name:
-            score += 1
-        cands.append((url, score))
-
-    cands.sort(key=lambda x: x[1], reverse=True)
-    for url, _ in cands:
-        xml = fetch(url)
-        if xml and re.search(r"<(?:\w+:)?ownershipDocument\b", xml, flags=re.I):
-            return url, xml
-    return "", ""
-
 # ---------- Post-processing ----------
 
 def dedupe_rows(rows):
@@ -344,7 +279,7 @@ def main():
             continue
 
         cik = ticker_map[requested_ticker]["cik_str"]
-        filings = get_all_filings_for_cik(cik)
+        filings = get_all_filings_for_cik(cik, since=cutoff)
 
         cand = []
         for f in filings:
@@ -368,16 +303,13 @@ def main():
             filing_date = parse_date(f["filingDate"])
             index_url = filing_index_url(cik, accession)
 
-            xml_url = ""
-            xml = ""
             xml_found = "NO"
             codes_found = []
             open_rows = []
 
-            try:
-                xml_url, xml = find_best_xml_from_index(index_url)
-            except Exception:
-                xml = ""
+            # primaryDocument → geleerde bestandsnamen → index-pagina (laatste redmiddel)
+            res = RESOLVER.resolve(cik, accession, f.get("primaryDocument", ""), fetch)
+            xml_url, xml = res.url, res.xml
 
             if xml:
                 xml_found = "YES"
@@ -395,6 +327,8 @@ def main():
                 "xml_found": xml_found,
                 "codes_found": ",".join(codes_found) if codes_found else "",
                 "xml_url": xml_url or index_url,
+                "resolved_by": res.stage,
+                "requests": res.requests,
             })
 
             # IMPORTANT:
@@ -418,11 +352,11 @@ def main():
 
     if args.audit:
         print("\n=== AUDIT (FORM 4 / 4A FILINGS INSPECTED) ===")
-        print("ticker\tfilingDate\tform\taccession\txml_found\tcodes_found\txml")
+        print("ticker\tfilingDate\tform\taccession\txml_found\tcodes_found\txml\tresolved_by\trequests")
         for a in audit:
             print(
                 f"{a['ticker']}\t{a['filingDate']}\t{a['form']}\t{a['accession']}\t"
-                f"{a['xml_found']}\t{a['codes_found']}\t{a['xml_url']}"
+                f"{a['xml_found']}\t{a['codes_found']}\t{a['xml_url']}\t{a['resolved_by']}\t{a['requests']}"
             )
 
     print("\n=== FULL OPEN-MARKET (P/S) TRANSACTIONS ===")
@@ -453,14 +387,24 @@ def main():
             f"${money0(s['net_since_lastP'])}\t{s['early_stop']}"
         )
 
-    # Structured JSON output
+    print(f"\n[resolver] {RESOLVER.summary()}", file=sys.stderr)
+    print(f"[cache] Form 4 {FORM4_CACHE.summary()}", file=sys.stderr)
+    print(f"[cache] {HTTP_CACHE.summary()}", file=sys.stderr)
+    print(f"[cache] {SUBMISSIONS.summary()}", file=sys.stderr)
+    print(f"[http] {concurrency.LIMITS.summary()}", file=sys.stderr)
+
+    # Transactie-store: geïndexeerde bron voor portfolio_monitor / candidate_research
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    TX_STORE.write_run([t.upper() for t in args.tickers], today, args.days, all_rows,
+                       source="portfolio_deepdive_270d")
+    print(f"[info] {len(all_rows)} transacties opgeslagen in {TX_STORE.path}", file=sys.stderr)
+
+    # Structured JSON output (exportformaat)
     if args.output_dir:
-        from pathlib import Path
         outdir = Path(args.output_dir)
         outdir.mkdir(parents=True, exist_ok=True)
 
         tickers_label = "_".join(t.upper() for t in args.tickers[:5])
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
         json_path = outdir / f"deepdive_{tickers_label}_{today}.json"
 
         def serialize_row(r):
@@ -478,6 +422,7 @@ def main():
             "audit": audit,
         }
         json_path.write_text(json.dumps(output, indent=2, default=str), encoding="utf-8")
+        TX_STORE.mark_exported(json_path)
         print(f"\n[info] JSON geschreven naar {json_path}", file=sys.stderr)
 
 if __name__ == "__main__":
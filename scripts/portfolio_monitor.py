@@ -12,6 +12,7 @@ Draait periodiek (2x/dag aanbevolen) en genereert:
 Gebruik:
   python3 scripts/portfolio_monitor.py --tickers ALMS BH BORR GO --days 270
   python3 scripts/portfolio_monitor.py --tickers ALMS BH BORR GO --days 270 --telegram
+  python3 scripts/portfolio_monitor.py --tickers ALMS BH BORR GO --workers 8
 """
 
 from __future__ import annotations
@@ -23,14 +24,21 @@ import os
 import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from urllib.request import Request, urlopen
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from insider import concurrency, form4, http_client, roles, scoring
+from insider.http_cache import HTTP_CACHE
+from insider.ratelimit import SEC_LIMITER
+from insider.submissions_store import SUBMISSIONS
+from insider.tx_store import TX_STORE
 
 UA = os.getenv("SEC_USER_AGENT", "InsiderMonitor/1.0 (contact: you@example.com)")
 TIMEOUT = 30
 RETRIES = 4
-SLEEP = 0.35
+WORKERS = 4              # Tickers tegelijk; SEC_LIMITER begrenst de requests over alle threads samen
 
 TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
 SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
@@ -52,31 +60,16 @@ DECAY_HALFLIFE = 90      # Dagen (half-life exponentiële decay)
 # M = optie-uitoefening (neutrale mechanische actie)
 NON_SIGNAL_SELL_CODES = {"F", "A", "M", "G", "W", "J"}
 
-# Rol-gewichten (hoger = informatiever)
-ROLE_WEIGHTS = {
-    "ceo": 5, "chief executive": 5, "president": 4,
-    "cfo": 4, "chief financial": 4,
-    "coo": 4, "chief operating": 4,
-    "cto": 3, "chief technology": 3,
-    "clo": 3, "chief legal": 3,
-    "evp": 3, "svp": 3,
-    "vp": 2,
-    "director": 2,
-    "10%": 1, "owner": 1,
-}
-
 
 IPO_MIN_DAYS = 365  # Bedrijf moet minimaal 1 jaar genoteerd zijn
 
 
-def is_recent_ipo(filing_data: dict) -> bool:
+def is_recent_ipo(dates: list[str]) -> bool:
     """Check of een bedrijf recent naar de beurs is gegaan (< IPO_MIN_DAYS).
 
-    Kijkt naar de oudste Form 4 filing — als die minder dan 1 jaar oud is,
-    is het waarschijnlijk een recente IPO en zijn insider buys minder informatief.
+    Kijkt naar de oudste filing — als die minder dan 1 jaar oud is, is het
+    waarschijnlijk een recente IPO en zijn insider buys minder informatief.
     """
-    recent = filing_data.get("filings", {}).get("recent", {})
-    dates = recent.get("filingDate", [])
     if not dates:
         return True  # Geen data = voorzichtig, behandel als IPO
 
@@ -89,30 +82,41 @@ def is_recent_ipo(filing_data: dict) -> bool:
         return False
 
 
-def fetch(url: str) -> str:
+def get(url: str, headers: dict | None = None) -> http_client.Response:
+    last_err: Exception | None = None
     for i in range(RETRIES):
         try:
-            time.sleep(SLEEP)
-            req = Request(url, headers={"User-Agent": UA, "Accept": "*/*"})
-            with urlopen(req, timeout=TIMEOUT) as r:
-                return r.read().decode("utf-8", "ignore")
+            SEC_LIMITER.acquire()
+            return concurrency.get(url, headers={"User-Agent": UA, "Accept": "*/*", **(headers or {})},
+                                   timeout=TIMEOUT)
         except Exception as e:
-            time.sleep(min(8, 0.8 * (2 ** i)))
-    return ""
+            last_err = e
+            wait = concurrency.retry_wait(e, i)
+            if wait is None:
+                break   # 404: niet opnieuw proberen
+            time.sleep(wait)
+    raise ConnectionError(f"Fetch failed for {url}: {last_err}")
+
+
+def fetch(url: str) -> str:
+    try:
+        return get(url).text
+    except OSError:
+        return ""
 
 
 def fetch_json(url: str):
-    text = fetch(url)
-    return json.loads(text) if text else {}
+    """company_tickers.json / submissions JSON: revalidatie via HTTP_CACHE (ETag/TTL),
+    één fetch per URL per run. Het resultaat wordt gedeeld: niet muteren."""
+    try:
+        return HTTP_CACHE.fetch_json(url, get)
+    except OSError:
+        return {}
 
 
 def role_weight(role: str) -> int:
-    role_lower = (role or "").lower()
-    best = 0
-    for keyword, weight in ROLE_WEIGHTS.items():
-        if keyword in role_lower:
-            best = max(best, weight)
-    return best if best > 0 else 1
+    """Hoogste rol-gewicht (roles.ROLE_WEIGHTS; hoger = informatiever), anders 1."""
+    return roles.classify(role).rank
 
 
 def role_label(weight: int) -> str:
@@ -123,79 +127,76 @@ def role_label(weight: int) -> str:
 
 
 def analyze_ticker(ticker: str, days: int, ticker_map: dict) -> dict:
-    """Analyseer insider activiteit voor één ticker via deep dive JSON output.
+    """Analyseer insider activiteit voor één ticker via deep dive data.
 
-    Leest eerst bestaande deep dive data. Als die er niet is, gebruikt het de
-    submissions API met index-pagina navigatie (zoals portfolio_deepdive_270d.py).
+    Leest eerst bestaande deep dive data uit de transactie-store. Als die er
+    niet is, gebruikt het de submissions API met index-pagina navigatie (zoals
+    portfolio_deepdive_270d.py).
     """
     ticker = ticker.upper()
 
-    # Probeer eerst bestaande deep dive JSON te laden
+    # Probeer eerst bestaande deep dive data te laden
     reports_dir = Path("data/reports")
     buys = []
     sells = []
 
-    # Zoek meest recente deep dive JSON die deze ticker bevat
-    found_data = False
-    for json_file in sorted(reports_dir.glob("deepdive_*.json"), reverse=True):
-        try:
-            data = json.loads(json_file.read_text(encoding="utf-8"))
-            if ticker in [t.upper() for t in data.get("tickers", [])]:
-                for tx in data.get("transactions", []):
-                    if tx.get("ticker", "").upper() != ticker:
-                        continue
-
-                    tx_date = None
-                    if tx.get("date"):
-                        try:
-                            tx_date = datetime.fromisoformat(str(tx["date"])).date()
-                        except Exception:
-                            tx_date = datetime.strptime(str(tx["date"])[:10], "%Y-%m-%d").date()
-
-                    owner = tx.get("insider", "Unknown")
-                    role_str = tx.get("role", "")
-                    code = tx.get("code", "").upper()
-                    buy_amt = float(tx.get("BUY", 0))
-                    sell_amt = float(tx.get("SELL", 0))
-
-                    entry = {
-                        "date": tx_date,
-                        "insider": owner,
-                        "role": role_str,
-                        "role_weight": role_weight(role_str),
-                        "code": code,
-                        "amount": buy_amt if code == "P" else sell_amt,
-                    }
-
-                    if code == "P" and buy_amt >= MIN_BUY_AMOUNT:
-                        buys.append(entry)
-                    elif code == "S" and sell_amt > 0 and code not in NON_SIGNAL_SELL_CODES:
-                        sells.append(entry)
-
-                found_data = True
-                break
-        except Exception:
-            continue
+    # Meest recente deep dive voor deze ticker uit de transactie-store (index op ticker, datum)
+    TX_STORE.sync_reports(reports_dir)
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date()
+    # Rijen zonder datum telden in de deepdive-JSON altijd mee; het venster filtert die niet weg
+    stored = TX_STORE.transactions(ticker, since=cutoff, undated=True)
+    found_data = stored is not None
+    for tx in stored or []:
+        tx_date = None
+        if tx.get("date"):
+            try:
+                tx_date = datetime.fromisoformat(str(tx["date"])).date()
+            except Exception:
+                tx_date = datetime.strptime(str(tx["date"])[:10], "%Y-%m-%d").date()
+
+        owner = tx.get("insider", "Unknown")
+        role_str = tx.get("role", "")
+        code = tx.get("code", "").upper()
+        buy_amt = float(tx.get("BUY", 0))
+        sell_amt = float(tx.get("SELL", 0))
+
+        entry = {
+            "date": tx_date,
+            "insider": owner,
+            "role": role_str,
+            "role_weight": role_weight(role_str),
+            "code": code,
+            "amount": buy_amt if code == "P" else sell_amt,
+        }
+
+        if code == "P" and buy_amt >= MIN_BUY_AMOUNT:
+            buys.append(entry)
+        elif code == "S" and sell_amt > 0 and code not in NON_SIGNAL_SELL_CODES:
+            sells.append(entry)
 
     if not found_data:
         # Fallback: gebruik submissions API direct
         if ticker not in ticker_map:
-            return {
-            "ticker": ticker, "signal": "UNKNOWN", "reasons": ["Niet gevonden in SEC"],
-            "total_buy": 0, "total_sell": 0, "net_flow": 0, "weighted_net": 0,
-            "days_since_buy": 999, "unique_buyers": 0, "unique_sellers": 0,
-            "csuite_buyers": [], "csuite_sellers": [],
-            "last_buy_date": None, "last_sell_date": None,
-            "buys_detail": [], "sells_detail": [],
-        }
+            return unknown_result(ticker, "Niet gevonden in SEC")
 
         cik = ticker_map[ticker]["cik_str"]
-        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date()
 
-        subs = fetch_json(SUBMISSIONS_URL.format(cik=cik))
+        # Lokale submissions-index (geen netwerk); anders de live submissions API
+        indexed = SUBMISSIONS.filings(cik, since=cutoff)
+        if indexed is not None:
+            first = SUBMISSIONS.first_filing(cik)
+            filing_dates = [first] if first else []
+        else:
+            subs   = fetch_json(SUBMISSIONS_URL.format(cik=cik))
+            recent = subs.get("filings", {}).get("recent", {})
+            filing_dates = recent.get("filingDate", [])
+            indexed = [
+                {"accessionNumber": a, "form": ft, "filingDate": fd}
+                for a, ft, fd in zip(recent.get("accessionNumber", []), recent.get("form", []), filing_dates)
+            ]
 
         # IPO check
-        if is_recent_ipo(subs):
+        if is_recent_ipo(filing_dates):
             return {
                 "ticker": ticker, "signal": "HOLD", "reasons": [f"Recente IPO (<{IPO_MIN_DAYS}d) — insider buys minder informatief"],
                 "total_buy": 0, "total_sell": 0, "net_flow": 0, "weighted_net": 0,
@@ -206,15 +207,11 @@ def analyze_ticker(ticker: str, days: int, ticker_map: dict) -> dict:
                 "is_ipo": True,
             }
 
-        recent = subs.get("filings", {}).get("recent", {})
-        n = len(recent.get("accessionNumber", []))
-
         form4_count = 0
-        for i in range(n):
-            form_type = recent.get("form", [""])[i]
-            if form_type not in ("4", "4/A"):
+        for f in indexed:
+            if f["form"] not in ("4", "4/A"):
                 continue
-            filing_date_str = recent.get("filingDate", [""])[i]
+            filing_date_str = f["filingDate"]
             try:
                 filing_date = datetime.strptime(filing_date_str, "%Y-%m-%d").date()
             except Exception:
@@ -225,7 +222,7 @@ def analyze_ticker(ticker: str, days: int, ticker_map: dict) -> dict:
             if form4_count > 60:
                 break
 
-            accession = recent["accessionNumber"][i]
+            accession = f["accessionNumber"]
             cik_plain = str(int(cik))
             acc_no = accession.replace("-", "")
             index_url = f"https://www.sec.gov/Archives/edgar/data/{cik_plain}/{acc_no}/{accession}-index.htm"
@@ -247,43 +244,20 @@ def analyze_ticker(ticker: str, days: int, ticker_map: dict) -> dict:
             if not xml:
                 continue
 
-            owner_m = re.search(r"<rptOwnerName>(.*?)</rptOwnerName>", xml)
-            owner = owner_m.group(1).strip() if owner_m else "Unknown"
-
-            role_m = re.search(r"<officerTitle>(.*?)</officerTitle>", xml)
-            is_dir = re.search(r"<isDirector>(.*?)</isDirector>", xml)
-            is_off = re.search(r"<isOfficer>(.*?)</isOfficer>", xml)
-            is_ten = re.search(r"<isTenPercentOwner>(.*?)</isTenPercentOwner>", xml)
+            doc = form4.parse(xml)
+            owner = doc.owner or "Unknown"
+            role_str = doc.role_label(with_ten_pct=True)
 
-            role_str = ""
-            if role_m:
-                role_str = role_m.group(1).strip()
-            else:
-                parts = []
-                if is_dir and is_dir.group(1).strip() == "1": parts.append("Director")
-                if is_off and is_off.group(1).strip() == "1": parts.append("Officer")
-                if is_ten and is_ten.group(1).strip() == "1": parts.append("10% Owner")
-                role_str = ", ".join(parts)
-
-            blocks = re.findall(r"<nonDerivativeTransaction>(.*?)</nonDerivativeTransaction>", xml, re.S)
-            for b in blocks:
-                code_m = re.search(r"<transactionCode>(.*?)</transactionCode>", b)
-                shares_m = re.search(r"<transactionShares>.*?<value>(.*?)</value>", b, re.S)
-                price_m = re.search(r"<transactionPricePerShare>.*?<value>(.*?)</value>", b, re.S)
-                if not code_m:
+            for tx in doc.transactions:
+                if tx.table != "nonDerivative":
                     continue
-                code = code_m.group(1).strip().upper()
+                code = tx.code
                 # Sla compensatie/belasting transacties over — geen marktsignaal
                 if code in NON_SIGNAL_SELL_CODES:
                     continue
                 if code not in ("P", "S"):
                     continue
-                try:
-                    shares = float(shares_m.group(1)) if shares_m else 0
-                    price = float(price_m.group(1)) if price_m else 0
-                except (ValueError, TypeError):
-                    continue
-                total = shares * price
+                total = tx.amount
                 entry = {
                     "date": filing_date,
                     "insider": owner,
@@ -437,6 +411,45 @@ def analyze_ticker(ticker: str, days: int, ticker_map: dict) -> dict:
     }
 
 
+def unknown_result(ticker: str, reason: str, **extra) -> dict:
+    """Resultaat zonder analyse (ticker onbekend of analyse mislukt)."""
+    return {
+        "ticker": ticker, "signal": "UNKNOWN", "reasons": [reason],
+        "total_buy": 0, "total_sell": 0, "net_flow": 0, "weighted_net": 0,
+        "days_since_buy": 999, "unique_buyers": 0, "unique_sellers": 0,
+        "csuite_buyers": [], "csuite_sellers": [],
+        "last_buy_date": None, "last_sell_date": None,
+        "buys_detail": [], "sells_detail": [],
+        **extra,
+    }
+
+
+def _timed_analyze(ticker: str, days: int, ticker_map: dict) -> dict:
+    """analyze_ticker met duur (scan_secs); een fout wordt een UNKNOWN-resultaat."""
+    t0 = time.time()
+    try:
+        r = analyze_ticker(ticker, days, ticker_map)
+    except Exception as e:
+        print(f"[error] {ticker.upper()}: analyse mislukt: {e}", file=sys.stderr)
+        r = unknown_result(ticker.upper(), f"Analyse mislukt: {e}", error=str(e))
+    r["scan_secs"] = round(time.time() - t0, 2)
+    return r
+
+
+def scan(tickers: list[str], days: int, ticker_map: dict, workers: int = WORKERS):
+    """Analyseer tickers tegelijk; levert de resultaten in de volgorde van `tickers`.
+
+    Alle SEC-requests lopen via get() en dus via SEC_LIMITER en de AIMD-limiet
+    per host: meer threads verhogen de doorvoer niet boven de SEC-limiet, maar
+    het wachten op trage responses en index-pagina's overlapt. Een fout bij één
+    ticker raakt de rest niet (UNKNOWN met de foutmelding)."""
+    TX_STORE.sync_reports(Path("data/reports"))   # Eén keer vóór de threads, niet per ticker
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_timed_analyze, t, days, ticker_map) for t in tickers]
+        for f in futures:
+            yield f.result()
+
+
 def load_ticker_map() -> dict:
     data = fetch_json(TICKERS_URL)
     out = {}
@@ -483,7 +496,7 @@ ADVIES_EMOJI = {
 
 
 def score_position(r: dict) -> int:
-    """Score 1-10 voor een portfolio- of kandidaatpositie.
+    """Score 1-10 voor een portfolio- of kandidaatpositie (rule set "position/1").
 
     Schaal is bewust streng zodat 10/10 uitzonderlijk is:
       9-10 : CEO koopt $5M+ binnen 7d, groot cluster, nul sells
@@ -493,61 +506,10 @@ def score_position(r: dict) -> int:
       1-2  : Gemengd of zwak signaal
       0    : Negatief / uitgewerkt
 
-    Ruwe punten worden genormaliseerd naar 1-10 (max ruwe score = 12).
+    Ruwe punten worden genormaliseerd naar 1-10 (max ruwe score = 12); de regels
+    staan in insider/scoring.py. Netto flow: net_flow_clean indien aanwezig.
     """
-    raw = 0
-    signal         = r.get("signal", "UNKNOWN")
-    days           = r.get("days_since_buy", 999)
-    csuite_buyers  = r.get("csuite_buyers", [])
-    csuite_sellers = r.get("csuite_sellers", [])
-    unique_buyers  = r.get("unique_buyers", 0)
-    total_buy      = r.get("total_buy", 0)
-    net_flow       = r.get("net_flow_clean", r.get("net_flow", 0))
-
-    # ── Signaalsterkte (max 3) ─────────────────────────────────────────────
-    raw += {
-        "STERKE OVERTUIGING": 3,
-        "POSITIEF SIGNAAL":   2,
-        "GEMENGD SIGNAAL":    1,
-        "NEGATIEF SIGNAAL":   0,
-        "SIGNAAL UITGEWERKT": 0,
-    }.get(signal, 0)
-
-    # ── C-suite kwaliteit (max 2, min -3) ────────────────────────────────
-    if csuite_buyers and not csuite_sellers:
-        raw += 2
-    elif csuite_buyers and csuite_sellers:
-        raw += 0  # C-suite koopt én verkoopt = neutraal
-    elif csuite_sellers:
-        raw -= 3  # Alleen C-suite open market sell = sterk negatief signaal
-
-    # ── Versheid (max 3) — strenger dan voorheen ──────────────────────────
-    if days <= 7:
-        raw += 3   # Extreem vers: CEO kocht gisteren
-    elif days <= 14:
-        raw += 2   # Vers
-    elif days <= 30:
-        raw += 1   # Actief
-    # >30d: geen punten
-
-    # ── Cluster (max 1) ───────────────────────────────────────────────────
-    if unique_buyers >= 3 and days <= 30:
-        raw += 1
-
-    # ── Koopomvang (max 2) — absoluut bedrag als proxy voor overtuiging ───
-    if total_buy >= 5_000_000:
-        raw += 2   # $5M+ = uitzonderlijk
-    elif total_buy >= 1_000_000:
-        raw += 1   # $1M+ = significant
-
-    # ── Netto positief zonder sells (max 1) ───────────────────────────────
-    if net_flow > 0 and not csuite_sellers:
-        raw += 1
-
-    # ── Normaliseer naar 1-10 (max ruwe score = 12) ───────────────────────
-    # score = round(raw / 12 * 10), minimaal 0, maximaal 10
-    score = round(max(0, raw) / 12 * 10)
-    return max(0, min(10, score))
+    return scoring.score(r, "position/1")
 
 
 def format_signal(r: dict) -> str:
@@ -577,10 +539,9 @@ def send_telegram(message: str, bot_token: str, chat_id: str):
         "text": message,
         "parse_mode": "HTML",
     }).encode()
-    req = Request(url, data=data, method="POST")
     try:
-        with urlopen(req, timeout=15) as r:
-            return r.status == 200
+        r = http_client.post(url, data, timeout=15)
+        return r.status == 200
     except Exception as e:
         print(f"[warn] Telegram send fout: {e}", file=sys.stderr)
         return False
@@ -593,6 +554,8 @@ def main():
     parser.add_argument("--days", type=int, default=270, help="Lookback periode in dagen")
     parser.add_argument("--telegram", action="store_true", help="Verstuur alerts via Telegram")
     parser.add_argument("--output-dir", default="data/reports", help="Output directory")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help=f"Tickers tegelijk analyseren (default {WORKERS}; SEC-limiet blijft gedeeld)")
     args = parser.parse_args()
 
     # Als --portfolio niet opgegeven: behandel alle --tickers als portfolio (backward compat)
@@ -602,13 +565,18 @@ def main():
     ticker_map = load_ticker_map()
 
     results = []
-    for ticker in args.tickers:
-        print(f"[monitor] Scan {ticker.upper()}...", file=sys.stderr)
-        r = analyze_ticker(ticker, args.days, ticker_map)
-        r["in_portfolio"] = ticker.upper() in portfolio_set
+    t0 = time.time()
+    for r in scan(args.tickers, args.days, ticker_map, args.workers):
+        print(f"[monitor] Scan {r['ticker']}: {r['signal']} in {r['scan_secs']:.1f}s", file=sys.stderr)
+        r["in_portfolio"] = r["ticker"] in portfolio_set
         results.append(r)
         print(format_signal(r))
         print()
+    if results:
+        slowest = max(results, key=lambda r: r["scan_secs"])
+        print(f"[monitor] {len(results)} tickers in {time.time() - t0:.1f}s "
+              f"(opgeteld {sum(r['scan_secs'] for r in results):.1f}s, {args.workers} workers; "
+              f"traagste {slowest['ticker']} {slowest['scan_secs']:.1f}s)", file=sys.stderr)
 
     portfolio_results   = [r for r in results if r["in_portfolio"]]
     kandidaat_results   = [r for r in results if not r["in_portfolio"]]
@@ -650,6 +618,9 @@ def main():
     json_path = outdir / "portfolio_monitor.json"
     json_path.write_text(json.dumps(results, indent=2, default=str), encoding="utf-8")
     print(f"[monitor] JSON geschreven naar {json_path}", file=sys.stderr)
+    print(f"[cache] {HTTP_CACHE.summary()}", file=sys.stderr)
+    print(f"[cache] {SUBMISSIONS.summary()}", file=sys.stderr)
+    print(f"[http] {concurrency.LIMITS.summary()}", file=sys.stderr)
 
     # ── System health check ──────────────────────────────────────────────────
     health_lines = []
@@ -720,10 +691,13 @@ def main():
         health_lines.append(f"⚠️ Discovery: al {zero_streak} dagen 0 buys — let op")
 
     # SEC: tel tickers waarbij analyse mislukte (UNKNOWN signaal = niet gevonden)
-    unknown_tickers = [r["ticker"] for r in results if r.get("signal") == "UNKNOWN"]
+    failed_tickers  = [r["ticker"] for r in results if r.get("error")]
+    unknown_tickers = [r["ticker"] for r in results if r.get("signal") == "UNKNOWN" and not r.get("error")]
+    if failed_tickers:
+        health_lines.append(f"🔴 SEC: analyse mislukt voor {', '.join(failed_tickers)}")
     if unknown_tickers:
         health_lines.append(f"🟡 SEC: {len(unknown_tickers)} ticker(s) niet gevonden: {', '.join(unknown_tickers)}")
-    else:
+    elif not failed_tickers:
         health_lines.append(f"🟢 SEC: alle {len(results)} tickers geanalyseerd")
 
     # Deep dive: check of er recente deepdive JSON's zijn
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
-import json, math, os, re
+import json, math, os, re, sys
 from pathlib import Path
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from insider import roles
+
 REP = Path("data/reports")
 SECJ = REP / "sec_events.jsonl"
 EUJ  = REP / "eu_events.jsonl"
@@ -16,10 +19,7 @@ def log1p(x):
 BAD_PAT = re.compile(r"(?i)\b(424|497|425|485[A-Z]*|FUND|TRUST|ACCOUNT|BANK|FINANCE|VARIABLE\s+ANNUITY)\b")
 
 def role_bucket(role:str)->str:
-    r=(role or "").lower()
-    if any(k in r for k in ["ceo","chief executive","cfo","president","chair"]): return "TOP"
-    if "officer" in r or "dir" in r: return "OFF"
-    return "OTHER"
+    return roles.classify(role).bucket
 
 import os
 def _envf(n,d):
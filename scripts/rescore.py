@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Herscoor de volledige Form 4-historie onder één of twee scoring rule sets.
+
+Bouwt uit de backfill-historie (tabel `history`, zie backfill_form4.py) per
+peildatum de 270d-signalen van alle tickers (insider/signal_engine.py,
+point-in-time) en scoort ze in batch (insider/scoring.py). Bedoeld om na elke
+regelwijziging te zien hoe de scoreverdeling verschuift:
+
+  python3 scripts/rescore.py --start 2016-01-01 --rules monitor/1
+  python3 scripts/rescore.py --start 2016-01-01 --rules monitor/1 --compare position/1
+  python3 scripts/rescore.py --start 2020-01-01 --step 7 --json data/reports/rescore.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import monitor
+from insider import scoring
+from insider.tx_store import TX_STORE
+
+
+def as_of_dates(start: date, end: date, step: int) -> list[date]:
+    days, d = [], start
+    while d <= end:
+        days.append(d)
+        d += timedelta(days=step)
+    return days
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Herscoor de Form 4-historie onder een scoring rule set")
+    parser.add_argument("--start", required=True, help="Eerste peildatum (YYYY-MM-DD)")
+    parser.add_argument("--end", default="", help="Laatste peildatum (default vandaag)")
+    parser.add_argument("--step", type=int, default=30, help="Dagen tussen peildata (default 30)")
+    parser.add_argument("--days", type=int, default=monitor.ANALYSIS_DAYS,
+                        help=f"Analysevenster per peildatum (default {monitor.ANALYSIS_DAYS})")
+    parser.add_argument("--rules", choices=sorted(scoring.RULESETS), default=monitor.SCORE_RULES,
+                        help=f"Rule set (default {monitor.SCORE_RULES})")
+    parser.add_argument("--compare", choices=sorted(scoring.RULESETS), default="",
+                        help="Tweede rule set voor een A/B-vergelijking")
+    parser.add_argument("--json", default="", help="Schrijf alle scores (ticker, datum, score, codes) naar dit bestand")
+    args = parser.parse_args()
+
+    start = date.fromisoformat(args.start)
+    end   = date.fromisoformat(args.end) if args.end else date.today()
+
+    t0   = time.time()
+    rows = TX_STORE.history(since=start - timedelta(days=args.days), until=end)
+    if not rows:
+        print("[rescore] geen historie in de store — draai eerst backfill_form4.py", file=sys.stderr)
+        sys.exit(1)
+    trades = monitor.history_trades(rows)
+    print(f"[rescore] {len(rows)} transacties, {len(trades.tickers)} tickers geladen "
+          f"in {time.time() - t0:.1f}s", file=sys.stderr)
+
+    # Signalen per peildatum (vectorized), daarna alle peildata in één scoring-batch
+    t1 = time.time()
+    cols, keys = [], []
+    for as_of in as_of_dates(start, end, args.step):
+        col    = monitor.signals_as_of(trades, as_of, args.days)
+        active = np.flatnonzero(col["days_since_buy"] < 999)   # Alleen tickers met een buy in het venster
+        part   = scoring.engine_columns(col)
+        cols.append({k: v[active] for k, v in part.items()})
+        keys.extend((trades.tickers[i], as_of.isoformat()) for i in active.tolist())
+    if not keys:
+        print(f"[rescore] geen actieve tickers op de peildata {start} → {end} "
+              f"(--start na --end, of geen buys in het venster)", file=sys.stderr)
+        sys.exit(1)
+    batch = {k: np.concatenate([c[k] for c in cols]) for k in cols[0]}
+    t2 = time.time()
+
+    a = scoring.score_columns(batch, args.rules)
+    t3 = time.time()
+    print(f"[rescore] {len(keys)} ticker-peildata: signalen {t2 - t1:.1f}s, scoring {t3 - t2:.3f}s", file=sys.stderr)
+
+    def histogram(s: scoring.Scores) -> str:
+        counts = np.bincount(s.score, minlength=11)
+        return " ".join(f"{i}:{c}" for i, c in enumerate(counts.tolist()))
+
+    print(f"{args.rules:<12} gemiddeld {a.score.mean():.2f}  {histogram(a)}")
+    if args.compare:
+        ab = scoring.compare(batch, args.rules, args.compare)
+        print(f"{args.compare:<12} gemiddeld {ab['mean_b']:.2f}  {histogram(ab['b'])}")
+        print(f"verschil: {ab['changed']} van {len(keys)} gewijzigd ({ab['up']} hoger, {ab['down']} lager)")
+
+    if args.json:
+        out = [{"ticker": t, "as_of": d, "score": int(a.score[i]), "codes": a.codes(i)}
+               for i, (t, d) in enumerate(keys)]
+        Path(args.json).write_text(json.dumps(out), encoding="utf-8")
+        print(f"[rescore] {len(out)} scores → {args.json}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()